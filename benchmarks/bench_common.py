@@ -0,0 +1,148 @@
+"""
+基準測試共用工具
+
+計時（多次取最小/中位數）、tracemalloc 峰值記憶體、執行環境資訊、
+結果 JSON 輸出與和舊結果比較。各 bench_*.py 腳本共用。
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+# 讓腳本可直接以 `python benchmarks/bench_xxx.py` 執行並匯入核心模組
+sys.path.insert(0, str(ROOT))
+
+
+def add_common_args(parser: argparse.ArgumentParser, default_repeat: int = 3, memory: bool = True) -> None:
+    parser.add_argument("--repeat", type=int, default=default_repeat, help=f"每個案例重複次數，預設 {default_repeat}")
+    parser.add_argument("--out", help="結果 JSON 輸出路徑（預設只印出表格）")
+    parser.add_argument("--compare", help="與先前輸出的結果 JSON 比較（印出中位數比值）")
+    if memory:
+        parser.add_argument("--no-memory", action="store_true", help="略過 tracemalloc 記憶體量測（較快）")
+
+
+def measure(func: Callable[[], object], repeat: int, setup: Callable[[], object] | None = None) -> dict:
+    """執行 func repeat 次（每次前呼叫 setup，不計時），回傳秒數統計"""
+    times: List[float] = []
+    for _ in range(max(1, repeat)):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "mean_s": round(statistics.fmean(times), 6),
+        "runs": len(times),
+    }
+
+
+def peak_heap(func: Callable[[], object], setup: Callable[[], object] | None = None) -> int:
+    """以 tracemalloc 量測單次執行的 Python 峰值配置量（位元組）；與計時分開執行以免拖慢數據"""
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_meta() -> dict:
+    """執行環境資訊，讓不同機器/版本的結果可以對照"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def result_key(result: dict, key_fields: List[str]) -> tuple:
+    return tuple(result.get(field) for field in key_fields)
+
+
+def _format_heap(res: dict) -> str:
+    heap = res.get("peak_heap_bytes")
+    return f"{heap / 1_048_576:.1f}" if heap is not None else "-"
+
+
+DEFAULT_COLUMNS = [
+    ("median_s", lambda res: f"{res['median_s']:.4f}"),
+    ("min_s", lambda res: f"{res['min_s']:.4f}"),
+    ("peak_heap_mb", _format_heap),
+]
+
+
+def format_table(
+    results: List[dict],
+    key_fields: List[str],
+    columns: Sequence[tuple[str, Callable[[dict], str]]] = DEFAULT_COLUMNS,
+) -> str:
+    """鍵值欄位加上 columns（欄名, 格式化函式）組成對齊的純文字表格"""
+    header = [*key_fields, *(name for name, _ in columns)]
+    rows = [header]
+    for res in results:
+        rows.append([*(str(res.get(field, "")) for field in key_fields), *(fmt(res) for _, fmt in columns)])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def compare_results(results: List[dict], baseline_path: Path, key_fields: List[str]) -> str:
+    """以相同鍵值比對中位數；比值 < 1 表示比基準快"""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    old = {result_key(res, key_fields): res for res in baseline.get("results", [])}
+    lines = [f"與 {baseline_path}（commit {baseline.get('meta', {}).get('commit')}）比較："]
+    for res in results:
+        prev = old.get(result_key(res, key_fields))
+        label = " ".join(str(res.get(field)) for field in key_fields)
+        if prev is None or not prev.get("median_s"):
+            lines.append(f"  {label}: 基準無此案例")
+            continue
+        ratio = res["median_s"] / prev["median_s"]
+        lines.append(f"  {label}: {prev['median_s']:.4f}s -> {res['median_s']:.4f}s（×{ratio:.2f}）")
+    return "\n".join(lines)
+
+
+def finish(
+    name: str,
+    args: argparse.Namespace,
+    params: dict,
+    results: List[dict],
+    key_fields: List[str],
+    columns: Sequence[tuple[str, Callable[[dict], str]]] = DEFAULT_COLUMNS,
+) -> None:
+    """印出結果表格，依參數寫出 JSON 與比較"""
+    print(format_table(results, key_fields, columns))
+    payload = {"benchmark": name, "meta": run_meta(), "params": params, "results": results}
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"結果已寫入 {out}")
+    if args.compare:
+        print(compare_results(results, Path(args.compare), key_fields))
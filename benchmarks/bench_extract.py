@@ -0,0 +1,266 @@
+"""
+端到端裁切基準測試
+
+以 ffmpeg 的 lavfi（testsrc2 + sine）在本機產生不同解析度、GOP 與長度的測試影片，
+對「片段長度 × 起點」矩陣分別執行 CLI 主流程（run_cli，copy / smart）與 run_ffmpeg_precise，
+記錄耗時、即時倍率，並以 ffprobe 讀取輸出影像封包時間，計算實際起點與要求起點的誤差。
+
+範例：
+  python benchmarks/bench_extract.py --out bench_extract.json
+  python benchmarks/bench_extract.py --resolutions 1920x1080 --gops 1,4 --modes copy,precise,smart
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+import bench_common
+
+import fast_video_slice as fvs
+
+KEY_FIELDS = ["mode", "resolution", "gop_s", "length_s", "offset_s"]
+FPS = fvs.DEFAULT_FPS
+COLUMNS = [
+    ("median_s", lambda res: f"{res['median_s']:.3f}"),
+    ("realtime_x", lambda res: f"{res['realtime_factor']:.1f}"),
+    ("start_err_s", lambda res: f"{res['start_error_s']:+.3f}" if res["start_error_s"] is not None else "-"),
+    ("end_err_s", lambda res: f"{res['end_error_s']:+.3f}" if res["end_error_s"] is not None else "-"),
+]
+
+
+def make_fixture(fixtures: Path, ffmpeg_cmd: str, resolution: str, gop: float, duration: float) -> Path:
+    """產生（或沿用）固定 GOP 的測試影片：testsrc2 畫面 + 440Hz 正弦波，關鍵影格間隔固定為 gop 秒"""
+    path = fixtures / f"src_{resolution}_g{gop:g}_d{duration:g}.mp4"
+    if path.exists():
+        return path
+    caps = fvs.load_ff_capabilities(ffmpeg_cmd)
+    video_codec = "libx264" if caps is None or caps.has_encoder("libx264") else "mpeg4"
+    keyint = str(max(1, round(gop * FPS)))
+    tmp_path = path.with_suffix(".tmp.mp4")
+    cmd = [
+        ffmpeg_cmd,
+        "-y",
+        "-v",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={resolution}:rate={FPS}:duration={duration:g}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:sample_rate=48000:duration={duration:g}",
+        "-c:v",
+        video_codec,
+        "-pix_fmt",
+        "yuv420p",
+        "-g",
+        keyint,
+        "-keyint_min",
+        keyint,
+        "-sc_threshold",
+        "0",
+        "-c:a",
+        "aac",
+        "-shortest",
+        str(tmp_path),
+    ]
+    if video_codec == "libx264":
+        cmd[cmd.index("-g"):cmd.index("-g")] = ["-preset", "veryfast"]
+    print(f"  產生測試影片 {path.name}（{video_codec}）", file=sys.stderr)
+    subprocess.run(cmd, check=True, env=fvs.clean_subprocess_env())
+    tmp_path.replace(path)
+    return path
+
+
+def make_subs(path: Path, duration: float) -> Path:
+    """每 2 秒一條的字幕，讓 CLI 流程與實際使用一樣會切字幕"""
+    cues = [
+        fvs.SRTCue(start=t, end=t + 1.5, lines=[f"cue {idx}"])
+        for idx, t in enumerate(range(0, int(duration), 2), start=1)
+    ]
+    fvs.write_srt(path, cues)
+    return path
+
+
+def probe_output(output: Path, ffprobe_cmd: str) -> tuple[float | None, float | None]:
+    """回傳輸出影像的（起點, 終點）秒數，以封包時間計算；copy 的前置影格時間為負值"""
+    cmd = [
+        ffprobe_cmd,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time",
+        "-of",
+        "json",
+        str(output),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, env=fvs.clean_subprocess_env())
+    if result.returncode != 0:
+        return None, None
+    data = json.loads(result.stdout or "{}")
+    times = [float(p["pts_time"]) for p in data.get("packets", []) if p.get("pts_time") not in (None, "N/A")]
+    if not times:
+        return None, None
+    # 最後一格的顯示結束於其時間 + 一格長度
+    return min(times), max(times) + 1.0 / FPS
+
+
+def cli_args(argv: List[str]) -> argparse.Namespace:
+    """以 CLI 的 parse_args 解析，確保量測的是 main() 實際走的設定"""
+    saved = sys.argv
+    sys.argv = ["fast_video_slice.py", *argv]
+    try:
+        return fvs.parse_args()
+    finally:
+        sys.argv = saved
+
+
+def bench_case(
+    mode: str,
+    video: Path,
+    subs: Path,
+    rng: fvs.TimeRange,
+    outdir: Path,
+    ffmpeg_cmd: str,
+    ffprobe_cmd: str,
+    keyframe_index: fvs.KeyframeIndex,
+    repeat: int,
+) -> dict:
+    output = outdir / "clip_001.mp4"
+    label = rng.label
+
+    def clean() -> None:
+        shutil.rmtree(outdir, ignore_errors=True)
+        outdir.mkdir(parents=True)
+
+    if mode == fvs.MODE_PRECISE:
+
+        def run() -> None:
+            fvs.run_ffmpeg_precise(video, rng, output, False, ffmpeg_cmd, keyframe_index=keyframe_index)
+
+    else:
+        args = cli_args(
+            ["--video", str(video), "--subs", str(subs), "--range", label, "--outdir", str(outdir), "--mode", mode]
+        )
+
+        def run() -> None:
+            if fvs.run_cli(args) != 0:
+                raise RuntimeError(f"{mode} 裁切失敗：{label}")
+
+    stats = bench_common.measure(run, repeat, clean)
+    length = rng.end - rng.start
+    out_start, out_end = probe_output(output, ffprobe_cmd)
+    return {
+        **stats,
+        "realtime_factor": round(length / stats["median_s"], 2) if stats["median_s"] else None,
+        # 負值表示輸出從要求起點之前開始（copy 從前一個關鍵影格開始）
+        "start_error_s": round(out_start, 4) if out_start is not None else None,
+        "end_error_s": round(out_end - length, 4) if out_end is not None else None,
+        "duration_error_s": round(out_end - out_start - length, 4) if out_start is not None else None,
+        "expected_copy_start_s": round(keyframe_index.copy_window(rng)[0] - rng.start, 4),
+        "output_bytes": output.stat().st_size if output.exists() else None,
+    }
+
+
+def parse_list(text: str, kind=float) -> list:
+    return [kind(part) for part in text.split(",") if part.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="端到端裁切基準測試（本機產生測試影片）")
+    parser.add_argument("--resolutions", default="640x360,1280x720", help="測試影片解析度，逗號分隔")
+    parser.add_argument("--gops", default="1,2,5", help="關鍵影格間隔（秒），逗號分隔")
+    parser.add_argument("--duration", type=float, default=120.0, help="測試影片長度（秒），預設 120")
+    parser.add_argument("--lengths", default="2,10,30", help="片段長度（秒），逗號分隔")
+    parser.add_argument("--offsets", default="0.5,33.3,61.7", help="片段起點（秒），逗號分隔；超出影片的組合略過")
+    parser.add_argument(
+        "--modes", default="copy,precise", help=f"輸出模式，逗號分隔：{', '.join(fvs.OUTPUT_MODES)}"
+    )
+    parser.add_argument("--fixtures", help="測試影片存放資料夾（指定時保留並沿用，預設用暫存資料夾）")
+    bench_common.add_common_args(parser, default_repeat=1, memory=False)
+    args = parser.parse_args()
+    args.resolutions = [r.strip() for r in args.resolutions.split(",") if r.strip()]
+    args.gops = parse_list(args.gops)
+    args.lengths = parse_list(args.lengths)
+    args.offsets = parse_list(args.offsets)
+    args.modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in args.modes if m not in fvs.OUTPUT_MODES]
+    if unknown:
+        parser.error(f"未知的輸出模式：{', '.join(unknown)}")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    results: List[dict] = []
+    with tempfile.TemporaryDirectory(prefix="fvs_bench_extract_") as tmp:
+        workdir = Path(tmp)
+        # 關鍵影格索引等快取寫到暫存資料夾，每次從冷快取開始
+        os.environ[fvs.CACHE_DIR_ENV] = str(workdir / "cache")
+        ffmpeg_cmd, ffprobe_cmd = fvs.ensure_ffmpeg_exists()
+        fixtures = Path(args.fixtures) if args.fixtures else workdir / "fixtures"
+        fixtures.mkdir(parents=True, exist_ok=True)
+        subs = make_subs(workdir / "bench.srt", args.duration)
+        for resolution in args.resolutions:
+            for gop in args.gops:
+                video = make_fixture(fixtures, ffmpeg_cmd, resolution, gop, args.duration)
+                keyframe_index = fvs.load_keyframe_index(video, ffprobe_cmd)
+                for length in args.lengths:
+                    for offset in args.offsets:
+                        if offset + length > args.duration:
+                            continue
+                        # 與 CLI 相同的解析路徑，copy 與 precise 使用完全一致的區間
+                        rng = fvs.parse_range(
+                            f"{fvs.format_ffmpeg_time(offset)} -> {fvs.format_ffmpeg_time(offset + length)}"
+                        )
+                        for mode in args.modes:
+                            res = bench_case(
+                                mode,
+                                video,
+                                subs,
+                                rng,
+                                workdir / "out",
+                                ffmpeg_cmd,
+                                ffprobe_cmd,
+                                keyframe_index,
+                                args.repeat,
+                            )
+                            res = {
+                                "mode": mode,
+                                "resolution": resolution,
+                                "gop_s": gop,
+                                "length_s": length,
+                                "offset_s": offset,
+                                **res,
+                            }
+                            results.append(res)
+                            print(
+                                f"  {mode:<8} {resolution} gop={gop:g} {offset:g}+{length:g}s "
+                                f"{res['median_s']:.3f}s ×{res['realtime_factor']}",
+                                file=sys.stderr,
+                            )
+    params = {
+        "resolutions": args.resolutions,
+        "gops": args.gops,
+        "duration": args.duration,
+        "lengths": args.lengths,
+        "offsets": args.offsets,
+        "modes": args.modes,
+        "repeat": args.repeat,
+        "fps": FPS,
+    }
+    bench_common.finish("extract", args, params, results, KEY_FIELDS, COLUMNS)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
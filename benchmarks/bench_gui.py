@@ -0,0 +1,369 @@
+"""
+GUI 反應速度基準測試（無視窗 Qt）
+
+預設以 QT_QPA_PLATFORM=offscreen 執行，量測：
+- 區間表格：RangeTableWidget 的 set_ranges / get_ranges / validate / 匯入（import_text，即 _on_import 去掉對話框）
+  在 1k/10k/50k 列時的耗時（含處理重繪事件）。
+- 主視窗啟動：MainWindow 建構到顯示並處理完事件。
+- 預覽：PreviewDialog 建構到播放器載入預覽檔（copy 與 precise；另量同一區間再次開啟的快取命中）。
+- 裁切時 UI 執行緒停頓：SliceWorker（verbose）執行期間以 10ms 計時器量測事件迴圈的最大間隔與累計停頓。
+
+設定檔寫到暫存的 HOME，不影響使用者設定；缺少 PyQt5 或 QtMultimedia 的項目會略過並註明原因。
+
+範例：
+  python benchmarks/bench_gui.py --out gui.json
+  python benchmarks/bench_gui.py --sections table --rows 1k,10k --compare gui.json
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import bench_common
+from bench_extract import make_fixture, make_subs
+from bench_subtitles import parse_sizes
+
+import fast_video_slice as fvs
+
+SECTIONS = ("table", "startup", "preview", "worker")
+KEY_FIELDS = ["case", "size"]
+COLUMNS = [
+    ("median_s", lambda res: f"{res['median_s']:.4f}"),
+    ("min_s", lambda res: f"{res['min_s']:.4f}"),
+    ("max_gap_ms", lambda res: f"{res['max_gap_ms']:.1f}" if res.get("max_gap_ms") is not None else "-"),
+]
+# 預覽/裁切等待上限（秒），避免 ffmpeg 卡住時測試不會結束
+WAIT_TIMEOUT = 300.0
+HEARTBEAT_MS = 10
+# 超過此間隔視為使用者可感知的停頓
+STALL_MS = 50.0
+
+
+def sample_ranges(count: int) -> List[dict]:
+    """產生 count 筆有標題的區間（每段 5 秒，時間遞增）"""
+    ranges = []
+    for idx in range(count):
+        start = idx * 7
+        ranges.append(
+            {
+                "title": f"片段{idx + 1}",
+                "start": fvs.format_ffmpeg_time(start)[:8],
+                "end": fvs.format_ffmpeg_time(start + 5)[:8] + f".{idx % 30:02d}",
+                "note": "",
+                "precise": idx % 3 == 0,
+            }
+        )
+    return ranges
+
+
+def wait_for(app, done: Callable[[], bool], timeout: float = WAIT_TIMEOUT) -> bool:
+    """處理事件直到 done() 成立或逾時"""
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def dismiss_modals(app, messages: List[str]) -> None:
+    """關閉錯誤對話框（offscreen 時沒有人能按確定），並記下內容"""
+    from PyQt5.QtWidgets import QMessageBox
+
+    widget = app.activeModalWidget()
+    if isinstance(widget, QMessageBox):
+        messages.append(widget.text())
+        widget.reject()
+
+
+def result(case: str, size, times: List[float], **extra) -> dict:
+    return {
+        "case": case,
+        "size": size,
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "mean_s": round(statistics.fmean(times), 6),
+        "runs": len(times),
+        **extra,
+    }
+
+
+def bench_table(app, args: argparse.Namespace) -> List[dict]:
+    from gui.range_table import RangeTableWidget
+
+    results: List[dict] = []
+    for rows in args.rows:
+        ranges = sample_ranges(rows)
+        text = "\n".join(f"{r['title']},{r['start']} -> {r['end']}" for r in ranges)
+        widget = RangeTableWidget()
+        widget.resize(1000, 600)
+        widget.show()
+        app.processEvents()
+
+        def set_ranges() -> None:
+            widget.set_ranges(ranges)
+            app.processEvents()
+
+        def import_text() -> None:
+            widget.import_text(text)
+            app.processEvents()
+
+        cases = [
+            ("table.set_ranges", set_ranges, None),
+            ("table.get_ranges", widget.get_ranges, set_ranges),
+            ("table.validate", widget.validate, set_ranges),
+            ("table.import", import_text, widget.clear),
+        ]
+        for name, func, setup in cases:
+            stats = bench_common.measure(func, args.repeat, setup)
+            results.append({"case": name, "size": rows, **stats})
+            print(f"  {name:<18} {rows:>6} 列 {stats['median_s']:.4f}s", file=sys.stderr)
+        widget.close()
+        widget.deleteLater()
+        app.processEvents()
+    return results
+
+
+def bench_startup(app, args: argparse.Namespace) -> List[dict]:
+    started = time.perf_counter()
+    from gui.main_window import MainWindow
+
+    import_time = time.perf_counter() - started
+    times: List[float] = []
+    for _ in range(max(1, args.repeat)):
+        started = time.perf_counter()
+        window = MainWindow()
+        window.show()
+        app.processEvents()
+        times.append(time.perf_counter() - started)
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+    print(f"  main_window.startup {statistics.median(times):.4f}s", file=sys.stderr)
+    return [
+        result("main_window.import", None, [import_time]),
+        result("main_window.startup", None, times),
+    ]
+
+
+def bench_preview(app, args: argparse.Namespace, video: Path, subs: Path, workdir: Path) -> List[dict]:
+    from PyQt5.QtCore import QTimer
+    from gui.preview_cache import PreviewCache
+    from gui.preview_dialog import PreviewDialog
+
+    results: List[dict] = []
+    errors: List[str] = []
+    # 預覽建構時就會產生預覽，錯誤對話框可能在建構途中彈出，需由計時器關閉
+    watchdog = QTimer()
+    watchdog.setInterval(200)
+    watchdog.timeout.connect(lambda: dismiss_modals(app, errors))
+    watchdog.start()
+    start, end = "00:00:31.10", "00:00:41"
+    for precise in (False, True):
+        mode = "precise" if precise else "copy"
+        times: dict[str, List[float]] = {f"preview.{mode}": [], f"preview.{mode}.cached": []}
+        errors.clear()
+        for run in range(max(1, args.repeat)):
+            # 每輪使用全新的預覽快取：第一次開啟量產生時間，第二次開啟量快取命中
+            cache = PreviewCache(root=workdir / f"preview_{mode}_{run}")
+            for case in times:
+                loaded: List[float] = []
+                started = time.perf_counter()
+                dialog = PreviewDialog(
+                    video_path=video,
+                    subs_path=subs,
+                    start=start,
+                    end=end,
+                    initial_precise=precise,
+                    use_hwaccel_default=False,
+                    cache=cache,
+                )
+                dialog.player.mediaChanged.connect(lambda *_: loaded.append(time.perf_counter()))
+                if dialog.preview_path is not None:
+                    # 快取命中時在建構途中就已載入
+                    loaded.append(time.perf_counter())
+                dialog.show()
+                wait_for(app, lambda: bool(loaded) or not dialog._busy)
+                if loaded:
+                    times[case].append(loaded[0] - started)
+                dialog._suppress_errors = True
+                dialog.close()
+                dialog.deleteLater()
+                app.processEvents()
+        for case, values in times.items():
+            if values:
+                results.append(result(case, None, values))
+                print(f"  {case:<22} {statistics.median(values):.4f}s", file=sys.stderr)
+            else:
+                print(f"  {case:<22} 失敗：{'; '.join(errors) or '逾時'}", file=sys.stderr)
+    watchdog.stop()
+    return results
+
+
+def bench_worker(app, args: argparse.Namespace, video: Path, subs: Path, workdir: Path) -> List[dict]:
+    from PyQt5.QtCore import QTimer
+    from gui.worker import SliceWorker
+
+    try:
+        from gui.main_window import MainWindow
+    except ImportError:
+        MainWindow = None
+
+    ranges = sample_ranges(args.worker_clips)
+    for rng in ranges:
+        rng["precise"] = False
+    window = None
+    if MainWindow is not None:
+        # 接到主視窗實際的日誌/進度處理函式，量到的就是使用者看到的停頓
+        window = MainWindow()
+        window.show()
+        on_log, on_progress = window._on_log, window._on_progress_detail
+    else:
+        from PyQt5.QtWidgets import QPlainTextEdit
+
+        log_box = QPlainTextEdit()
+        log_box.show()
+        on_log, on_progress = log_box.appendPlainText, lambda *_: None
+    if window is not None:
+        log_box = window.log_box
+
+    times: List[float] = []
+    gaps: List[float] = []
+    log_lines = 0
+    for run in range(max(1, args.repeat)):
+        outdir = workdir / f"worker_{run}"
+        log_box.clear()
+        worker = SliceWorker(
+            video=video,
+            subs=subs,
+            ranges=ranges,
+            outdir=outdir,
+            check_duration=False,
+            verbose=True,
+            use_hwaccel=False,
+            jobs=args.worker_jobs,
+        )
+        finished: List[str] = []
+        worker.log.connect(on_log)
+        worker.progress_detail.connect(on_progress)
+        worker.finished_ok.connect(lambda *_: finished.append("ok"))
+        worker.finished_error.connect(lambda message: finished.append(message))
+        ticks: List[float] = []
+        heartbeat = QTimer()
+        heartbeat.setInterval(HEARTBEAT_MS)
+        heartbeat.timeout.connect(lambda: ticks.append(time.perf_counter()))
+        heartbeat.start()
+        started = time.perf_counter()
+        worker.start()
+        wait_for(app, lambda: bool(finished))
+        times.append(time.perf_counter() - started)
+        heartbeat.stop()
+        worker.wait()
+        if finished and finished[0] != "ok":
+            print(f"  worker 失敗：{finished[0]}", file=sys.stderr)
+        log_lines += log_box.blockCount()
+        gaps.extend((later - earlier) * 1000 for earlier, later in zip(ticks, ticks[1:]))
+    if window is not None:
+        window.close()
+        window.deleteLater()
+    gaps.sort()
+    stall = sum(gap - HEARTBEAT_MS for gap in gaps if gap > STALL_MS)
+    res = result(
+        "worker.ui_stall",
+        args.worker_clips,
+        times,
+        max_gap_ms=round(gaps[-1], 2) if gaps else None,
+        p99_gap_ms=round(gaps[int(len(gaps) * 0.99)], 2) if gaps else None,
+        stall_ms=round(stall / len(times), 2),
+        stalls_over_50ms=sum(1 for gap in gaps if gap > STALL_MS),
+        log_lines=log_lines // len(times),
+        ui_slots="MainWindow" if window is not None else "QPlainTextEdit",
+    )
+    print(f"  worker.ui_stall     最大間隔 {res['max_gap_ms']}ms，累計停頓 {res['stall_ms']}ms", file=sys.stderr)
+    return [res]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="GUI 反應速度基準測試（offscreen Qt）")
+    parser.add_argument("--sections", default=",".join(SECTIONS), help=f"量測項目，逗號分隔：{', '.join(SECTIONS)}")
+    parser.add_argument("--rows", default="1k,10k,50k", help="區間表格列數，逗號分隔，可用 k（預設 1k,10k,50k）")
+    parser.add_argument("--worker-clips", type=int, default=40, help="裁切停頓測試的區間數（copy），預設 40")
+    parser.add_argument("--worker-jobs", type=int, default=fvs.DEFAULT_JOBS, help="裁切停頓測試的並行數")
+    parser.add_argument("--resolution", default="1280x720", help="預覽/裁切測試影片解析度，預設 1280x720")
+    parser.add_argument("--fixtures", help="測試影片存放資料夾（指定時保留並沿用，預設用暫存資料夾）")
+    bench_common.add_common_args(parser, memory=False)
+    args = parser.parse_args()
+    args.sections = [s.strip() for s in args.sections.split(",") if s.strip()]
+    unknown = [s for s in args.sections if s not in SECTIONS]
+    if unknown:
+        parser.error(f"未知的量測項目：{', '.join(unknown)}")
+    args.rows = parse_sizes(args.rows)
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    results: List[dict] = []
+    skipped: dict[str, str] = {}
+    with tempfile.TemporaryDirectory(prefix="fvs_bench_gui_") as tmp:
+        workdir = Path(tmp)
+        # 設定檔（~/.fastvideoslice_settings.json）與快取都寫到暫存資料夾
+        os.environ["HOME"] = str(workdir)
+        os.environ[fvs.CACHE_DIR_ENV] = str(workdir / "cache")
+        try:
+            from PyQt5.QtWidgets import QApplication
+        except ImportError as exc:
+            print(f"[ERR] 需要 PyQt5：{exc}", file=sys.stderr)
+            return 1
+        app = QApplication([sys.argv[0]])
+        app.setStyle("Fusion")
+        from gui.constants import STYLESHEET
+
+        app.setStyleSheet(STYLESHEET)
+
+        video = subs = None
+        if {"preview", "worker"} & set(args.sections):
+            ffmpeg_cmd, _ = fvs.ensure_ffmpeg_exists()
+            fixtures = Path(args.fixtures) if args.fixtures else workdir / "fixtures"
+            fixtures.mkdir(parents=True, exist_ok=True)
+            video = make_fixture(fixtures, ffmpeg_cmd, args.resolution, 2.0, max(60.0, args.worker_clips * 7 + 10))
+            subs = make_subs(workdir / "bench.srt", max(60.0, args.worker_clips * 7 + 10))
+
+        for section in args.sections:
+            print(f"[{section}]", file=sys.stderr)
+            try:
+                if section == "table":
+                    results.extend(bench_table(app, args))
+                elif section == "startup":
+                    results.extend(bench_startup(app, args))
+                elif section == "preview":
+                    results.extend(bench_preview(app, args, video, subs, workdir))
+                else:
+                    results.extend(bench_worker(app, args, video, subs, workdir))
+            except ImportError as exc:
+                # 例如 QtMultimedia 缺少後端時無法匯入主視窗/預覽
+                skipped[section] = str(exc)
+                print(f"  略過：{exc}", file=sys.stderr)
+    params = {
+        "sections": args.sections,
+        "rows": args.rows,
+        "worker_clips": args.worker_clips,
+        "worker_jobs": args.worker_jobs,
+        "resolution": args.resolution,
+        "repeat": args.repeat,
+        "qpa_platform": os.environ.get("QT_QPA_PLATFORM"),
+        "skipped": skipped,
+    }
+    bench_common.finish("gui", args, params, results, KEY_FIELDS, COLUMNS)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+"""
+並行擴展基準測試（吞吐量對並行數曲線）
+
+以同一支產生的測試影片建立固定工作量（大量 copy、大量 precise、兩者混合），
+在遞增的並行數下執行：copy/precise 以 CLI 流程（parse_args + run_cli --jobs N），
+混合工作量以 iter_parallel + extract_clip（與 CLI 相同的並行與裁切函式，逐段指定模式，同 GUI 的每段勾選）。
+每個並行數記錄每分鐘片段數、加速比/效率、CPU 使用率（ffmpeg 子程序 + 本程序）、
+輸出與磁碟讀寫速率，用來判斷何時轉為 CPU 受限或磁碟受限。
+
+範例：
+  python benchmarks/bench_scaling.py --jobs 1,2,4,8 --clips 32 --out scaling.json
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import bench_common
+from bench_extract import cli_args, make_fixture, make_subs
+
+import fast_video_slice as fvs
+
+WORKLOADS = ("copy", "precise", "mix")
+KEY_FIELDS = ["workload", "jobs"]
+# ru_inblock/ru_oublock 以 512 位元組區塊計
+BLOCK_BYTES = 512
+COLUMNS = [
+    ("median_s", lambda res: f"{res['median_s']:.2f}"),
+    ("clips/min", lambda res: f"{res['clips_per_min']:.1f}"),
+    ("speedup", lambda res: f"{res['speedup']:.2f}"),
+    ("efficiency", lambda res: f"{res['efficiency']:.0%}"),
+    ("cpu_util", lambda res: f"{res['cpu_util']:.0%}"),
+    ("out_MB/s", lambda res: f"{res['output_bytes_per_s'] / 1_048_576:.1f}"),
+    ("disk_r_MB/s", lambda res: f"{res['disk_read_bytes_per_s'] / 1_048_576:.1f}"),
+    ("disk_w_MB/s", lambda res: f"{res['disk_write_bytes_per_s'] / 1_048_576:.1f}"),
+]
+
+
+def plan_ranges(count: int, length: float, duration: float) -> List[fvs.TimeRange]:
+    """在影片內平均分布 count 個區間（起點錯開關鍵影格，讓 copy 與 precise 都有實際工作）"""
+    span = max(duration - length, 0.0)
+    step = span / max(count - 1, 1)
+    ranges = []
+    for idx in range(count):
+        start = round(min(idx * step + 0.37, span), 3)
+        ranges.append(
+            fvs.parse_range(f"{fvs.format_ffmpeg_time(start)} -> {fvs.format_ffmpeg_time(start + length)}")
+        )
+    return ranges
+
+
+def snapshot() -> tuple[float, float, resource.struct_rusage]:
+    """（牆鐘時間, 本程序+已回收子程序 CPU 秒數, 子程序 rusage）"""
+    times = os.times()
+    cpu = times.user + times.system + times.children_user + times.children_system
+    return time.perf_counter(), cpu, resource.getrusage(resource.RUSAGE_CHILDREN)
+
+
+def make_runner(
+    workload: str,
+    jobs: int,
+    video: Path,
+    subs: Path,
+    ranges: List[fvs.TimeRange],
+    outdir: Path,
+    ffmpeg_cmd: str,
+    ffprobe_cmd: str,
+    keyframe_index: fvs.KeyframeIndex,
+    mix_every: int,
+) -> Callable[[], None]:
+    if workload != "mix":
+        argv = ["--video", str(video), "--subs", str(subs), "--outdir", str(outdir)]
+        for rng in ranges:
+            argv += ["--range", rng.label]
+        args = cli_args([*argv, "--mode", workload, "--jobs", str(jobs)])
+
+        def run_cli() -> None:
+            if fvs.run_cli(args) != 0:
+                raise RuntimeError(f"{workload} 工作量有區間失敗（jobs={jobs}）")
+
+        return run_cli
+
+    # 每 mix_every 段一段 precise，其餘 copy
+    tasks = [
+        (rng, outdir / f"clip_{idx:03d}.mp4", fvs.MODE_PRECISE if idx % mix_every == 0 else fvs.MODE_COPY)
+        for idx, rng in enumerate(ranges, start=1)
+    ]
+
+    def run_mix() -> None:
+        cues = fvs.load_cues(subs)
+        sliced = fvs.slice_cues_batch(cues, ranges)
+
+        def process(item: tuple[int, tuple[fvs.TimeRange, Path, str]]) -> None:
+            pos, (rng, video_out, mode) = item
+            fvs.extract_clip(video, rng, video_out, mode, False, ffmpeg_cmd, ffprobe_cmd, None, keyframe_index)
+            fvs.write_srt(video_out.with_suffix(".srt"), sliced[pos])
+
+        failed = [item for item, exc in fvs.iter_parallel(process, list(enumerate(tasks)), jobs) if exc]
+        if failed:
+            raise RuntimeError(f"mix 工作量有 {len(failed)} 段失敗（jobs={jobs}）")
+
+    return run_mix
+
+
+def bench_level(run: Callable[[], None], outdir: Path, repeat: int, clips: int, clip_seconds: float) -> dict:
+    times: List[float] = []
+    cpu_total = disk_read = disk_write = output_bytes = 0
+    for _ in range(max(1, repeat)):
+        shutil.rmtree(outdir, ignore_errors=True)
+        outdir.mkdir(parents=True)
+        wall0, cpu0, ru0 = snapshot()
+        run()
+        wall1, cpu1, ru1 = snapshot()
+        times.append(wall1 - wall0)
+        cpu_total += cpu1 - cpu0
+        disk_read += (ru1.ru_inblock - ru0.ru_inblock) * BLOCK_BYTES
+        disk_write += (ru1.ru_oublock - ru0.ru_oublock) * BLOCK_BYTES
+        output_bytes += sum(path.stat().st_size for path in outdir.glob("*.mp4"))
+    total_wall = sum(times)
+    median = sorted(times)[len(times) // 2]
+    return {
+        "min_s": round(min(times), 4),
+        "median_s": round(median, 4),
+        "mean_s": round(total_wall / len(times), 4),
+        "runs": len(times),
+        "clips": clips,
+        "clips_per_min": round(clips / median * 60, 2),
+        "realtime_factor": round(clip_seconds / median, 2),
+        "cpu_seconds": round(cpu_total / len(times), 3),
+        # 以機器的全部核心為 100%
+        "cpu_util": round(cpu_total / total_wall / (os.cpu_count() or 1), 4),
+        "output_bytes_per_s": round(output_bytes / total_wall),
+        "disk_read_bytes_per_s": round(disk_read / total_wall),
+        "disk_write_bytes_per_s": round(disk_write / total_wall),
+    }
+
+
+def ascii_curve(results: List[dict]) -> str:
+    """
+    每種工作量一段，以橫條顯示每分鐘片段數（各自以最大值為滿格）並附 CPU 使用率：
+    吞吐量不再成長而 CPU 已接近滿載是 CPU 受限，CPU 仍有餘裕則多半卡在磁碟或 ffmpeg 啟動
+    """
+    lines = []
+    for workload in WORKLOADS:
+        rows = [res for res in results if res["workload"] == workload]
+        if not rows:
+            continue
+        peak = max(res["clips_per_min"] for res in rows) or 1
+        lines.append(f"{workload}:")
+        for res in rows:
+            bar = "#" * max(1, round(res["clips_per_min"] / peak * 40))
+            lines.append(f"  jobs={res['jobs']:<3} {bar:<40} {res['clips_per_min']:.1f}/min  CPU {res['cpu_util']:.0%}")
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    cpus = os.cpu_count() or 1
+    default_jobs = sorted({1, 2, 4, cpus, cpus * 2})
+    parser = argparse.ArgumentParser(description="並行擴展基準測試（吞吐量對並行數）")
+    parser.add_argument(
+        "--jobs", default=",".join(map(str, default_jobs)), help="並行數，逗號分隔（預設 1,2,4,核心數,2×核心數）"
+    )
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help=f"工作量，逗號分隔：{', '.join(WORKLOADS)}")
+    parser.add_argument("--clips", type=int, default=24, help="每種工作量的片段數，預設 24")
+    parser.add_argument("--clip-length", type=float, default=4.0, help="片段長度（秒），預設 4")
+    parser.add_argument("--mix-every", type=int, default=2, help="mix 工作量中每幾段一段 precise，預設 2（一半）")
+    parser.add_argument("--resolution", default="1280x720", help="測試影片解析度，預設 1280x720")
+    parser.add_argument("--gop", type=float, default=2.0, help="測試影片關鍵影格間隔（秒），預設 2")
+    parser.add_argument("--duration", type=float, default=120.0, help="測試影片長度（秒），預設 120")
+    parser.add_argument("--fixtures", help="測試影片存放資料夾（指定時保留並沿用，預設用暫存資料夾）")
+    bench_common.add_common_args(parser, default_repeat=1, memory=False)
+    args = parser.parse_args()
+    args.jobs = sorted({int(part) for part in args.jobs.split(",") if part.strip()})
+    args.workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = [w for w in args.workloads if w not in WORKLOADS]
+    if unknown:
+        parser.error(f"未知的工作量：{', '.join(unknown)}")
+    if not args.jobs or min(args.jobs) < 1 or args.clips < 1 or args.mix_every < 1:
+        parser.error("--jobs、--clips、--mix-every 需為 1 以上的整數")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    results: List[dict] = []
+    with tempfile.TemporaryDirectory(prefix="fvs_bench_scaling_") as tmp:
+        workdir = Path(tmp)
+        os.environ[fvs.CACHE_DIR_ENV] = str(workdir / "cache")
+        ffmpeg_cmd, ffprobe_cmd = fvs.ensure_ffmpeg_exists()
+        fixtures = Path(args.fixtures) if args.fixtures else workdir / "fixtures"
+        fixtures.mkdir(parents=True, exist_ok=True)
+        video = make_fixture(fixtures, ffmpeg_cmd, args.resolution, args.gop, args.duration)
+        subs = make_subs(workdir / "bench.srt", args.duration)
+        # 先建立關鍵影格索引快取，precise 在各並行數下都使用相同的兩段式 seek
+        keyframe_index = fvs.load_keyframe_index(video, ffprobe_cmd)
+        ranges = plan_ranges(args.clips, args.clip_length, args.duration)
+        clip_seconds = sum(rng.end - rng.start for rng in ranges)
+        outdir = workdir / "out"
+        for workload in args.workloads:
+            baseline = None
+            for jobs in args.jobs:
+                run = make_runner(
+                    workload, jobs, video, subs, ranges, outdir, ffmpeg_cmd, ffprobe_cmd, keyframe_index, args.mix_every
+                )
+                res = {"workload": workload, "jobs": jobs, **bench_level(run, outdir, args.repeat, len(ranges), clip_seconds)}
+                baseline = baseline or res["median_s"]
+                res["speedup"] = round(baseline / res["median_s"], 3)
+                res["efficiency"] = round(res["speedup"] / jobs, 3)
+                results.append(res)
+                print(
+                    f"  {workload:<8} jobs={jobs:<3} {res['median_s']:.2f}s {res['clips_per_min']:.1f} 段/分 "
+                    f"CPU {res['cpu_util']:.0%}",
+                    file=sys.stderr,
+                )
+    params = {
+        "jobs": args.jobs,
+        "workloads": args.workloads,
+        "clips": args.clips,
+        "clip_length": args.clip_length,
+        "mix_every": args.mix_every,
+        "resolution": args.resolution,
+        "gop": args.gop,
+        "duration": args.duration,
+        "repeat": args.repeat,
+    }
+    bench_common.finish("scaling", args, params, results, KEY_FIELDS, COLUMNS)
+    print(ascii_curve(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
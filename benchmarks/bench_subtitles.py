@@ -0,0 +1,196 @@
+"""
+字幕引擎基準測試
+
+產生指定條數的合成 SRT（多行文字、中英混排，可選 BOM + CRLF），
+量測 read_srt、parse_srt_time_range、load_cues（冷/熱快取）、slice_cues（多區間）、
+slice_cues_batch、format_srt 與 write_srt 的耗時與 Python 峰值記憶體，結果可輸出成 JSON 互相比較。
+
+範例：
+  python benchmarks/bench_subtitles.py --sizes 1000,100000 --out bench_srt.json
+  python benchmarks/bench_subtitles.py --sizes 1000,100000 --compare bench_srt.json
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, List
+
+import bench_common
+
+import fast_video_slice as fvs
+
+VARIANTS = {
+    "plain": {"bom": False, "newline": "\n"},
+    "bom_crlf": {"bom": True, "newline": "\r\n"},
+}
+WORDS = [
+    "影片", "字幕", "切片", "關鍵影格", "測試", "時間軸", "你好", "今天", "我們",
+    "hello", "world", "clip", "subtitle", "range", "frame", "quick", "brown", "fox",
+]
+# 逐條掃描的 slice_cues 為 O(區間數 × 字幕數)，超過此乘積時略過以免跑太久
+SCAN_LIMIT = 20_000_000
+KEY_FIELDS = ["case", "cues", "variant"]
+
+
+def generate_srt(path: Path, count: int, variant: str, seed: int) -> float:
+    """寫出 count 條合成字幕（1~3 行），回傳最後一條的結束秒數"""
+    rng = random.Random(seed)
+    spec = VARIANTS[variant]
+    newline = spec["newline"]
+    t_ms = 0
+    chunk: List[str] = []
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        if spec["bom"]:
+            handle.write("\ufeff")
+        for idx in range(1, count + 1):
+            t_ms += rng.randint(200, 1500)
+            end_ms = t_ms + rng.randint(800, 4000)
+            lines = [" ".join(rng.choices(WORDS, k=rng.randint(2, 8))) for _ in range(rng.randint(1, 3))]
+            chunk.append(str(idx))
+            chunk.append(f"{fvs.format_srt_time_ms(t_ms)} --> {fvs.format_srt_time_ms(end_ms)}")
+            chunk.extend(lines)
+            chunk.append("")
+            t_ms = end_ms
+            if len(chunk) > 20_000:
+                handle.write(newline.join(chunk) + newline)
+                chunk = []
+        handle.write(newline.join(chunk))
+    return t_ms / 1000.0
+
+
+def generate_ranges(total: float, count: int, seed: int) -> List[fvs.TimeRange]:
+    """在字幕總長內隨機產生 count 個 5~60 秒的區間（順序不排序，接近實際輸入）"""
+    rng = random.Random(seed + 1)
+    ranges: List[fvs.TimeRange] = []
+    for _ in range(count):
+        length = rng.uniform(5.0, 60.0)
+        start = round(rng.uniform(0.0, max(total - length, 0.0)), 3)
+        end = round(start + length, 3)
+        ranges.append(fvs.TimeRange(start=start, end=end, label=f"{start}-{end}"))
+    return ranges
+
+
+def timing_lines(path: Path) -> List[str]:
+    """取出所有時間行，讓 parse_srt_time_range 單獨量測"""
+    with path.open(encoding="utf-8-sig") as handle:
+        return [line for line in handle if "-->" in line]
+
+
+def bench_file(path: Path, count: int, variant: str, args: argparse.Namespace, workdir: Path) -> List[dict]:
+    total = generate_srt(path, count, variant, args.seed)
+    file_bytes = path.stat().st_size
+    ranges = generate_ranges(total, args.ranges, args.seed)
+    lines = timing_lines(path)
+    cue_list = fvs.read_srt(path)
+    store = fvs.CueStore.from_cues(cue_list)
+    list_index = fvs.CueIndex(cue_list)
+    store_index = fvs.CueIndex(store)
+    out_path = workdir / "out.srt"
+    cue_cache = fvs.cache_dir() / "cues"
+
+    def drop_cue_cache() -> None:
+        shutil.rmtree(cue_cache, ignore_errors=True)
+
+    def warm_cue_cache() -> None:
+        fvs.load_cues(path)
+
+    cases: List[tuple[str, Callable[[], object], Callable[[], object] | None]] = [
+        ("read_srt", lambda: fvs.read_srt(path), None),
+        ("parse_srt_time_range", lambda: [fvs.parse_srt_time_range(line) for line in lines], None),
+        ("load_cues_cold", lambda: fvs.load_cues(path), drop_cue_cache),
+        ("load_cues_warm", lambda: fvs.load_cues(path), warm_cue_cache),
+        ("cue_index_build", lambda: fvs.CueIndex(store), None),
+        ("slice_cues_index_list", lambda: [fvs.slice_cues(list_index, rng) for rng in ranges], None),
+        ("slice_cues_index_store", lambda: [fvs.slice_cues(store_index, rng) for rng in ranges], None),
+        ("slice_cues_batch", lambda: fvs.slice_cues_batch(store, ranges), None),
+        ("format_srt_list", lambda: fvs.format_srt(cue_list), None),
+        ("format_srt_store", lambda: fvs.format_srt(store), None),
+        ("write_srt", lambda: fvs.write_srt(out_path, store), None),
+    ]
+    if count * len(ranges) <= SCAN_LIMIT:
+        cases.insert(5, ("slice_cues_scan", lambda: [fvs.slice_cues(cue_list, rng) for rng in ranges], None))
+
+    results: List[dict] = []
+    for name, func, setup in cases:
+        if args.cases and name not in args.cases:
+            continue
+        stats = bench_common.measure(func, args.repeat, setup)
+        # slice 類以「字幕數 × 區間數」計量沒有意義，per_cue 一律以字幕條數為分母方便跨規模比較
+        result = {
+            "case": name,
+            "cues": count,
+            "variant": variant,
+            "file_bytes": file_bytes,
+            "ranges": len(ranges) if name.startswith("slice") else None,
+            **stats,
+            "per_cue_us": round(stats["median_s"] / count * 1e6, 4),
+            "peak_heap_bytes": None if args.no_memory else bench_common.peak_heap(func, setup),
+        }
+        results.append(result)
+        print(f"  {name:<24} {stats['median_s']:.4f}s", file=sys.stderr)
+    return results
+
+
+def parse_sizes(text: str) -> List[int]:
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        scale = 1
+        if part.endswith("k"):
+            scale, part = 1_000, part[:-1]
+        elif part.endswith("m"):
+            scale, part = 1_000_000, part[:-1]
+        sizes.append(int(part) * scale)
+    return sizes
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="字幕引擎基準測試（合成 SRT）")
+    parser.add_argument("--sizes", default="1k,10k,100k", help="字幕條數，逗號分隔，可用 k/m（例：1k,100k,1m）")
+    parser.add_argument(
+        "--variants", default="plain,bom_crlf", help=f"檔案格式變化，逗號分隔：{', '.join(VARIANTS)}"
+    )
+    parser.add_argument("--ranges", type=int, default=1000, help="切片區間數，預設 1000")
+    parser.add_argument("--seed", type=int, default=1234, help="亂數種子（相同種子產生相同檔案與區間）")
+    parser.add_argument("--cases", help="只跑指定案例，逗號分隔（例：read_srt,slice_cues_batch）")
+    bench_common.add_common_args(parser)
+    args = parser.parse_args()
+    args.sizes = parse_sizes(args.sizes)
+    args.variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in args.variants if v not in VARIANTS]
+    if unknown:
+        parser.error(f"未知的格式變化：{', '.join(unknown)}")
+    args.cases = {c.strip() for c in args.cases.split(",")} if args.cases else None
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="fvs_bench_srt_") as tmp:
+        workdir = Path(tmp)
+        # 快取寫到暫存資料夾，不影響使用者的 ~/.cache/fastvideoslice
+        os.environ[fvs.CACHE_DIR_ENV] = str(workdir / "cache")
+        results: List[dict] = []
+        for count in args.sizes:
+            for variant in args.variants:
+                print(f"[{count} 條 / {variant}]", file=sys.stderr)
+                results.extend(bench_file(workdir / f"bench_{count}_{variant}.srt", count, variant, args, workdir))
+    params = {
+        "sizes": args.sizes,
+        "variants": args.variants,
+        "ranges": args.ranges,
+        "seed": args.seed,
+        "repeat": args.repeat,
+    }
+    bench_common.finish("subtitles", args, params, results, KEY_FIELDS)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,19 +9,87 @@ Usage example:
 """
 
 import argparse
+import atexit
+import bisect
+import contextlib
+import hashlib
+import itertools
+import json
+import math
+import mmap
 import os
 import re
 import shutil
+import struct
 import subprocess
 import sys
-from dataclasses import dataclass
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List, Sequence
-from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Sequence, TypeVar
+from functools import lru_cache, wraps
 
 # 預設用於解讀小數部分為「影格」的 fps；例如 00:00:01.15 在 30fps 下代表第 15 格。
 DEFAULT_FPS = 30
 
+# 預設同時執行的 ffmpeg 數量（1 = 逐段處理，與舊行為相同）
+DEFAULT_JOBS = 1
+
+# 批次 copy 模式下，單一 ffmpeg 程序最多輸出的區間數（避免命令列過長、同時開啟過多輸入）
+COPY_BATCH_MAX_OUTPUTS = 16
+
+# 輸出模式：copy（關鍵影格、無損）/ precise（整段重編碼）/ smart（只重編碼開頭不完整的 GOP）
+MODE_COPY = "copy"
+MODE_PRECISE = "precise"
+MODE_SMART = "smart"
+OUTPUT_MODES = (MODE_COPY, MODE_PRECISE, MODE_SMART)
+
+# 重編碼時的粗略 seek 提前量（無關鍵影格索引時使用）：輸入端先快速跳到起點前這麼多秒，
+# 再由輸出端 -ss 精準裁掉剩餘部分，解碼量不隨區間在片中的位置成長
+SEEK_MARGIN_SEC = 5.0
+
+# 智慧輸出支援的來源編碼與對應的軟體編碼器（開頭片段需與 copy 部分同編碼）
+SMART_RENDER_ENCODERS = {"h264": "libx264", "hevc": "libx265"}
+
+# 預覽代理檔：整支來源轉成 360p 全 I 影格（每格都是關鍵影格），任何區間都能以 copy 精準到影格切出
+PROXY_HEIGHT = 360
+PROXY_VIDEO_ARGS = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "30", "-g", "1", "-pix_fmt", "yuv420p"]
+# 代理檔轉檔中的暫存檔；超過此秒數未寫入視為中斷留下的（轉檔中的 ffmpeg 會持續寫入）
+PROXY_TMP_SUFFIX = ".tmp.mp4"
+PROXY_ORPHAN_AGE = 600.0
+
+# 邊轉邊播預覽：片段式 MP4 每個片段的秒數（同時以此間隔強制關鍵影格）
+STREAM_FRAGMENT_SEC = 1.0
+
+# 快取資料夾（關鍵影格索引等），可用環境變數覆寫
+CACHE_DIR_ENV = "FVS_CACHE_DIR"
+
+# 設定後（GUI 啟動時）會記錄各階段計時並在結束時寫成 Chrome trace JSON
+TRACE_ENV = "FVS_TRACE"
+
+# 關鍵影格索引檔：magic、影片長度（秒）、關鍵影格數，其後為 float64 秒數陣列
+_KEYFRAME_MAGIC = b"FVSKF001"
+_KEYFRAME_HEADER = struct.Struct("<8sdQ")
+
+# 字幕二進位快取：檔頭（魔數、字幕數、不重複文字數、文字區塊位元組數）後接
+# 起/訖毫秒、文字編號、文字位移、行數陣列與 UTF-8 文字區塊（陣列為本機位元組序）
+_CUE_MAGIC = b"FVSCUE02"
+_CUE_HEADER = struct.Struct("<8sQQQ")
+
+# 媒體資訊快取格式版本（欄位變動時遞增，舊快取自動重新探測）
+_MEDIA_INFO_VERSION = 1
+
+# ffmpeg 能力快取（ffmpeg/<二進位識別>.json）與 PATH 搜尋結果（ffmpeg/paths.json）的格式版本
+_FF_CACHE_VERSION = 1
+
+T = TypeVar("T")
+
 
 @dataclass
 class HWAccelConfig:
@@ -47,10 +115,455 @@ class SRTCue:
     lines: List[str]
 
 
+@dataclass
+class KeyframeIndex:
+    duration: float  # seconds
+    keyframes: array  # 影像關鍵影格時間（秒，遞增）
+
+    def prev_keyframe(self, t: float) -> float:
+        """t 當下或之前最近的關鍵影格（copy 模式實際的起點）"""
+        pos = bisect.bisect_right(self.keyframes, t + 1e-6)
+        return self.keyframes[pos - 1] if pos > 0 else 0.0
+
+    def next_keyframe(self, t: float) -> float | None:
+        """t 當下或之後最近的關鍵影格，沒有則回傳 None"""
+        pos = bisect.bisect_left(self.keyframes, t - 1e-6)
+        return self.keyframes[pos] if pos < len(self.keyframes) else None
+
+    def copy_window(self, rng: "TimeRange") -> tuple[float, float]:
+        """copy 模式實際輸出的起訖（起點吸附到前一個關鍵影格）"""
+        return self.prev_keyframe(rng.start), min(rng.end, self.duration)
+
+    def gop_stats(self) -> tuple[float, float] | None:
+        """關鍵影格間隔（秒）的 (平均, 最大)；少於兩個關鍵影格時回傳 None"""
+        if len(self.keyframes) < 2:
+            return None
+        gaps = [b - a for a, b in zip(self.keyframes, self.keyframes[1:])]
+        return sum(gaps) / len(gaps), max(gaps)
+
+
+@dataclass
+class StreamInfo:
+    index: int
+    codec_type: str  # video / audio / subtitle / data
+    codec_name: str
+    pix_fmt: str | None = None
+    width: int | None = None
+    height: int | None = None
+    frame_rate: float | None = None  # 平均影格率（fps）
+    bit_rate: int | None = None
+    sample_rate: int | None = None
+    channels: int | None = None
+
+
+@dataclass
+class MediaInfo:
+    duration: float  # seconds
+    format_name: str
+    bit_rate: int | None
+    streams: List[StreamInfo] = field(default_factory=list)
+    gop_avg: float | None = None  # 關鍵影格平均間隔（秒），有關鍵影格索引時才會填入
+    gop_max: float | None = None
+
+    @property
+    def video(self) -> StreamInfo | None:
+        return next((st for st in self.streams if st.codec_type == "video"), None)
+
+    @property
+    def audio(self) -> StreamInfo | None:
+        return next((st for st in self.streams if st.codec_type == "audio"), None)
+
+    @property
+    def copy_batchable(self) -> bool:
+        """
+        批次 copy 只對應各輸入的第一軌影像/音訊；來源有多軌影像/音訊或字幕軌時，
+        逐段 copy 的 ffmpeg 預設選流（最佳影像/音訊軌、字幕軌）會不同，輸出不一致。
+        """
+        kinds = [st.codec_type for st in self.streams]
+        return kinds.count("video") <= 1 and kinds.count("audio") <= 1 and "subtitle" not in kinds
+
+    def summary(self) -> str:
+        """一行摘要，供 log 顯示"""
+        parts = [f"{self.duration:.2f} 秒"]
+        video = self.video
+        if video:
+            desc = video.codec_name
+            if video.width and video.height:
+                desc += f" {video.width}x{video.height}"
+            if video.frame_rate:
+                desc += f" {video.frame_rate:.3g}fps"
+            parts.append(desc)
+        audio = self.audio
+        if audio:
+            parts.append(f"{audio.codec_name} {audio.channels}ch" if audio.channels else audio.codec_name)
+        if self.bit_rate:
+            parts.append(f"{self.bit_rate / 1_000_000:.1f} Mbps")
+        if self.gop_avg is not None:
+            parts.append(f"GOP 平均 {self.gop_avg:.2f}s / 最長 {self.gop_max:.2f}s")
+        return "，".join(parts)
+
+
+@dataclass
+class FFmpegProgress:
+    """ffmpeg `-progress` 的一筆進度回報"""
+
+    out_time: float = 0.0  # 已輸出的時間（秒）
+    frames: int = 0
+    fps: float = 0.0
+    speed: float | None = None  # 相對即時播放的倍速；ffmpeg 尚未估出時為 None
+    total_size: int = 0  # 已寫入的位元組數
+    done: bool = False  # ffmpeg 回報 progress=end
+
+    def fraction(self, duration: float) -> float:
+        """依區間長度換算完成比例（0~1）"""
+        if self.done:
+            return 1.0
+        return min(1.0, self.out_time / duration) if duration > 0 else 0.0
+
+    def eta(self, duration: float) -> float | None:
+        """依目前倍速估計剩餘秒數"""
+        if self.done:
+            return 0.0
+        if not self.speed:
+            return None
+        return max(0.0, duration - self.out_time) / self.speed
+
+
+ProgressCallback = Callable[[FFmpegProgress], None]
+
+
+@dataclass
+class FFmpegCapabilities:
+    path: str
+    version: str
+    encoders: List[str] = field(default_factory=list)
+    filters: List[str] = field(default_factory=list)
+    muxers: List[str] = field(default_factory=list)
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+    def has_muxer(self, name: str) -> bool:
+        return name in self.muxers
+
+
+class _BlobTexts:
+    """字幕快取中的文字表：依編號從 UTF-8 區塊解碼出一段字幕的各行"""
+
+    __slots__ = ("_offsets", "_line_counts", "_blob")
+
+    def __init__(self, offsets: memoryview, line_counts: memoryview, blob: memoryview) -> None:
+        self._offsets = offsets
+        self._line_counts = line_counts
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._line_counts)
+
+    def __getitem__(self, i: int) -> tuple[str, ...]:
+        if not self._line_counts[i]:
+            return ()
+        return tuple(str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8").split("\n"))
+
+
+class CueStore:
+    """
+    欄式字幕容器：起訖為整數毫秒陣列，文字去重後放在共用的文字表，每條字幕只記文字編號。
+    可當 SRTCue 序列使用（slice_cues / format_srt / CueIndex），逐條存取時才組出 SRTCue；
+    切片結果共用同一份文字表，時間平移與輸出都以整數毫秒計算。
+    """
+
+    __slots__ = ("starts_ms", "ends_ms", "text_ids", "texts", "_buffer")
+
+    def __init__(self, starts_ms=None, ends_ms=None, text_ids=None, texts=None, buffer=None) -> None:
+        self.starts_ms = starts_ms if starts_ms is not None else array("q")
+        self.ends_ms = ends_ms if ends_ms is not None else array("q")
+        self.text_ids = text_ids if text_ids is not None else array("I")
+        self.texts = texts if texts is not None else []
+        self._buffer = buffer  # mmap 來源需與檢視同生命週期
+
+    @classmethod
+    def from_cues(cls, cues: Iterable[SRTCue]) -> "CueStore":
+        """由 SRTCue（可為串流）建立，相同文字只存一份"""
+        store = cls()
+        interned: dict[tuple[str, ...], int] = {}
+        for cue in cues:
+            text = tuple(cue.lines)
+            text_id = interned.get(text)
+            if text_id is None:
+                text_id = interned[text] = len(store.texts)
+                store.texts.append(text)
+            store.starts_ms.append(round(cue.start * 1000))
+            store.ends_ms.append(round(cue.end * 1000))
+            store.text_ids.append(text_id)
+        return store
+
+    @classmethod
+    def from_buffer(cls, buffer) -> "CueStore":
+        """讀取 to_bytes 的格式（通常為 mmap），陣列直接映射，不複製也不解碼文字"""
+        view = memoryview(buffer)
+        magic, count, text_count, blob_size = _CUE_HEADER.unpack_from(view)
+        if magic != _CUE_MAGIC:
+            raise ValueError("not a cue cache")
+        layout = (
+            ("q", 8, count),
+            ("q", 8, count),
+            ("I", 4, count),
+            ("Q", 8, text_count + 1),
+            ("I", 4, text_count),
+        )
+        # 截斷或損毀的快取在 cast 前就要擋下（cast 遇到長度不符會丟 TypeError）
+        if _CUE_HEADER.size + sum(size * length for _, size, length in layout) + blob_size != len(view):
+            raise ValueError("truncated cue cache")
+        pos = _CUE_HEADER.size
+        columns = []
+        for fmt, size, length in layout:
+            if pos + size * length > len(view):
+                raise ValueError("truncated cue cache")
+            columns.append(view[pos:pos + size * length].cast(fmt))
+            pos += size * length
+        blob = view[pos:pos + blob_size]
+        starts, ends, text_ids, offsets, line_counts = columns
+        return cls(starts, ends, text_ids, _BlobTexts(offsets, line_counts, blob), buffer)
+
+    def to_bytes(self) -> bytes:
+        offsets, line_counts = array("Q", [0]), array("I")
+        blob = bytearray()
+        for text in self.texts:
+            blob += "\n".join(text).encode("utf-8")
+            offsets.append(len(blob))
+            line_counts.append(len(text))
+        header = _CUE_HEADER.pack(_CUE_MAGIC, len(self.starts_ms), len(line_counts), len(blob))
+        columns = [self.starts_ms, self.ends_ms, self.text_ids, offsets, line_counts]
+        return b"".join([header, *(column.tobytes() for column in columns), bytes(blob)])
+
+    def __len__(self) -> int:
+        return len(self.starts_ms)
+
+    def __getitem__(self, i: int) -> SRTCue:
+        return SRTCue(
+            start=_ms_to_seconds(self.starts_ms[i]),
+            end=_ms_to_seconds(self.ends_ms[i]),
+            lines=list(self.texts[self.text_ids[i]]),
+        )
+
+    def __iter__(self) -> Iterator[SRTCue]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def clip(self, positions: Iterable[int], rng: "TimeRange") -> "CueStore":
+        """
+        取出指定字幕並裁切到區間內、平移到以區間起點為 0（整數毫秒運算）。
+        起點以毫秒取整；被區間終點截斷的字幕，終點用區間長度換算，與逐條浮點計算的輸出一致。
+        """
+        start_ms = round(rng.start * 1000)
+        limit_ms = round((rng.end - rng.start) * 1000)
+        starts, ends, ids = array("q"), array("q"), array("I")
+        for i in positions:
+            starts.append(max(self.starts_ms[i], start_ms) - start_ms)
+            ends.append(min(self.ends_ms[i] - start_ms, limit_ms))
+            ids.append(self.text_ids[i])
+        return CueStore(starts, ends, ids, self.texts, self._buffer)
+
+
+class CueIndex:
+    """
+    字幕區間索引：read_srt 後建立一次，之後區間查詢與時間點查詢皆為 O(log n + k)。
+    依開始時間排序後二分搜尋上界，再以「子樹最大結束時間」的隱式線段樹略過不相交的字幕；
+    查詢結果維持原始字幕順序。
+    """
+
+    def __init__(self, cues: Iterable[SRTCue]) -> None:
+        if isinstance(cues, CueStore):
+            # 只讀起訖陣列建立索引，文字留到查詢命中時才解碼
+            self.cues = cues
+            starts = _ms_list_to_seconds(cues.starts_ms)
+            ends = _ms_list_to_seconds(cues.ends_ms)
+        else:
+            self.cues = list(cues)
+            starts = [cue.start for cue in self.cues]
+            ends = [cue.end for cue in self.cues]
+        self._order = sorted(range(len(starts)), key=starts.__getitem__)
+        self._starts = [starts[i] for i in self._order]
+        size = 1
+        while size < len(self._order):
+            size *= 2
+        self._size = size
+        max_end = [-math.inf] * (2 * size)
+        for pos, i in enumerate(self._order):
+            max_end[size + pos] = ends[i]
+        for node in range(size - 1, 0, -1):
+            max_end[node] = max(max_end[2 * node], max_end[2 * node + 1])
+        self._max_end = max_end
+
+    def __len__(self) -> int:
+        return len(self.cues)
+
+    def _matching(self, hi: int, threshold: float, inclusive: bool) -> List[int]:
+        """排序位置 < hi 且結束時間 > threshold（inclusive 時為 >=）的字幕原始序號"""
+        found: List[int] = []
+        stack = [(1, 0, self._size)] if hi > 0 else []
+        while stack:
+            node, lo, width = stack.pop()
+            end = self._max_end[node]
+            if lo >= hi or end < threshold or (end == threshold and not inclusive):
+                continue
+            if width == 1:
+                found.append(self._order[lo])
+                continue
+            half = width // 2
+            stack.append((2 * node + 1, lo + half, half))
+            stack.append((2 * node, lo, half))
+        found.sort()
+        return found
+
+    def positions(self, start: float, end: float) -> List[int]:
+        """與 (start, end) 有交集的字幕（不含僅相接者）的原始序號，遞增"""
+        hi = bisect.bisect_left(self._starts, end)
+        return self._matching(hi, start, inclusive=False)
+
+    def overlapping(self, start: float, end: float) -> List[SRTCue]:
+        """與 (start, end) 有交集的字幕，依原始順序"""
+        return [self.cues[i] for i in self.positions(start, end)]
+
+    def at(self, t: float) -> SRTCue | None:
+        """時間點 t 顯示中的字幕（含起訖邊界）；重疊時取原始順序中的第一條"""
+        hi = bisect.bisect_right(self._starts, t)
+        found = self._matching(hi, t, inclusive=True)
+        return self.cues[found[0]] if found else None
+
+
 class UserError(Exception):
     """User-facing errors with friendly messages."""
 
 
+class Tracer:
+    """
+    收集各階段的計時區段（可跨執行緒），輸出為 Chrome trace-event JSON，
+    可用 chrome://tracing 或 Perfetto 開啟。
+    """
+
+    def __init__(self) -> None:
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._events: List[dict] = []
+        self._threads: dict[int, str] = {}
+
+    def record(self, name: str, start: float, end: float | None = None, **args) -> None:
+        """記錄一段已結束的區段；start/end 為 time.perf_counter() 的值"""
+        end = time.perf_counter() if end is None else end
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": "fvs",
+            "ph": "X",
+            "ts": round((start - self._origin) * 1_000_000, 1),
+            "dur": round((end - start) * 1_000_000, 1),
+            "pid": self._pid,
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = {
+                key: value if isinstance(value, (int, float, str, bool)) or value is None else str(value)
+                for key, value in args.items()
+            }
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, **args)
+
+    def to_chrome_trace(self) -> dict:
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome_trace(), ensure_ascii=False), encoding="utf-8")
+
+
+_active_tracer: Tracer | None = None
+
+
+def start_tracing() -> Tracer:
+    """開始記錄（已在記錄時沿用同一個 Tracer）"""
+    global _active_tracer
+    if _active_tracer is None:
+        _active_tracer = Tracer()
+    return _active_tracer
+
+
+def stop_tracing() -> Tracer | None:
+    """停止記錄並回傳收集到的 Tracer"""
+    global _active_tracer
+    tracer, _active_tracer = _active_tracer, None
+    return tracer
+
+
+def start_tracing_from_env() -> Path | None:
+    """FVS_TRACE 有設定時開始記錄，並在程式結束時寫到該路徑"""
+    env_path = os.environ.get(TRACE_ENV)
+    if not env_path:
+        return None
+    path = Path(env_path)
+    tracer = start_tracing()
+
+    def write_at_exit() -> None:
+        try:
+            tracer.write(path)
+        except OSError:
+            pass
+
+    atexit.register(write_at_exit)
+    return path
+
+
+def trace_span(name: str, **args):
+    """計時區段；未開始記錄時是空的 context manager"""
+    tracer = _active_tracer
+    return tracer.span(name, **args) if tracer is not None else contextlib.nullcontext()
+
+
+def trace_record(name: str, start: float, end: float | None = None, **args) -> None:
+    """記錄非 with 區塊可包住的區段（例如非同步程序），未開始記錄時忽略"""
+    tracer = _active_tracer
+    if tracer is not None:
+        tracer.record(name, start, end, **args)
+
+
+def traced(name: str):
+    """將整個函式記錄為一個計時區段"""
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _active_tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
 def parse_hms(text: str, fps: int = DEFAULT_FPS) -> float:
     """
     解析時間字串，支援：
@@ -99,6 +612,7 @@ def parse_range(text: str) -> TimeRange:
     return TimeRange(start=start, end=end, label=text, title=title_part, safe_title=safe_title)
 
 
+@traced("check_files")
 def check_files(video_path: Path, subs_path: Path) -> None:
     if not video_path.exists():
         raise UserError(f"找不到影片檔: {video_path}")
@@ -112,25 +626,79 @@ def check_files(video_path: Path, subs_path: Path) -> None:
         raise UserError("字幕檔格式不支援（僅接受 .srt）")
 
 
-def read_srt(path: Path) -> List[SRTCue]:
-    try:
-        raw = path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        raise UserError("字幕檔不是 UTF-8，請先轉檔再試")
-    # 移除 BOM 以避免首行 cue 序號被污染
-    if raw.startswith("\ufeff"):
-        raw = raw.lstrip("\ufeff")
-    blocks = re.split(r"(?:\r?\n){2,}", raw.strip())
-    cues: List[SRTCue] = []
-    for block in blocks:
-        lines = [line.lstrip("\ufeff") for line in block.splitlines()]
+def _iter_srt_blocks(path: Path) -> Iterator[tuple[list[int], list[str]]]:
+    """
+    逐行讀取字幕檔，依空白行切出字幕區塊，回傳 (各行行號, 各行文字)。
+    檔案以緩衝區逐段讀入，記憶體只保留目前區塊；檔首/檔尾空白的修剪與舊的整檔讀取一致。
+    """
+    numbers: list[int] = []
+    lines: list[str] = []
+    # 已結束但尚未輸出的區塊：最後一個有內容的區塊及其後只有空白的區塊，
+    # 要到出現下一個有內容的區塊才確定它們不在檔尾
+    held: list[tuple[list[int], list[str]]] = []
+    closed = False  # 目前區塊後已遇到空行，下一個非空行開始新區塊
+    leading = True  # 檔首的空白（含空白行）略過
+    with path.open("r", encoding="utf-8") as handle:
+        for lineno, line in enumerate(handle, start=1):
+            line = line.rstrip("\n")
+            if lineno == 1:
+                # 移除 BOM 以避免首行 cue 序號被污染
+                line = line.lstrip("\ufeff")
+            if leading:
+                line = line.lstrip()
+                if not line:
+                    continue
+                leading = False
+            if not line:
+                closed = True
+                continue
+            if closed:
+                if any(text.strip() for text in lines):
+                    yield from held
+                    held = []
+                held.append((numbers, lines))
+                numbers, lines = [], []
+                closed = False
+            parts = line.splitlines()
+            numbers.extend([lineno] * len(parts))
+            lines.extend(parts)
+    held.append((numbers, lines))
+    # 檔尾的空白不屬於最後一個有內容的區塊
+    while held and not any(text.strip() for text in held[-1][1]):
+        held.pop()
+    if held:
+        numbers, lines = held[-1]
+        while not lines[-1].strip():
+            numbers.pop()
+            lines.pop()
+        lines[-1] = lines[-1].rstrip()
+        yield from held
+
+
+def iter_srt(path: Path) -> Iterator[SRTCue]:
+    """逐條產生字幕（串流解析，峰值記憶體取決於最大的單條字幕而非檔案大小）"""
+    blocks = _iter_srt_blocks(path)
+    while True:
+        try:
+            numbers, block = next(blocks)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            raise UserError("字幕檔不是 UTF-8，請先轉檔再試")
+        lines = [line.lstrip("\ufeff") for line in block]
         if len(lines) < 2:
             continue
-        times_line = lines[1] if lines[0].strip().isdigit() else lines[0]
-        text_lines = lines[2:] if lines[0].strip().isdigit() else lines[1:]
-        start, end = parse_srt_time_range(times_line)
-        cues.append(SRTCue(start=start, end=end, lines=text_lines))
-    return cues
+        offset = 1 if lines[0].strip().isdigit() else 0
+        try:
+            start, end = parse_srt_time_range(lines[offset])
+        except UserError as exc:
+            raise UserError(f"字幕第 {numbers[offset]} 行：{exc}") from None
+        yield SRTCue(start=start, end=end, lines=lines[offset + 1:])
+
+
+@traced("read_srt")
+def read_srt(path: Path) -> List[SRTCue]:
+    return list(iter_srt(path))
 
 
 def parse_srt_time(time_str: str) -> float:
@@ -143,6 +711,19 @@ def parse_srt_time(time_str: str) -> float:
     return h * 3600 + m * 60 + s + ms / 1000.0
 
 
+def _ms_to_seconds(total_ms: int) -> float:
+    """
+    整數毫秒轉秒；與 parse_srt_time 同樣是「整數秒 + 毫秒/1000」，
+    確保與直接解析得到的浮點值完全一致（區間邊界比較才不會差一個 ulp）。
+    """
+    total_seconds, ms = divmod(total_ms, 1000)
+    return total_seconds + ms / 1000.0
+
+
+def _ms_list_to_seconds(values: Iterable[int]) -> List[float]:
+    return [sec + ms / 1000.0 for sec, ms in map(divmod, values, itertools.repeat(1000))]
+
+
 def parse_srt_time_range(line: str) -> tuple[float, float]:
     match = re.fullmatch(r"(.*?)\s*-->\s*(.*)", line.strip())
     if not match:
@@ -153,7 +734,10 @@ def parse_srt_time_range(line: str) -> tuple[float, float]:
 
 
 def _split_time_ms(seconds: float) -> tuple[int, int, int, int]:
-    total_ms = int(round(seconds * 1000))
+    return _split_ms(int(round(seconds * 1000)))
+
+
+def _split_ms(total_ms: int) -> tuple[int, int, int, int]:
     total_seconds, ms = divmod(total_ms, 1000)
     s = total_seconds % 60
     total_minutes = total_seconds // 60
@@ -179,7 +763,27 @@ def format_srt_time(seconds: float) -> str:
     return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
 
 
-def slice_cues(cues: Sequence[SRTCue], rng: TimeRange) -> List[SRTCue]:
+def format_srt_time_ms(total_ms: int) -> str:
+    h, m, s, ms = _split_ms(total_ms)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+@traced("slice_cues")
+def slice_cues(cues: Sequence[SRTCue] | CueIndex, rng: TimeRange) -> Sequence[SRTCue]:
+    """
+    裁出與區間有交集的字幕並平移到以區間起點為 0。
+    CueStore（或以其建立的 CueIndex）回傳共用文字表的 CueStore，其餘回傳 SRTCue 清單。
+    """
+    if isinstance(cues, CueIndex):
+        if isinstance(cues.cues, CueStore):
+            return cues.cues.clip(cues.positions(rng.start, rng.end), rng)
+        # 多區間時先以索引取出候選，避免每段都掃過全部字幕
+        cues = cues.overlapping(rng.start, rng.end)
+    elif isinstance(cues, CueStore):
+        starts = _ms_list_to_seconds(cues.starts_ms)
+        ends = _ms_list_to_seconds(cues.ends_ms)
+        positions = [i for i in range(len(cues)) if ends[i] > rng.start and starts[i] < rng.end]
+        return cues.clip(positions, rng)
     sliced: List[SRTCue] = []
     for cue in cues:
         if cue.end <= rng.start or cue.start >= rng.end:
@@ -192,8 +796,44 @@ def slice_cues(cues: Sequence[SRTCue], rng: TimeRange) -> List[SRTCue]:
     return sliced
 
 
+@traced("slice_cues_batch")
+def slice_cues_batch(
+    cues: Sequence[SRTCue] | CueStore | CueIndex, ranges: Sequence[TimeRange]
+) -> List[CueStore]:
+    """
+    一次裁切多個區間（例如程式產生的每句一段、每 30 秒一段），結果與逐段 slice_cues 相同。
+    一般字幕檔的開始與結束時間都遞增，此時每段的字幕範圍就是在起/訖陣列上各做一次二分搜尋，
+    裁切平移只處理命中的字幕；時間有倒序或巢狀時改用 CueIndex 查詢。
+    """
+    index = cues if isinstance(cues, CueIndex) else None
+    store = index.cues if index is not None else cues
+    if not isinstance(store, CueStore):
+        # 轉換保留原始順序，索引中的序號仍然對應
+        store = CueStore.from_cues(store)
+    starts = _ms_list_to_seconds(store.starts_ms)
+    ends = _ms_list_to_seconds(store.ends_ms)
+    if starts == sorted(starts) and ends == sorted(ends):
+        return [
+            store.clip(range(bisect.bisect_right(ends, rng.start), bisect.bisect_left(starts, rng.end)), rng)
+            for rng in ranges
+        ]
+    if index is None:
+        index = CueIndex(store)
+    return [store.clip(index.positions(rng.start, rng.end), rng) for rng in ranges]
+
+
 def format_srt(cues: Sequence[SRTCue]) -> str:
     lines: List[str] = []
+    if isinstance(cues, CueStore):
+        # 直接以整數毫秒格式化，不經浮點來回換算
+        for idx, (start_ms, end_ms, text_id) in enumerate(
+            zip(cues.starts_ms, cues.ends_ms, cues.text_ids), start=1
+        ):
+            lines.append(str(idx))
+            lines.append(f"{format_srt_time_ms(start_ms)} --> {format_srt_time_ms(end_ms)}")
+            lines.extend(cues.texts[text_id])
+            lines.append("")
+        return "\n".join(lines).strip() + "\n"
     for idx, cue in enumerate(cues, start=1):
         lines.append(str(idx))
         lines.append(f"{format_srt_time(cue.start)} --> {format_srt_time(cue.end)}")
@@ -210,7 +850,10 @@ def ensure_outdir(outdir: Path) -> None:
 
 
 def find_ff_binary(name: str) -> str | None:
-    """依序嘗試：環境變數、_MEIPASS/bin、專案 bin、工作目錄 bin、系統 PATH。"""
+    """
+    依序嘗試：環境變數、_MEIPASS/bin、專案 bin、工作目錄 bin、系統 PATH。
+    系統 PATH 的搜尋結果會記錄在快取（PATH 不變且檔案仍在時直接沿用）。
+    """
     env_key = f"FVS_{name.upper()}"
     env_path = os.environ.get(env_key)
     if env_path and Path(env_path).exists():
@@ -221,14 +864,48 @@ def find_ff_binary(name: str) -> str | None:
         candidates.append(Path(sys._MEIPASS) / "bin" / name)
     candidates.append(Path(__file__).parent / "bin" / name)
     candidates.append(Path.cwd() / "bin" / name)
-    which_path = shutil.which(name)
-    if which_path:
-        candidates.append(Path(which_path))
 
     for cand in candidates:
         if cand.exists():
             return str(cand)
-    return None
+    return _which_cached(name)
+
+
+def _ff_cache_dir() -> Path:
+    return cache_dir() / "ffmpeg"
+
+
+def _which_cached(name: str) -> str | None:
+    """
+    shutil.which 的持久化版本：記錄 PATH 與找到的路徑，PATH 變更或檔案消失時重新搜尋。
+    快取資料夾無法建立或讀取時直接搜尋 PATH（快取不影響能否執行）。
+    """
+    search_path = os.environ.get("PATH", "")
+    try:
+        record_path = _ff_cache_dir() / "paths.json"
+    except OSError:
+        return shutil.which(name)
+    try:
+        record = json.loads(record_path.read_text(encoding="utf-8"))
+        if record.get("version") != _FF_CACHE_VERSION or record.get("search_path") != search_path:
+            record = {}
+    except (OSError, ValueError):
+        record = {}
+    cached = record.get("binaries", {}).get(name)
+    if cached and os.path.isfile(cached):
+        return cached
+
+    found = shutil.which(name)
+    if found:
+        binaries = dict(record.get("binaries", {}))
+        binaries[name] = found
+        payload = {"version": _FF_CACHE_VERSION, "search_path": search_path, "binaries": binaries}
+        try:
+            record_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(record_path, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        except OSError:
+            pass
+    return found
 
 
 def clean_subprocess_env() -> dict[str, str]:
@@ -247,6 +924,35 @@ def clean_subprocess_env() -> dict[str, str]:
     return env
 
 
+def cache_dir() -> Path:
+    """快取資料夾：FVS_CACHE_DIR 或 ~/.cache/fastvideoslice"""
+    env_path = os.environ.get(CACHE_DIR_ENV)
+    path = Path(env_path) if env_path else Path.home() / ".cache" / "fastvideoslice"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def file_identity(path: Path) -> str:
+    """以絕對路徑 + 大小 + 修改時間識別檔案，檔案變動後快取自然失效"""
+    st = path.stat()
+    key = f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # 暫存檔名每次唯一：並行（--jobs）的執行緒同時寫同一個快取時，不會互相覆蓋或搶先改名
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
 def ensure_unique_titles(ranges: Sequence[TimeRange]) -> None:
     seen: dict[str, str] = {}
     for rng in ranges:
@@ -266,18 +972,98 @@ def ensure_ffmpeg_exists() -> tuple[str, str]:
     return ffmpeg_path, ffprobe_path
 
 
-def _has_encoder(ffmpeg_cmd: str, encoder: str) -> bool:
+def _run_ff_listing(ffmpeg_cmd: str, *args: str) -> str:
+    result = subprocess.run(
+        [ffmpeg_cmd, "-hide_banner", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=clean_subprocess_env(),
+    )
+    return result.stdout
+
+
+def _parse_ff_encoders(text: str) -> List[str]:
+    """`-encoders` 輸出：說明區以 ------ 結束，之後每行為「旗標 名稱 說明」"""
+    _, sep, body = text.partition("------")
+    names = []
+    for line in (body if sep else "").splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            names.append(parts[1])
+    return names
+
+
+def _parse_ff_filters(text: str) -> List[str]:
+    """`-filters` 輸出：每行為「旗標 名稱 輸入->輸出 說明」，說明區沒有 -> 欄"""
+    names = []
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and "->" in parts[2]:
+            names.append(parts[1])
+    return names
+
+
+def _parse_ff_muxers(text: str) -> List[str]:
+    """`-muxers` 輸出：說明區以 -- 結束，之後每行為「E 名稱[,別名] 說明」"""
+    _, sep, body = text.partition("--")
+    names = []
+    for line in (body if sep else "").splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and "E" in parts[0]:
+            names.extend(parts[1].split(","))
+    return names
+
+
+@traced("probe_ff_capabilities")
+def probe_ff_capabilities(ffmpeg_cmd: str) -> FFmpegCapabilities:
+    """執行 ffmpeg -version/-encoders/-filters/-muxers 取得版本與支援清單"""
+    first_line = _run_ff_listing(ffmpeg_cmd, "-version").partition("\n")[0]
+    parts = first_line.split()
+    version = parts[2] if len(parts) >= 3 and parts[1] == "version" else first_line.strip()
+    return FFmpegCapabilities(
+        path=ffmpeg_cmd,
+        version=version,
+        encoders=_parse_ff_encoders(_run_ff_listing(ffmpeg_cmd, "-encoders")),
+        filters=_parse_ff_filters(_run_ff_listing(ffmpeg_cmd, "-filters")),
+        muxers=_parse_ff_muxers(_run_ff_listing(ffmpeg_cmd, "-muxers")),
+    )
+
+
+@lru_cache(maxsize=4)
+def load_ff_capabilities(ffmpeg_cmd: str) -> FFmpegCapabilities | None:
+    """
+    讀取 ffmpeg 能力快取；快取以二進位路徑/大小/修改時間命名，ffmpeg 更新後自動重新探測。
+    無法執行 ffmpeg 時回傳 None（不寫入快取）。
+    """
     try:
-        result = subprocess.run(
-            [ffmpeg_cmd, "-hide_banner", "-encoders"],
-            capture_output=True,
-            text=True,
-            check=True,
-            env=clean_subprocess_env(),
-        )
-        return encoder in result.stdout
-    except Exception:
-        return False
+        path = _ff_cache_dir() / f"{file_identity(Path(ffmpeg_cmd))}.json"
+    except OSError:
+        path = None
+    if path is not None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.pop("cache_version", None) == _FF_CACHE_VERSION:
+                return FFmpegCapabilities(**data)
+        except (OSError, ValueError, TypeError):
+            pass
+    try:
+        caps = probe_ff_capabilities(ffmpeg_cmd)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"cache_version": _FF_CACHE_VERSION, **asdict(caps)}
+            _write_atomic(path, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        except OSError:
+            pass
+    return caps
+
+
+def _has_encoder(ffmpeg_cmd: str, encoder: str) -> bool:
+    caps = load_ff_capabilities(ffmpeg_cmd)
+    return caps is not None and caps.has_encoder(encoder)
 
 
 @lru_cache(maxsize=1)
@@ -312,27 +1098,238 @@ def detect_hwaccel(ffmpeg_cmd: str) -> HWAccelConfig | None:
     return None
 
 
-def probe_duration(video_path: Path, ffprobe_cmd: str) -> float:
+def _media_info_path(video_path: Path) -> Path:
+    return cache_dir() / "media" / f"{file_identity(video_path)}.json"
+
+
+def _parse_int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_frame_rate(value: str | None) -> float | None:
+    """ffprobe 的 "30000/1001" 轉為 fps；"0/0" 或無法解析時回傳 None"""
+    try:
+        num, _, den = (value or "").partition("/")
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate if rate > 0 else None
+
+
+@traced("probe_media")
+def probe_media(video_path: Path, ffprobe_cmd: str) -> MediaInfo:
+    """用 ffprobe 讀取容器與各串流資訊（不掃描封包）"""
     cmd = [
         ffprobe_cmd,
         "-v",
         "error",
-        "-show_entries",
-        "format=duration",
+        "-show_format",
+        "-show_streams",
         "-of",
-        "default=noprint_wrappers=1:nokey=1",
+        "json",
         str(video_path),
     ]
     try:
         result = subprocess.run(
             cmd, capture_output=True, text=True, check=True, env=clean_subprocess_env()
         )
+        data = json.loads(result.stdout)
     except subprocess.CalledProcessError as exc:
-        raise UserError(f"ffprobe 取得影片長度失敗: {exc.stderr.strip()}")
-    try:
-        return float(result.stdout.strip())
+        raise UserError(f"ffprobe 讀取影片資訊失敗: {exc.stderr.strip()}")
     except ValueError:
+        raise UserError("ffprobe 回傳的影片資訊無法解析")
+    fmt = data.get("format", {})
+    try:
+        duration = float(fmt["duration"])
+    except (KeyError, TypeError, ValueError):
         raise UserError("ffprobe 回傳的影片長度無法解析")
+    streams = [
+        StreamInfo(
+            index=_parse_int(st.get("index")) or 0,
+            codec_type=st.get("codec_type", ""),
+            codec_name=st.get("codec_name", ""),
+            pix_fmt=st.get("pix_fmt"),
+            width=_parse_int(st.get("width")),
+            height=_parse_int(st.get("height")),
+            frame_rate=_parse_frame_rate(st.get("avg_frame_rate")) or _parse_frame_rate(st.get("r_frame_rate")),
+            bit_rate=_parse_int(st.get("bit_rate")),
+            sample_rate=_parse_int(st.get("sample_rate")),
+            channels=_parse_int(st.get("channels")),
+        )
+        for st in data.get("streams", [])
+    ]
+    return MediaInfo(
+        duration=duration,
+        format_name=fmt.get("format_name", ""),
+        bit_rate=_parse_int(fmt.get("bit_rate")),
+        streams=streams,
+    )
+
+
+def _save_media_info(video_path: Path, info: MediaInfo) -> None:
+    try:
+        path = _media_info_path(video_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": _MEDIA_INFO_VERSION, **asdict(info)}
+        _write_atomic(path, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+    except OSError:
+        pass
+
+
+@traced("load_media_info")
+def load_media_info(
+    video_path: Path, ffprobe_cmd: str | None = None, probe: bool = True
+) -> MediaInfo | None:
+    """
+    讀取媒體資訊快取；沒有快取時，若 probe 且有 ffprobe 則探測並寫入快取。
+    快取以檔案識別（路徑/大小/修改時間）命名；GOP 統計取自關鍵影格索引快取（有的話）。
+    """
+    info: MediaInfo | None = None
+    try:
+        data = json.loads(_media_info_path(video_path).read_text(encoding="utf-8"))
+        if data.pop("version", None) == _MEDIA_INFO_VERSION:
+            streams = [StreamInfo(**st) for st in data.pop("streams", [])]
+            info = MediaInfo(streams=streams, **data)
+    except (OSError, ValueError, TypeError):
+        info = None
+    if info is None:
+        if not probe or not ffprobe_cmd:
+            return None
+        info = probe_media(video_path, ffprobe_cmd)
+        _save_media_info(video_path, info)
+    if info.gop_avg is None:
+        index = load_keyframe_index(video_path, build=False)
+        stats = index.gop_stats() if index is not None else None
+        if stats is not None:
+            info.gop_avg, info.gop_max = stats
+            _save_media_info(video_path, info)
+    return info
+
+
+@traced("probe_duration")
+def probe_duration(video_path: Path, ffprobe_cmd: str) -> float:
+    # 媒體資訊有快取時直接讀取，免再啟動 ffprobe
+    return load_media_info(video_path, ffprobe_cmd).duration
+
+
+def _keyframe_index_path(video_path: Path) -> Path:
+    return cache_dir() / "keyframes" / f"{file_identity(video_path)}.kfi"
+
+
+def _cue_cache_path(subs_path: Path) -> Path:
+    return cache_dir() / "cues" / f"{file_identity(subs_path)}.cue"
+
+
+@traced("load_cues")
+def load_cues(subs_path: Path) -> CueStore:
+    """
+    讀取字幕為 CueStore：有二進位快取時直接 mmap（不需解析），否則串流解析後寫入快取。
+    快取以檔案識別（路徑/大小/修改時間）命名，字幕檔變動後自動重建。
+    """
+    try:
+        path = _cue_cache_path(subs_path)
+        with path.open("rb") as handle:
+            return CueStore.from_buffer(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError, struct.error):
+        pass
+    store = CueStore.from_cues(iter_srt(subs_path))
+    try:
+        path = _cue_cache_path(subs_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, store.to_bytes())
+    except OSError:
+        pass
+    return store
+
+
+@traced("build_keyframe_index")
+def build_keyframe_index(
+    video_path: Path,
+    ffprobe_cmd: str,
+    on_process: Callable[[subprocess.Popen], None] | None = None,
+) -> KeyframeIndex:
+    """
+    用 ffprobe 掃描影像封包旗標（不解碼），取得所有關鍵影格時間與影片長度。
+    長片掃描可能很久：on_process 在 ffprobe 啟動後收到程序，呼叫端可藉此結束掃描（視為失敗）。
+    """
+    cmd = [
+        ffprobe_cmd,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags:format=duration",
+        "-of",
+        "csv=p=0",
+        str(video_path),
+    ]
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=clean_subprocess_env()
+    )
+    if on_process is not None:
+        on_process(proc)
+    stdout, stderr = proc.communicate()
+    if proc.returncode != 0:
+        raise UserError(f"ffprobe 建立關鍵影格索引失敗: {stderr.strip()}")
+    keyframes: List[float] = []
+    duration: float | None = None
+    for line in stdout.splitlines():
+        fields = line.strip().split(",")
+        try:
+            if len(fields) >= 2:
+                if "K" in fields[1]:
+                    keyframes.append(float(fields[0]))
+            elif fields[0]:
+                duration = float(fields[0])
+        except ValueError:
+            continue  # pts_time 可能為 N/A
+    if duration is None:
+        raise UserError("ffprobe 回傳的影片長度無法解析")
+    return KeyframeIndex(duration=duration, keyframes=array("d", sorted(keyframes)))
+
+
+@traced("load_keyframe_index")
+def load_keyframe_index(
+    video_path: Path,
+    ffprobe_cmd: str | None = None,
+    build: bool = True,
+    on_process: Callable[[subprocess.Popen], None] | None = None,
+) -> KeyframeIndex | None:
+    """
+    讀取關鍵影格索引快取；沒有快取時，若 build 且有 ffprobe 則建立並寫入快取。
+    快取以檔案識別（路徑/大小/修改時間）命名，來源變動後會重建；
+    快取資料夾無法使用時視同沒有快取（build 時只在記憶體中建立）。
+    """
+    try:
+        path = _keyframe_index_path(video_path)
+    except OSError:
+        path = None
+    try:
+        data = path.read_bytes() if path is not None else b""
+        magic, duration, count = _KEYFRAME_HEADER.unpack_from(data)
+        if magic == _KEYFRAME_MAGIC:
+            keyframes = array("d")
+            keyframes.frombytes(data[_KEYFRAME_HEADER.size:_KEYFRAME_HEADER.size + count * 8])
+            if len(keyframes) == count:
+                return KeyframeIndex(duration=duration, keyframes=keyframes)
+    except (OSError, struct.error):
+        pass
+    if not build or not ffprobe_cmd:
+        return None
+    index = build_keyframe_index(video_path, ffprobe_cmd, on_process)
+    if path is None:
+        return index
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = _KEYFRAME_HEADER.pack(_KEYFRAME_MAGIC, index.duration, len(index.keyframes))
+        _write_atomic(path, header + index.keyframes.tobytes())
+    except OSError:
+        pass  # 快取寫入失敗不影響結果
+    return index
 
 
 def format_ffmpeg_time(seconds: float) -> str:
@@ -340,8 +1337,282 @@ def format_ffmpeg_time(seconds: float) -> str:
     return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
 
 
+def _parse_progress_number(value: str | None, kind=float):
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_ffmpeg_progress(lines: Iterable[str]) -> Iterator[FFmpegProgress]:
+    """
+    解析 ffmpeg `-progress` 輸出（每行 key=value，每個區塊以 progress=continue/end 結尾），
+    每個區塊產生一筆 FFmpegProgress；N/A 的欄位沿用前一筆的值。
+    """
+    current = FFmpegProgress()
+    fields: dict[str, str] = {}
+    for line in lines:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        if key != "progress":
+            fields[key] = value.strip()
+            continue
+        out_us = _parse_progress_number(fields.get("out_time_us"), int)
+        if out_us is None:
+            # 舊版 ffmpeg 只有 out_time_ms（實際單位同樣是微秒）
+            out_us = _parse_progress_number(fields.get("out_time_ms"), int)
+        speed = fields.get("speed", "")
+        current = FFmpegProgress(
+            out_time=max(0.0, out_us / 1_000_000) if out_us is not None else current.out_time,
+            frames=_parse_progress_number(fields.get("frame"), int) or current.frames,
+            fps=_parse_progress_number(fields.get("fps")) or current.fps,
+            speed=_parse_progress_number(speed.rstrip("x")) or current.speed,
+            total_size=_parse_progress_number(fields.get("total_size"), int) or current.total_size,
+            done=value.strip() == "end",
+        )
+        fields.clear()
+        yield current
+
+
+def _offset_progress(on_progress: ProgressCallback, offset: float) -> ProgressCallback:
+    """多步驟輸出時，把某一步的進度平移到整段區間的時間軸上（不轉發該步的結束事件）"""
+
+    def forward(event: FFmpegProgress) -> None:
+        on_progress(
+            FFmpegProgress(
+                out_time=offset + event.out_time,
+                frames=event.frames,
+                fps=event.fps,
+                speed=event.speed,
+                total_size=event.total_size,
+            )
+        )
+
+    return forward
+
+
+def _final_progress(on_progress: ProgressCallback) -> ProgressCallback:
+    """只轉發結束事件（用於接合等不代表整段進度的步驟）"""
+
+    def forward(event: FFmpegProgress) -> None:
+        if event.done:
+            on_progress(event)
+
+    return forward
+
+
+@dataclass
+class ProcessUsage:
+    """子程序資源用量；無法取得的項目為 None"""
+
+    cpu_user: float | None = None  # 秒
+    cpu_sys: float | None = None  # 秒
+    max_rss: int | None = None  # 峰值常駐記憶體（位元組）
+    read_bytes: int | None = None  # 讀取量（/proc/<pid>/io 的 rchar）
+    write_bytes: int | None = None  # 寫入量（wchar）
+
+    def describe(self) -> str:
+        """一行摘要，供 verbose/log 顯示"""
+        parts = []
+        if self.cpu_user is not None:
+            parts.append(f"CPU user {self.cpu_user:.2f}s / sys {self.cpu_sys:.2f}s")
+        if self.max_rss is not None:
+            parts.append(f"峰值記憶體 {self.max_rss / 1_048_576:.1f} MB")
+        if self.read_bytes is not None:
+            parts.append(f"讀 {self.read_bytes / 1_048_576:.1f} MB / 寫 {self.write_bytes / 1_048_576:.1f} MB")
+        return "，".join(parts) or "無資源資訊"
+
+
+@dataclass
+class FFmpegRun:
+    """一次 ffmpeg 執行的結果（供執行報告與 verbose 輸出使用）"""
+
+    tag: str
+    returncode: int
+    wall_time: float  # 秒
+    usage: ProcessUsage = field(default_factory=ProcessUsage)
+
+
+_ffmpeg_runs = threading.local()
+
+
+@contextlib.contextmanager
+def collect_ffmpeg_runs() -> Iterator[List[FFmpegRun]]:
+    """收集目前執行緒在區塊內執行的每個 ffmpeg（FFmpegRun）；可巢狀使用"""
+    runs: List[FFmpegRun] = []
+    stack = getattr(_ffmpeg_runs, "stack", None)
+    if stack is None:
+        stack = _ffmpeg_runs.stack = []
+    stack.append(runs)
+    try:
+        yield runs
+    finally:
+        stack.pop()
+
+
+def _read_proc_io(pid: int | str) -> tuple[int, int] | None:
+    """讀取 /proc/<pid>/io 的 (rchar, wchar)；非 Linux 或已無法讀取時回傳 None"""
+    try:
+        values = {}
+        with open(f"/proc/{pid}/io", encoding="ascii") as fh:
+            for line in fh:
+                key, _, value = line.partition(":")
+                values[key] = int(value)
+        return values["rchar"], values["wchar"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def sample_process_usage(pid: int) -> ProcessUsage | None:
+    """
+    從 /proc 讀取執行中程序的累計 CPU、峰值記憶體（VmHWM）與讀寫量（僅 Linux）。
+    用於無法自行回收的子程序（例如 QProcess）：結束前最後一次取樣即為近似的總量。
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as fh:
+            # comm 可能含空白，從最後一個 ')' 之後切欄位；utime/stime 為第 14/15 欄
+            fields = fh.read().rpartition(")")[2].split()
+        ticks = os.sysconf("SC_CLK_TCK")
+        usage = ProcessUsage(cpu_user=int(fields[11]) / ticks, cpu_sys=int(fields[12]) / ticks)
+        with open(f"/proc/{pid}/status", encoding="ascii", errors="replace") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    usage.max_rss = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        return None
+    io = _read_proc_io(pid)
+    if io is not None:
+        usage.read_bytes, usage.write_bytes = io
+    return usage
+
+
+def _wait_with_usage(proc: subprocess.Popen) -> tuple[int, ProcessUsage]:
+    """
+    等待子程序結束並取得資源用量：先以 waitid(WNOWAIT) 等到結束但不回收、讀 /proc 的讀寫量，
+    再以 wait4 回收並取得 rusage（CPU 時間、峰值記憶體）。不支援的平台只回傳結束碼。
+    """
+    usage = ProcessUsage()
+    if hasattr(os, "waitid") and os.path.exists("/proc/self/io"):
+        try:
+            os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+            io = _read_proc_io(proc.pid)
+            if io is not None:
+                usage.read_bytes, usage.write_bytes = io
+        except OSError:
+            pass
+    if hasattr(os, "wait4"):
+        try:
+            _, status, rusage = os.wait4(proc.pid, 0)
+        except ChildProcessError:
+            pass
+        else:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            usage.cpu_user = rusage.ru_utime
+            usage.cpu_sys = rusage.ru_stime
+            # ru_maxrss：Linux 以 KB、macOS 以位元組為單位
+            usage.max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+            return proc.returncode, usage
+    return proc.wait(), usage
+
+
+@dataclass
+class HeapUsage:
+    peak_bytes: int | None = None
+
+
+@contextlib.contextmanager
+def track_peak_heap(usage: HeapUsage | None = None, enabled: bool = True) -> Iterator[HeapUsage]:
+    """
+    以 tracemalloc 量測區塊內 Python 的峰值配置量（會拖慢配置，只在需要數據時開啟）。
+    傳入同一個 HeapUsage 可累計多個區塊的最大值；enabled=False 時不量測。
+    """
+    usage = usage if usage is not None else HeapUsage()
+    if not enabled:
+        yield usage
+        return
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    try:
+        yield usage
+    finally:
+        peak = tracemalloc.get_traced_memory()[1]
+        if started:
+            tracemalloc.stop()
+        usage.peak_bytes = max(usage.peak_bytes or 0, peak)
+
+
+def _run_ffmpeg_cmd(
+    cmd: List[str],
+    verbose: bool,
+    tag: str,
+    error_prefix: str,
+    on_progress: ProgressCallback | None = None,
+) -> None:
+    """
+    執行 ffmpeg；非 verbose 時收集輸出，失敗時以 error_prefix 包成 UserError。
+    有 on_progress 時加上 `-progress pipe:1`，邊執行邊回報進度；回呼丟出例外時會結束 ffmpeg。
+    """
+    if on_progress is not None:
+        cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+        stdout = subprocess.PIPE
+    else:
+        stdout = None if verbose else subprocess.DEVNULL
+    if verbose:
+        print(f"[{tag}]", " ".join(cmd))
+    started = time.perf_counter()
+    # stderr 寫到暫存檔，避免讀 stdout 進度時 stderr 管線塞滿而卡住
+    with tempfile.TemporaryFile("w+", encoding="utf-8", errors="replace") as err_file:
+        with trace_span("ffmpeg.spawn", tag=tag):
+            proc = subprocess.Popen(
+                cmd,
+                stdout=stdout,
+                stderr=None if verbose else err_file,
+                text=True,
+                env=clean_subprocess_env(),
+            )
+        with trace_span("ffmpeg.run", tag=tag, output=cmd[-1]):
+            if on_progress is not None:
+                try:
+                    for event in iter_ffmpeg_progress(proc.stdout):
+                        on_progress(event)
+                except BaseException:
+                    proc.kill()
+                    proc.wait()
+                    raise
+                finally:
+                    proc.stdout.close()
+            returncode, usage = _wait_with_usage(proc)
+        run = FFmpegRun(tag, returncode, time.perf_counter() - started, usage)
+        for runs in getattr(_ffmpeg_runs, "stack", ()):
+            runs.append(run)
+        if verbose:
+            print(f"[{tag}] 結束碼 {returncode}，{run.wall_time:.2f}s，{usage.describe()}")
+        if returncode != 0:
+            err_file.seek(0)
+            err_msg = err_file.read().strip() or str(subprocess.CalledProcessError(returncode, cmd))
+            raise UserError(f"{error_prefix}: {err_msg}")
+
+
+def video_encode_args(hwaccel_config: HWAccelConfig | None) -> tuple[list[str], list[str]]:
+    """回傳 (解碼端 hwaccel 參數, 影像編碼參數)；無硬體編碼時用 libx264"""
+    if hwaccel_config:
+        return list(hwaccel_config.hwaccel_args), ["-c:v", hwaccel_config.vcodec, *hwaccel_config.vopts]
+    return [], ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "20"]
+
+
+@traced("run_ffmpeg")
 def run_ffmpeg(
-    video_path: Path, rng: TimeRange, output_path: Path, verbose: bool, ffmpeg_cmd: str
+    video_path: Path,
+    rng: TimeRange,
+    output_path: Path,
+    verbose: bool,
+    ffmpeg_cmd: str,
+    on_progress: ProgressCallback | None = None,
 ) -> None:
     if output_path.exists():
         raise UserError(f"輸出檔已存在，避免覆蓋: {output_path}")
@@ -358,58 +1629,98 @@ def run_ffmpeg(
         "copy",
         str(output_path),
     ]
-    if verbose:
-        print("[ffmpeg]", " ".join(cmd))
-    try:
-        subprocess.run(
-            cmd,
-            check=True,
-            capture_output=not verbose,
-            text=True,
-            env=clean_subprocess_env(),
-        )
-    except subprocess.CalledProcessError as exc:
-        err_msg = exc.stderr.strip() if exc.stderr else str(exc)
-        raise UserError(f"ffmpeg 執行失敗: {err_msg}")
+    _run_ffmpeg_cmd(cmd, verbose, "ffmpeg", "ffmpeg 執行失敗", on_progress)
 
 
-def run_ffmpeg_precise(
+@traced("run_ffmpeg_copy_batch")
+def run_ffmpeg_copy_batch(
     video_path: Path,
-    rng: TimeRange,
-    output_path: Path,
+    items: Sequence[tuple[TimeRange, Path]],
     verbose: bool,
     ffmpeg_cmd: str,
-    hwaccel_config: HWAccelConfig | None = None,
-    preview_fast: bool = False,
+    on_progress: ProgressCallback | None = None,
 ) -> None:
-    """重編碼模式，較精準對齊時間（預覽/精準輸出用）"""
-    if output_path.exists():
-        raise UserError(f"輸出檔已存在，避免覆蓋: {output_path}")
-    duration = rng.end - rng.start
-    vcodec = hwaccel_config.vcodec if hwaccel_config else ("h264_videotoolbox" if use_hwaccel else "libx264")
-    vopts: list[str] = []
-    if hwaccel_config:
-        vopts = hwaccel_config.vopts
-    elif use_hwaccel:
-        vopts = ["-b:v", "8M", "-pix_fmt", "yuv420p"]
-    else:
-        vopts = ["-preset", "ultrafast", "-crf", "20"]
-
+    """
+    以單一 ffmpeg 程序輸出多個 copy 區間（每段一個輸出檔）。
+    每段各自以 `-ss/-to` 開啟一次來源作為獨立輸入，切點與 run_ffmpeg 相同；
+    省下的是每段一次的 ffmpeg 啟動與初始化成本。失敗時會移除本批產生的檔案。
+    只對應第一軌影像/音訊，呼叫前以 copy_batch_supported 確認來源適用。
+    """
+    for _, output_path in items:
+        if output_path.exists():
+            raise UserError(f"輸出檔已存在，避免覆蓋: {output_path}")
     cmd = [ffmpeg_cmd, "-y"]
-    hwaccel_args = hwaccel_config.hwaccel_args if hwaccel_config else []
-    if hwaccel_args:
-        cmd += hwaccel_args
-    cmd += [
-        "-i",
-        str(video_path),
+    for rng, _ in items:
+        cmd += [
+            "-ss",
+            format_ffmpeg_time(rng.start),
+            "-to",
+            format_ffmpeg_time(rng.end),
+            "-i",
+            str(video_path),
+        ]
+    for i, (_, output_path) in enumerate(items):
+        # 來源只有一軌影像/音訊時等同單一輸入的預設選流，metadata/章節取自對應輸入
+        cmd += [
+            "-map",
+            f"{i}:v:0?",
+            "-map",
+            f"{i}:a:0?",
+            "-map_metadata",
+            str(i),
+            "-map_chapters",
+            str(i),
+            "-c",
+            "copy",
+            str(output_path),
+        ]
+    try:
+        _run_ffmpeg_cmd(cmd, verbose, "ffmpeg-batch", "ffmpeg 批次輸出失敗", on_progress)
+    except UserError:
+        for _, output_path in items:
+            try:
+                output_path.unlink()
+            except OSError:
+                pass
+        raise
+
+
+def seek_args(
+    rng: TimeRange, keyframe_index: KeyframeIndex | None = None
+) -> tuple[list[str], list[str]]:
+    """
+    重編碼用的兩段式 seek，回傳 (輸入端參數, 輸出端參數)。
+    輸入端 `-ss` 快速跳到起點前最近的關鍵影格（無索引時為起點前 SEEK_MARGIN_SEC 秒），
+    輸出端 `-ss/-t` 再精準裁到起點，避免從片頭解碼到起點。
+    """
+    if keyframe_index is not None:
+        coarse = keyframe_index.prev_keyframe(rng.start)
+    else:
+        coarse = max(0.0, rng.start - SEEK_MARGIN_SEC)
+    input_args = ["-ss", format_ffmpeg_time(coarse)] if coarse > 0 else []
+    output_args = [
         "-ss",
-        format_ffmpeg_time(rng.start),
+        format_ffmpeg_time(rng.start - coarse),
         "-t",
-        format_ffmpeg_time(duration),
-        "-c:v",
-        vcodec,
-        *vopts,
+        format_ffmpeg_time(rng.end - rng.start),
     ]
+    return input_args, output_args
+
+
+def build_precise_cmd(
+    video_path: Path,
+    rng: TimeRange,
+    output_path: Path,
+    ffmpeg_cmd: str,
+    hwaccel_config: HWAccelConfig | None = None,
+    preview_fast: bool = False,
+    keyframe_index: KeyframeIndex | None = None,
+) -> list[str]:
+    """組出重編碼命令（精準輸出與預覽共用）"""
+    hwaccel_args, vcodec_args = video_encode_args(hwaccel_config)
+    input_seek, output_seek = seek_args(rng, keyframe_index)
+
+    cmd = [ffmpeg_cmd, "-y", *hwaccel_args, *input_seek, "-i", str(video_path), *output_seek, *vcodec_args]
 
     if preview_fast:
         # 預覽優先速度：縮小解析度並保留低碼率音訊（360p）
@@ -438,21 +1749,669 @@ def run_ffmpeg_precise(
         "+faststart",
         str(output_path),
     ]
-    if verbose:
-        print("[ffmpeg-precise]", " ".join(cmd))
+    return cmd
+
+
+def tee_escape(path: Path) -> str:
+    """tee 輸出的檔名需跳脫 tee 語法用到的字元"""
+    text = str(path)
+    for ch in "\\'|[]":
+        text = text.replace(ch, "\\" + ch)
+    return text
+
+
+def build_streaming_cmd(cmd: list[str], stream_path: Path) -> list[str]:
+    """
+    把 build_precise_cmd 的命令改成一次編碼、兩個輸出（tee）：stream_path 為片段式 MP4
+    （empty_moov，每 STREAM_FRAGMENT_SEC 秒寫出一個片段，寫出第一個片段後就能播放），
+    原輸出仍是 faststart 的一般 MP4，完成後取代串流檔。
+    """
+    *head, output = cmd
+    if head[-2:] == ["-movflags", "+faststart"]:
+        head = head[:-2]
+    fragment_flags = "frag_keyframe+empty_moov+default_base_moof"
+    return [
+        *head,
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-force_key_frames",
+        f"expr:gte(t,n_forced*{STREAM_FRAGMENT_SEC:g})",
+        # tee 無法依各輸出格式自動決定，mp4 需要全域標頭
+        "-flags",
+        "+global_header",
+        "-f",
+        "tee",
+        f"[f=mp4:movflags={fragment_flags}]{tee_escape(stream_path)}|[f=mp4:movflags=+faststart]{tee_escape(Path(output))}",
+    ]
+
+
+@traced("run_ffmpeg_precise")
+def run_ffmpeg_precise(
+    video_path: Path,
+    rng: TimeRange,
+    output_path: Path,
+    verbose: bool,
+    ffmpeg_cmd: str,
+    hwaccel_config: HWAccelConfig | None = None,
+    preview_fast: bool = False,
+    keyframe_index: KeyframeIndex | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> None:
+    """重編碼模式，較精準對齊時間（預覽/精準輸出用）"""
+    if output_path.exists():
+        raise UserError(f"輸出檔已存在，避免覆蓋: {output_path}")
+    cmd = build_precise_cmd(
+        video_path, rng, output_path, ffmpeg_cmd, hwaccel_config, preview_fast, keyframe_index
+    )
+    _run_ffmpeg_cmd(cmd, verbose, "ffmpeg-precise", "ffmpeg 精準輸出失敗", on_progress)
+
+
+def _proxy_dir() -> Path:
+    return cache_dir() / "proxy"
+
+
+def _proxy_path(video_path: Path) -> Path:
+    return _proxy_dir() / f"{file_identity(video_path)}.mp4"
+
+
+def evict_lru(paths: Iterable[Path], max_bytes: int, keep: Iterable[Path] = ()) -> int:
+    """
+    依修改時間（最近使用）由舊到新刪除檔案，直到總大小不超過 max_bytes；keep 中的檔案不刪。
+    回傳釋放的位元組。
+    """
+    keep = set(keep)
+    entries = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        freed += size
+    return freed
+
+
+def evict_proxies(max_bytes: int, keep: Path | None = None) -> int:
+    """
+    預覽代理檔超過 max_bytes 時依最近使用時間淘汰（keep 為使用中的代理檔），
+    並刪除中斷留下的轉檔暫存檔；回傳釋放的位元組。快取資料夾無法使用時不做事。
+    """
+    try:
+        folder = _proxy_dir()
+        files = list(folder.glob("*.mp4"))
+    except OSError:
+        return 0
+    now = time.time()
+    proxies = []
+    for path in files:
+        if not path.name.endswith(PROXY_TMP_SUFFIX):
+            proxies.append(path)
+            continue
+        try:
+            if now - path.stat().st_mtime >= PROXY_ORPHAN_AGE:
+                path.unlink()
+        except OSError:
+            pass
+    return evict_lru(proxies, max_bytes, [keep] if keep is not None else ())
+
+
+def build_proxy_cmd(video_path: Path, output_path: Path, ffmpeg_cmd: str) -> list[str]:
+    """整支來源轉成預覽代理檔的命令（第一軌影像縮至 PROXY_HEIGHT、全 I 影格，第一軌音訊轉低碼率 AAC）"""
+    return [
+        ffmpeg_cmd,
+        "-y",
+        "-i",
+        str(video_path),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-vf",
+        f"scale=-2:{PROXY_HEIGHT}",
+        *PROXY_VIDEO_ARGS,
+        "-c:a",
+        "aac",
+        "-ac",
+        "2",
+        "-b:a",
+        "96k",
+        "-movflags",
+        "+faststart",
+        str(output_path),
+    ]
+
+
+@traced("load_proxy")
+def load_proxy(
+    video_path: Path,
+    ffmpeg_cmd: str | None = None,
+    build: bool = True,
+    verbose: bool = False,
+    on_progress: ProgressCallback | None = None,
+    max_bytes: int | None = None,
+) -> Path | None:
+    """
+    取得來源影片的預覽代理檔；沒有快取時，若 build 且有 ffmpeg 則轉檔並寫入快取（整支解碼，耗時）。
+    快取以檔案識別（路徑/大小/修改時間）命名，來源變動後會重建；正式輸出一律讀原始來源。
+    命中時更新修改時間（LRU 依據）；有 max_bytes 時轉檔完成後依此上限淘汰其他代理檔。
+    """
+    try:
+        path = _proxy_path(video_path)
+        if path.stat().st_size > 0:
+            os.utime(path)
+            return path
+    except OSError:
+        pass
+    if not build or not ffmpeg_cmd:
+        return None
     try:
-        subprocess.run(
-            cmd,
-            check=True,
-            capture_output=not verbose,
-            text=True,
-            env=clean_subprocess_env(),
+        path = _proxy_path(video_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError as exc:
+        raise UserError(f"快取資料夾無法使用，無法建立預覽代理檔: {exc}")
+    # 暫存檔名需唯一：取消的舊轉檔可能尚未結束，新的轉檔就已開始
+    tmp = path.with_name(f"{path.stem}.{uuid.uuid4().hex}{PROXY_TMP_SUFFIX}")
+    try:
+        _run_ffmpeg_cmd(
+            build_proxy_cmd(video_path, tmp, ffmpeg_cmd), verbose, "ffmpeg-proxy", "預覽代理檔建立失敗", on_progress
         )
-    except subprocess.CalledProcessError as exc:
-        err_msg = exc.stderr.strip() if exc.stderr else str(exc)
-        raise UserError(f"ffmpeg 精準輸出失敗: {err_msg}")
+        os.replace(tmp, path)
+    finally:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+    if max_bytes is not None:
+        evict_proxies(max_bytes, keep=path)
+    return path
+
+
+def build_proxy_preview_cmd(proxy_path: Path, rng: TimeRange, output_path: Path, ffmpeg_cmd: str) -> list[str]:
+    """從代理檔以 copy 切出預覽：代理檔每格都是關鍵影格，起點精準到影格且不需重編碼"""
+    return [
+        ffmpeg_cmd,
+        "-y",
+        "-ss",
+        format_ffmpeg_time(rng.start),
+        "-to",
+        format_ffmpeg_time(rng.end),
+        "-i",
+        str(proxy_path),
+        "-c",
+        "copy",
+        str(output_path),
+    ]
+
+
+@traced("run_ffmpeg_smart")
+def run_ffmpeg_smart(
+    video_path: Path,
+    rng: TimeRange,
+    output_path: Path,
+    verbose: bool,
+    ffmpeg_cmd: str,
+    ffprobe_cmd: str,
+    hwaccel_config: HWAccelConfig | None = None,
+    keyframe_index: KeyframeIndex | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> None:
+    """
+    智慧輸出：只重編碼「起點 → 下一個關鍵影格」這段，其餘影像直接 copy，再接成一個檔案。
+    起點影格精準、速度接近 copy；音訊整段重編碼（成本低）以對齊起點。
+    起點已在關鍵影格上時等同 copy；整段落在同一 GOP 或編碼不支援時改用精準輸出。
+    """
+    if output_path.exists():
+        raise UserError(f"輸出檔已存在，避免覆蓋: {output_path}")
+    index = keyframe_index or load_keyframe_index(video_path, ffprobe_cmd)
+    keyframe = index.next_keyframe(rng.start)
+    if keyframe is not None and keyframe - rng.start < 0.001:
+        run_ffmpeg(video_path, rng, output_path, verbose, ffmpeg_cmd, on_progress)
+        return
+    video_stream = load_media_info(video_path, ffprobe_cmd).video
+    codec = video_stream.codec_name if video_stream else ""
+    pix_fmt = video_stream.pix_fmt if video_stream else None
+    if keyframe is None or keyframe >= rng.end or codec not in SMART_RENDER_ENCODERS:
+        if verbose:
+            print(f"[ffmpeg-smart] 不適用智慧輸出（codec={codec or '?'}），改用精準輸出")
+        run_ffmpeg_precise(
+            video_path,
+            rng,
+            output_path,
+            verbose,
+            ffmpeg_cmd,
+            hwaccel_config,
+            keyframe_index=index,
+            on_progress=on_progress,
+        )
+        return
+
+    # 開頭片段的編碼需與來源相同才能接續 copy 的部分；硬體編碼僅支援 H.264
+    if codec == "h264" and hwaccel_config:
+        hwaccel_args, vcodec_args = video_encode_args(hwaccel_config)
+    else:
+        hwaccel_args, vcodec_args = [], ["-c:v", SMART_RENDER_ENCODERS[codec], "-preset", "veryfast", "-crf", "18"]
+    if pix_fmt:
+        vcodec_args += ["-pix_fmt", pix_fmt]
+
+    # 頭段長度取毫秒下限、尾段起點取毫秒上限，避免關鍵影格被重複或漏掉
+    head_ms = int((keyframe - rng.start) * 1000)
+    tail_start = math.ceil(keyframe * 1000) / 1000.0
+    # 進度：頭段與 copy 段依序對應區間時間軸，接合只回報結束
+    head_progress = tail_progress = join_progress = None
+    if on_progress is not None:
+        head_progress = _offset_progress(on_progress, 0.0)
+        tail_progress = _offset_progress(on_progress, tail_start - rng.start)
+        join_progress = _final_progress(on_progress)
+
+    with tempfile.TemporaryDirectory(prefix=".fvs_smart_", dir=output_path.parent) as tmp:
+        head_path = Path(tmp) / "head.ts"
+        tail_path = Path(tmp) / "tail.ts"
+        list_path = Path(tmp) / "parts.txt"
+
+        # 1) 重編碼：起點 → 下一個關鍵影格（不含）
+        head_cmd = [ffmpeg_cmd, "-y", *hwaccel_args]
+        head_cmd += [
+            "-ss",
+            format_ffmpeg_time(rng.start),
+            "-i",
+            str(video_path),
+            "-t",
+            format_ffmpeg_time(head_ms / 1000.0),
+            "-map",
+            "0:v:0",
+            "-an",
+            *vcodec_args,
+            str(head_path),
+        ]
+        _run_ffmpeg_cmd(head_cmd, verbose, "ffmpeg-smart", "智慧輸出（開頭重編碼）失敗", head_progress)
+
+        # 2) copy：關鍵影格 → 終點
+        tail_cmd = [
+            ffmpeg_cmd,
+            "-y",
+            "-ss",
+            format_ffmpeg_time(tail_start),
+            "-to",
+            format_ffmpeg_time(rng.end),
+            "-i",
+            str(video_path),
+            "-map",
+            "0:v:0",
+            "-an",
+            "-c:v",
+            "copy",
+            str(tail_path),
+        ]
+        _run_ffmpeg_cmd(tail_cmd, verbose, "ffmpeg-smart", "智慧輸出（copy 段）失敗", tail_progress)
+
+        # 3) 接合影像並配上同區間的音訊
+        list_path.write_text(
+            "".join(f"file '{_concat_quote(p.resolve())}'\n" for p in (head_path, tail_path)),
+            encoding="utf-8",
+        )
+        join_cmd = [
+            ffmpeg_cmd,
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(list_path),
+            "-ss",
+            format_ffmpeg_time(rng.start),
+            "-to",
+            format_ffmpeg_time(rng.end),
+            "-i",
+            str(video_path),
+            "-map",
+            "0:v:0",
+            "-map",
+            "1:a:0?",
+            "-c:v",
+            "copy",
+            "-c:a",
+            "aac",
+            "-ac",
+            "2",
+            "-b:a",
+            "128k",
+            "-movflags",
+            "+faststart",
+            str(output_path),
+        ]
+        _run_ffmpeg_cmd(join_cmd, verbose, "ffmpeg-smart", "智慧輸出（接合）失敗", join_progress)
 
 
+def _concat_quote(path: Path) -> str:
+    """concat demuxer 清單的單引號跳脫"""
+    return str(path).replace("'", "'\\''")
+
+
+def extract_clip(
+    video_path: Path,
+    rng: TimeRange,
+    output_path: Path,
+    mode: str,
+    verbose: bool,
+    ffmpeg_cmd: str,
+    ffprobe_cmd: str | None = None,
+    hwaccel_config: HWAccelConfig | None = None,
+    keyframe_index: KeyframeIndex | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> None:
+    """依輸出模式（copy/precise/smart）裁切單一區間；on_progress 收到該段的即時進度"""
+    if mode == MODE_PRECISE:
+        run_ffmpeg_precise(
+            video_path,
+            rng,
+            output_path,
+            verbose,
+            ffmpeg_cmd,
+            hwaccel_config,
+            keyframe_index=keyframe_index,
+            on_progress=on_progress,
+        )
+    elif mode == MODE_SMART:
+        if not ffprobe_cmd:
+            raise UserError("智慧輸出需要 ffprobe")
+        run_ffmpeg_smart(
+            video_path,
+            rng,
+            output_path,
+            verbose,
+            ffmpeg_cmd,
+            ffprobe_cmd,
+            hwaccel_config,
+            keyframe_index,
+            on_progress,
+        )
+    else:
+        run_ffmpeg(video_path, rng, output_path, verbose, ffmpeg_cmd, on_progress)
+
+
+@dataclass
+class ClipReport:
+    """執行報告中單一區間的紀錄"""
+
+    index: int
+    output: str
+    range: str
+    start: float
+    end: float
+    mode: str
+    encoder: str
+    batch: int  # 同一個 ffmpeg 輸出的區間數（批次 copy 時 > 1，各項數據為整批共用）
+    wall_time: float  # 秒，含字幕輸出
+    exit_status: int | None  # 失敗的 ffmpeg 結束碼；未執行 ffmpeg 時為 None
+    input_bytes: int | None
+    output_bytes: int | None
+    output_duration: float | None
+    realtime_factor: float | None  # 片段秒數 / 實際耗時秒數
+    cpu_user: float | None = None  # 以下為 ffmpeg 子程序用量（多個 ffmpeg 時 CPU/讀寫加總、記憶體取最大）
+    cpu_sys: float | None = None
+    max_rss: int | None = None
+    write_bytes: int | None = None
+    error: str | None = None
+
+
+def _sum_usage(usages: Sequence[ProcessUsage]) -> ProcessUsage:
+    """合併多個子程序用量：CPU 與讀寫量加總、峰值記憶體取最大；任一項缺值則該項為 None"""
+
+    def total(values):
+        if not values or None in values:
+            return None
+        result = sum(values)
+        return round(result, 4) if isinstance(result, float) else result
+
+    rss = [u.max_rss for u in usages]
+    return ProcessUsage(
+        cpu_user=total([u.cpu_user for u in usages]),
+        cpu_sys=total([u.cpu_sys for u in usages]),
+        max_rss=max(rss) if rss and None not in rss else None,
+        read_bytes=total([u.read_bytes for u in usages]),
+        write_bytes=total([u.write_bytes for u in usages]),
+    )
+
+
+def describe_encoder(mode: str, hwaccel_config: HWAccelConfig | None = None, video_codec: str | None = None) -> str:
+    """報告用的編碼器名稱"""
+    if mode == MODE_COPY:
+        return "copy"
+    _, vcodec_args = video_encode_args(hwaccel_config)
+    if mode == MODE_SMART:
+        if not (video_codec == "h264" and hwaccel_config):
+            vcodec_args = ["-c:v", SMART_RENDER_ENCODERS.get(video_codec or "", "libx264")]
+        return f"{vcodec_args[1]}+copy"
+    return vcodec_args[1]
+
+
+class RunReport:
+    """
+    執行報告（JSON Lines）：每段一筆 {"type": "clip", ...}，結束時一筆 {"type": "summary", ...}。
+    以附加模式寫入，同一檔案可累積多次執行，以 run_id 區分；每筆寫入後立即 flush。
+    """
+
+    def __init__(self, path: Path, ffprobe_cmd: str | None = None, **meta) -> None:
+        self.path = path
+        self.ffprobe_cmd = ffprobe_cmd
+        self.run_id = uuid.uuid4().hex[:12]
+        self.meta = meta
+        self._started = time.perf_counter()
+        self._started_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        self._lock = threading.Lock()
+        self._clips: List[ClipReport] = []
+        self._usages: List[ProcessUsage] = []  # 每批/每段一筆，批次共用的用量只計一次
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = path.open("a", encoding="utf-8")
+
+    def _write(self, record: dict) -> None:
+        with self._lock:
+            self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._fh.flush()
+
+    def _output_duration(self, output_path: Path) -> float | None:
+        if not self.ffprobe_cmd or not output_path.exists():
+            return None
+        try:
+            return probe_media(output_path, self.ffprobe_cmd).duration
+        except UserError:
+            return None
+
+    @contextlib.contextmanager
+    def clips(
+        self,
+        clips: Sequence[tuple[int, TimeRange, Path]],
+        mode: str,
+        encoder: str,
+        record_failure: bool = True,
+    ) -> Iterator[None]:
+        """
+        量測區塊內（同一執行緒）輸出這些區間的耗時與 ffmpeg 結果，結束時各寫一筆紀錄。
+        record_failure=False 用於失敗後會逐段重跑的批次，避免重複紀錄。
+        """
+        started = time.perf_counter()
+        with collect_ffmpeg_runs() as runs:
+            try:
+                yield
+            except Exception as exc:
+                if record_failure:
+                    self._add(clips, mode, encoder, runs, time.perf_counter() - started, str(exc))
+                raise
+            self._add(clips, mode, encoder, runs, time.perf_counter() - started, None)
+
+    def _add(
+        self,
+        clips: Sequence[tuple[int, TimeRange, Path]],
+        mode: str,
+        encoder: str,
+        runs: List[FFmpegRun],
+        wall_time: float,
+        error: str | None,
+    ) -> None:
+        failed = [run.returncode for run in runs if run.returncode != 0]
+        exit_status = failed[0] if failed else (0 if runs else None)
+        usage = _sum_usage([run.usage for run in runs])
+        if runs:
+            with self._lock:
+                self._usages.append(usage)
+        for index, rng, output_path in clips:
+            output_bytes = output_path.stat().st_size if error is None and output_path.exists() else None
+            output_duration = self._output_duration(output_path) if error is None else None
+            clip_seconds = output_duration if output_duration is not None else rng.end - rng.start
+            report = ClipReport(
+                index=index,
+                output=str(output_path),
+                range=rng.label,
+                start=rng.start,
+                end=rng.end,
+                mode=mode,
+                encoder=encoder,
+                batch=len(clips),
+                wall_time=round(wall_time, 4),
+                exit_status=exit_status,
+                input_bytes=usage.read_bytes,
+                output_bytes=output_bytes,
+                output_duration=output_duration,
+                realtime_factor=round(clip_seconds / wall_time, 3) if error is None and wall_time > 0 else None,
+                cpu_user=usage.cpu_user,
+                cpu_sys=usage.cpu_sys,
+                max_rss=usage.max_rss,
+                write_bytes=usage.write_bytes,
+                error=error,
+            )
+            with self._lock:
+                self._clips.append(report)
+            self._write({"type": "clip", "run_id": self.run_id, **asdict(report)})
+
+    def close(self) -> dict:
+        """寫入摘要並關閉檔案，回傳摘要內容"""
+        wall_time = time.perf_counter() - self._started
+        with self._lock:
+            clips = list(self._clips)
+            usage = _sum_usage(self._usages)
+        ok = [clip for clip in clips if clip.error is None]
+        clip_seconds = sum(
+            clip.output_duration if clip.output_duration is not None else clip.end - clip.start for clip in ok
+        )
+        summary = {
+            "type": "summary",
+            "run_id": self.run_id,
+            "started_at": self._started_at,
+            **self.meta,
+            "clips": len(clips),
+            "ok": len(ok),
+            "failed": len(clips) - len(ok),
+            "wall_time": round(wall_time, 4),
+            "clip_seconds": round(clip_seconds, 3),
+            "input_bytes": usage.read_bytes,
+            "output_bytes": sum(clip.output_bytes or 0 for clip in ok),
+            "realtime_factor": round(clip_seconds / wall_time, 3) if wall_time > 0 else None,
+            "cpu_user": usage.cpu_user,
+            "cpu_sys": usage.cpu_sys,
+            "max_rss": usage.max_rss,
+            "write_bytes": usage.write_bytes,
+        }
+        self._write(summary)
+        self._fh.close()
+        return summary
+
+
+def report_clips(
+    report: RunReport | None,
+    clips: Sequence[tuple[int, TimeRange, Path]],
+    mode: str,
+    encoder: str,
+    record_failure: bool = True,
+):
+    """RunReport.clips 的便利包裝；沒有報告時是空的 context manager"""
+    if report is None:
+        return contextlib.nullcontext()
+    return report.clips(clips, mode, encoder, record_failure)
+
+
+def iter_parallel(
+    func: Callable[[T], None], items: Sequence[T], jobs: int = DEFAULT_JOBS
+) -> Iterator[tuple[T, Exception | None]]:
+    """
+    以最多 jobs 個執行緒並行呼叫 func(item)，並依 items 原順序逐一回傳 (item, 錯誤)。
+    單一項目失敗不影響其他項目；jobs <= 1 時直接在目前執行緒依序執行。
+    """
+    if jobs <= 1 or len(items) <= 1:
+        for item in items:
+            try:
+                func(item)
+            except Exception as exc:
+                yield item, exc
+            else:
+                yield item, None
+        return
+
+    with ThreadPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        futures = [pool.submit(func, item) for item in items]
+        for item, future in zip(items, futures):
+            exc = future.exception()
+            yield item, exc
+
+
+def plan_batches(
+    items: Sequence[T],
+    max_size: int,
+    batchable: Callable[[T], bool] = lambda _: True,
+) -> List[List[T]]:
+    """
+    依原順序將連續、可批次的項目分組（每組最多 max_size 個）；
+    不可批次的項目單獨成組，因此依序展開各組即回到原順序。
+    """
+    groups: List[List[T]] = []
+    current: List[T] = []
+    for item in items:
+        if not batchable(item):
+            if current:
+                groups.append(current)
+                current = []
+            groups.append([item])
+            continue
+        current.append(item)
+        if len(current) >= max_size:
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+
+def auto_batch_size(count: int, jobs: int, cap: int = COPY_BATCH_MAX_OUTPUTS) -> int:
+    """讓每個並行 worker 都分到批次，同時不超過單一程序的輸出上限"""
+    per_job = -(-count // max(1, jobs))
+    return max(1, min(cap, per_job))
+
+
+def copy_batch_supported(video_path: Path, ffprobe_cmd: str) -> bool:
+    """來源能否批次 copy（輸出與逐段相同）；無法取得媒體資訊時保守地逐段輸出"""
+    try:
+        info = load_media_info(video_path, ffprobe_cmd)
+    except (UserError, OSError):
+        return False
+    return info is not None and info.copy_batchable
+
+
+@traced("write_srt")
 def write_srt(output_path: Path, cues: Sequence[SRTCue]) -> None:
     output_path.write_text(format_srt(cues), encoding="utf-8")
 
@@ -476,6 +2435,54 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="驗證區間不可超出影片長度（需 ffprobe）",
     )
+    parser.add_argument(
+        "--mode",
+        choices=OUTPUT_MODES,
+        default=MODE_COPY,
+        help="輸出模式：copy（預設，快速無損）、precise（整段重編碼）、smart（只重編碼開頭到下一個關鍵影格）",
+    )
+    parser.add_argument(
+        "--hwaccel",
+        action="store_true",
+        help="precise/smart 重編碼時嘗試使用硬體編碼（VideoToolbox/NVENC）",
+    )
+    parser.add_argument(
+        "--show-drift",
+        action="store_true",
+        help="列出每段 copy 模式實際起點（關鍵影格）與偏移；首次會建立關鍵影格索引快取",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"同時執行的 ffmpeg 數量，預設 {DEFAULT_JOBS}（逐段處理）",
+    )
+    parser.add_argument(
+        "--batch-copy",
+        action="store_true",
+        help="以單一 ffmpeg 程序輸出多個區間（適合同一來源的大量短片段）",
+    )
+    parser.add_argument(
+        "--batch-max",
+        type=int,
+        default=COPY_BATCH_MAX_OUTPUTS,
+        help=f"--batch-copy 時每個 ffmpeg 程序最多輸出的區間數，預設 {COPY_BATCH_MAX_OUTPUTS}",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="即時輸出每段 ffmpeg 進度（百分比、影格、fps、倍速、已寫入大小、預估剩餘時間）到 stderr",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="REPORT.jsonl",
+        help="每段附加一筆 JSON 紀錄（區間、模式、編碼器、耗時、ffmpeg 結束碼、讀取/輸出大小、輸出長度、即時倍率），最後一筆為摘要",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="OUT.json",
+        help="記錄各階段耗時（檔案檢查、字幕解析、探測、ffmpeg 啟動/執行、字幕輸出）並寫成 Chrome trace JSON",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -486,36 +2493,215 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> int:
     args = parse_args()
+    if not args.trace:
+        return run_cli(args)
+    start_tracing()
+    try:
+        with trace_span("main"):
+            return run_cli(args)
+    finally:
+        tracer = stop_tracing()
+        try:
+            tracer.write(Path(args.trace))
+            if args.verbose:
+                print(f"[trace] 已寫入 {args.trace}")
+        except OSError as exc:
+            print(f"[ERR] trace 寫入失敗: {exc}", file=sys.stderr)
+
+
+def run_cli(args: argparse.Namespace) -> int:
     video_path = Path(args.video)
     subs_path = Path(args.subs)
     outdir = Path(args.outdir)
 
     try:
+        if args.jobs < 1:
+            raise UserError("--jobs 需為 1 以上的整數")
+        if args.batch_max < 1:
+            raise UserError("--batch-max 需為 1 以上的整數")
         check_files(video_path, subs_path)
-        ranges = [parse_range(r) for r in args.ranges]
+        with trace_span("parse_ranges", count=len(args.ranges)):
+            ranges = [parse_range(r) for r in args.ranges]
         ensure_unique_titles(ranges)
         ensure_outdir(outdir)
         ffmpeg_cmd, ffprobe_cmd = ensure_ffmpeg_exists()
-        cues = read_srt(subs_path)
-        video_duration = (
-            probe_duration(video_path, ffprobe_cmd) if args.check_duration else None
+        # verbose/報告時量測字幕讀取與切片的 Python 峰值記憶體
+        srt_heap = HeapUsage()
+        with track_peak_heap(srt_heap, enabled=args.verbose or bool(args.report)):
+            cues = load_cues(subs_path)
+        # 智慧輸出/偏移報告需要索引（必要時建立）；精準輸出有快取就拿來定位 seek 點
+        if args.show_drift or args.mode == MODE_SMART:
+            keyframe_index = load_keyframe_index(video_path, ffprobe_cmd)
+        elif args.mode == MODE_PRECISE:
+            keyframe_index = load_keyframe_index(video_path, ffprobe_cmd, build=False)
+        else:
+            keyframe_index = None
+        hwaccel_config = (
+            detect_hwaccel(ffmpeg_cmd) if args.hwaccel and args.mode != MODE_COPY else None
         )
+        if args.verbose:
+            caps = load_ff_capabilities(ffmpeg_cmd)
+            if caps is not None:
+                print(f"[ffmpeg] {caps.path} ({caps.version}，{len(caps.encoders)} 個編碼器)")
+            # 診斷輸出不影響結果：探測失敗就略過這行
+            try:
+                media_info = load_media_info(video_path, ffprobe_cmd)
+            except UserError:
+                media_info = None
+            if media_info is not None:
+                print(f"[media] {video_path.name}: {media_info.summary()}")
+        if keyframe_index is not None:
+            video_duration = keyframe_index.duration if args.check_duration else None
+        else:
+            video_duration = (
+                probe_duration(video_path, ffprobe_cmd) if args.check_duration else None
+            )
         if video_duration is not None:
             for rng in ranges:
                 if rng.end > video_duration:
                     raise UserError(
                         f"區間超出影片長度（影片約 {video_duration:.2f} 秒）: {rng.label}"
                     )
+        tasks = []
         for idx, rng in enumerate(ranges, start=1):
             base = rng.safe_title if rng.safe_title else f"clip_{idx:03d}"
-            video_out = outdir / f"{base}.mp4"
-            subs_out = outdir / f"{base}.srt"
+            tasks.append((rng, outdir / f"{base}.mp4", outdir / f"{base}.srt"))
+        # 所有區間的字幕一次切好（以輸出檔對應），各段只負責寫檔
+        with track_peak_heap(srt_heap, enabled=args.verbose or bool(args.report)):
+            sliced_subs = dict(zip((subs_out for _, _, subs_out in tasks), slice_cues_batch(cues, ranges)))
+        if args.verbose:
+            print(f"[srt] 字幕讀取/切片 Python 峰值記憶體 {srt_heap.peak_bytes / 1_048_576:.2f} MB")
+        index_of = {video_out: idx for idx, (_, video_out, _) in enumerate(tasks, start=1)}
+        video_codec = None
+        if args.report and args.mode == MODE_SMART:
+            video_stream = load_media_info(video_path, ffprobe_cmd).video
+            video_codec = video_stream.codec_name if video_stream else None
+        encoder = describe_encoder(args.mode, hwaccel_config, video_codec)
+
+        if args.show_drift:
+            for rng, video_out, _ in tasks:
+                copy_start, copy_end = keyframe_index.copy_window(rng)
+                print(
+                    f"[copy] {video_out.name}: {rng.label} | 實際 "
+                    f"{format_ffmpeg_time(copy_start)} -> {format_ffmpeg_time(copy_end)}"
+                    f"（起點提前 {rng.start - copy_start:.3f}s）"
+                )
+
+        def progress_printer(name: str, duration: float) -> ProgressCallback | None:
+            if not args.progress:
+                return None
+
+            def report(event: FFmpegProgress) -> None:
+                eta = event.eta(duration)
+                print(
+                    f"[progress] {name} {event.fraction(duration) * 100:5.1f}% "
+                    f"{event.out_time:.1f}/{duration:.1f}s frame={event.frames} fps={event.fps:.1f} "
+                    f"speed={f'{event.speed:.2f}x' if event.speed else 'N/A'} "
+                    f"size={event.total_size // 1024}KB eta={f'{eta:.1f}s' if eta is not None else 'N/A'}",
+                    file=sys.stderr,
+                    flush=True,
+                )
+
+            return report
+
+        def process(task: tuple[TimeRange, Path, Path]) -> None:
+            rng, video_out, subs_out = task
             if args.verbose:
-                title_info = f"{rng.title or base}"
+                title_info = f"{rng.title or video_out.stem}"
                 print(f"[處理] {title_info}: {rng.label} -> {video_out.name}")
-            run_ffmpeg(video_path, rng, video_out, args.verbose, ffmpeg_cmd)
-            sliced_cues = slice_cues(cues, rng)
-            write_srt(subs_out, sliced_cues)
+            with report_clips(report, [(index_of[video_out], rng, video_out)], args.mode, encoder):
+                extract_clip(
+                    video_path,
+                    rng,
+                    video_out,
+                    args.mode,
+                    args.verbose,
+                    ffmpeg_cmd,
+                    ffprobe_cmd,
+                    hwaccel_config,
+                    keyframe_index,
+                    progress_printer(video_out.name, rng.end - rng.start),
+                )
+                write_srt(subs_out, sliced_subs[subs_out])
+
+        def process_batch(batch: List[tuple[TimeRange, Path, Path]]) -> None:
+            if len(batch) == 1:
+                process(batch[0])
+                return
+            if args.verbose:
+                print(f"[批次] {len(batch)} 個區間: {', '.join(t[1].name for t in batch)}")
+            # 批次失敗會逐段重跑並各自留下紀錄，這裡只記錄成功的批次
+            clips = [(index_of[video_out], rng, video_out) for rng, video_out, _ in batch]
+            with report_clips(report, clips, MODE_COPY, encoder, record_failure=False):
+                run_ffmpeg_copy_batch(
+                    video_path,
+                    [(rng, video_out) for rng, video_out, _ in batch],
+                    args.verbose,
+                    ffmpeg_cmd,
+                    progress_printer(
+                        f"{batch[0][1].name}..{batch[-1][1].name}",
+                        max(rng.end - rng.start for rng, _, _ in batch),
+                    ),
+                )
+                try:
+                    for _, _, subs_out in batch:
+                        write_srt(subs_out, sliced_subs[subs_out])
+                except OSError:
+                    # 影片已輸出：先移除，逐段重跑時才不會因輸出檔已存在而失敗
+                    for _, video_out, _ in batch:
+                        try:
+                            video_out.unlink()
+                        except OSError:
+                            pass
+                    raise
+
+        batch_copy = args.batch_copy and args.mode == MODE_COPY
+        if batch_copy and not copy_batch_supported(video_path, ffprobe_cmd):
+            print("[批次] 來源有多軌影像/音訊或字幕軌（或無法讀取媒體資訊），改為逐段輸出")
+            batch_copy = False
+        batch_size = auto_batch_size(len(tasks), args.jobs, args.batch_max) if batch_copy else 1
+        batches = plan_batches(tasks, batch_size)
+
+        report = (
+            RunReport(
+                Path(args.report),
+                ffprobe_cmd,
+                source="cli",
+                video=str(video_path),
+                mode=args.mode,
+                jobs=args.jobs,
+                batch_copy=batch_copy,
+                srt_peak_heap=srt_heap.peak_bytes,
+            )
+            if args.report
+            else None
+        )
+        failed = 0
+        try:
+            for batch, batch_exc in iter_parallel(process_batch, batches, args.jobs):
+                if batch_exc is None:
+                    continue
+                # 批次失敗時逐段重跑，以便指出是哪一段出錯
+                results = (
+                    [(batch[0], batch_exc)] if len(batch) == 1 else list(iter_parallel(process, batch, 1))
+                )
+                for (rng, video_out, _), exc in results:
+                    if exc is None:
+                        continue
+                    failed += 1
+                    msg = str(exc) if isinstance(exc, UserError) else f"非預期錯誤: {exc}"
+                    print(f"[ERR] {video_out.name} ({rng.label}): {msg}", file=sys.stderr)
+        finally:
+            if report is not None:
+                summary = report.close()
+                if args.verbose:
+                    print(
+                        f"[report] {args.report}: {summary['ok']}/{summary['clips']} 段，"
+                        f"{summary['wall_time']:.2f}s，即時倍率 {summary['realtime_factor']}"
+                    )
+        if failed:
+            print(f"[ERR] {failed}/{len(tasks)} 個區間處理失敗", file=sys.stderr)
+            return 1
         if args.verbose:
             print("完成")
         return 0
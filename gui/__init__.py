@@ -4,4 +4,4 @@ FastVideoSlice GUI 模組
 依照 UI_SPEC.md 規格實作的圖形介面版本。
 """
 
-__version__ = "0.1.0"
+__version__ = "0.2.0"
@@ -4,8 +4,25 @@
 
 # 應用程式設定
 APP_NAME = "FastVideoSlice"
-APP_VERSION = "0.1.0"
+APP_VERSION = "0.2.0"
 SETTINGS_FILE = ".fastvideoslice_settings.json"
+# 勾選「執行報告」時寫在輸出資料夾內（JSON Lines，每次執行附加）
+REPORT_FILE = "fastvideoslice_report.jsonl"
+
+# 預覽快取：資料夾名稱（位於記憶體檔案系統或系統 temp 下）、預設容量上限、指定位置的環境變數
+PREVIEW_DIR_NAME = "fastvideoslice_preview"
+PREVIEW_CACHE_MB_DEFAULT = 1024
+PREVIEW_DIR_ENV = "FVS_PREVIEW_DIR"
+
+# 預覽代理檔（位於快取資料夾 proxy/）的預設總大小上限；每支影片的代理檔約為每小時數百 MB 到 1 GB
+PROXY_CACHE_MB_DEFAULT = 4096
+
+# 邊轉邊播：已輸出這麼多秒後開始播放；播到已寫出的結尾時隔這麼久重新載入
+PREVIEW_STREAM_START_SEC = 2.0
+PREVIEW_STREAM_RELOAD_MS = 500
+
+# 邊界預覽：只改開頭或結尾時，只產生並播放該邊界內側這麼多秒
+PREVIEW_BOUNDARY_SEC = 3.0
 
 # 視窗預設大小
 WINDOW_WIDTH = 900
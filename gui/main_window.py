@@ -27,6 +27,7 @@ from PyQt5.QtWidgets import (
     QFileDialog,
     QMessageBox,
     QSplitter,
+    QSpinBox,
     QTableWidgetItem,
 )
 from PyQt5.QtGui import QPalette, QColor
@@ -34,13 +35,15 @@ from PyQt5.QtGui import QPalette, QColor
 from .constants import (
     APP_NAME,
     APP_VERSION,
+    REPORT_FILE,
     WINDOW_WIDTH,
     WINDOW_HEIGHT,
     STYLESHEET,
 )
-from .range_table import RangeTableWidget
+from . import preview_cache
+from .range_table import COL_PRECISE, COL_SMART, RangeTableWidget
 from .settings_manager import SettingsManager
-from .worker import SliceWorker
+from .worker import KeyframeIndexWorker, ProxyWorker, SliceWorker
 from .preview_dialog import PreviewDialog
 
 import fast_video_slice as fvs
@@ -56,6 +59,8 @@ class MainWindow(QMainWindow):
 
         self.settings = SettingsManager()
         self.worker: Optional[SliceWorker] = None
+        self.index_worker: Optional[KeyframeIndexWorker] = None
+        self.proxy_worker: Optional[ProxyWorker] = None
         self.subs_overrides: dict[int, str] = {}
         self.adjusted_flags: dict[int, bool] = {}
 
@@ -136,6 +141,45 @@ class MainWindow(QMainWindow):
         self.hwaccel_cb.setToolTip("精準輸出/預覽時使用 VideoToolbox（Apple Silicon）加速，降低等待時間")
         options_layout.addWidget(self.hwaccel_cb)
 
+        options_layout.addWidget(QLabel("並行數："))
+        self.jobs_spin = QSpinBox()
+        self.jobs_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.jobs_spin.setToolTip("同時執行的 ffmpeg 數量；精準輸出（重編碼）多段時可明顯縮短總時間")
+        options_layout.addWidget(self.jobs_spin)
+
+        self.batch_copy_cb = QCheckBox("批次 copy")
+        self.batch_copy_cb.setToolTip("非精準區間由同一個 ffmpeg 一次輸出多段，適合同一來源的大量短片段")
+        options_layout.addWidget(self.batch_copy_cb)
+
+        self.report_cb = QCheckBox("執行報告")
+        self.report_cb.setToolTip(f"每段寫一筆 JSON 紀錄（耗時、編碼器、讀取/輸出大小、即時倍率）到輸出資料夾的 {REPORT_FILE}，與 CLI --report 格式相同")
+        options_layout.addWidget(self.report_cb)
+
+        options_layout.addWidget(QLabel("預覽快取 (MB)："))
+        self.preview_cache_spin = QSpinBox()
+        self.preview_cache_spin.setRange(0, 100_000)
+        self.preview_cache_spin.setSingleStep(256)
+        self.preview_cache_spin.setToolTip(
+            "預覽檔依來源、區間與編碼設定快取，重複預覽直接播放；超過上限時刪除最久未用的（0 表示只保留開啟中的預覽）"
+        )
+        options_layout.addWidget(self.preview_cache_spin)
+
+        self.proxy_cb = QCheckBox("預覽代理檔")
+        self.proxy_cb.setToolTip(
+            "背景把整支影片轉成 360p 全 I 影格代理檔（只需一次，會快取），之後精準預覽直接從代理檔切出，"
+            "影格精準且幾乎即時；正式輸出仍讀原始影片"
+        )
+        options_layout.addWidget(self.proxy_cb)
+
+        options_layout.addWidget(QLabel("代理檔上限 (MB)："))
+        self.proxy_cache_spin = QSpinBox()
+        self.proxy_cache_spin.setRange(0, 1_000_000)
+        self.proxy_cache_spin.setSingleStep(1024)
+        self.proxy_cache_spin.setToolTip(
+            "預覽代理檔（快取資料夾的 proxy/）總大小上限；超過時刪除最久未用的代理檔，目前影片的代理檔保留"
+        )
+        options_layout.addWidget(self.proxy_cache_spin)
+
         options_layout.addStretch()
         main_layout.addWidget(options_group)
 
@@ -146,6 +190,7 @@ class MainWindow(QMainWindow):
         # 進度條
         progress_row = QHBoxLayout()
         self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)  # 千分比，長時間重編碼也能平順前進
         self.progress_bar.setValue(0)
         progress_row.addWidget(self.progress_bar, 1)
         self.progress_label = QLabel("")
@@ -208,6 +253,13 @@ class MainWindow(QMainWindow):
         # 區間變更後清理不符行數的覆寫字幕（避免 stale）
         self.range_table.ranges_changed.connect(self._prune_sub_overrides)
 
+        # 影片變更時建立關鍵影格索引，供表格顯示 copy 偏移
+        self.video_edit.editingFinished.connect(self._load_keyframe_index)
+        self.video_edit.editingFinished.connect(self._load_proxy)
+        self.proxy_cb.toggled.connect(lambda _checked: self._load_proxy())
+        self.proxy_cache_spin.valueChanged.connect(lambda _mb: self._evict_proxies())
+        self.preview_cache_spin.valueChanged.connect(preview_cache.configure)
+
     def _browse_video(self) -> None:
         path, _ = QFileDialog.getOpenFileName(
             self,
@@ -217,11 +269,85 @@ class MainWindow(QMainWindow):
         )
         if path:
             self.video_edit.setText(path)
+            self._load_keyframe_index()
+            self._load_proxy()
             # 自動填入同名字幕檔（如果存在）
             srt_path = Path(path).with_suffix(".srt")
             if srt_path.exists() and not self.subs_edit.text():
                 self.subs_edit.setText(str(srt_path))
 
+    def _load_keyframe_index(self) -> None:
+        """背景建立/讀取目前影片的關鍵影格索引（有快取時幾乎即時）"""
+        video = self.video_edit.text().strip()
+        self.range_table.set_keyframe_index(None)
+        if not video or not Path(video).is_file():
+            return
+        if self.index_worker and self.index_worker.isRunning():
+            self.index_worker.finished_ok.disconnect()
+            self.index_worker.finished_error.disconnect()
+            self.index_worker.cancel()
+        self.index_worker = KeyframeIndexWorker(Path(video), parent=self)
+        self.index_worker.finished_ok.connect(self._on_keyframe_index_ready)
+        self.index_worker.finished_error.connect(
+            lambda _path, msg: self._on_log(f"[WARN] 關鍵影格索引建立失敗：{msg}")
+        )
+        self.index_worker.finished.connect(lambda w=self.index_worker: self._release_worker("index_worker", w))
+        self.index_worker.start()
+
+    def _release_worker(self, attr: str, worker) -> None:
+        """背景執行緒結束後釋放；仍是目前的工作時一併清掉參考，避免之後存取已刪除的物件"""
+        if getattr(self, attr) is worker:
+            setattr(self, attr, None)
+        worker.deleteLater()
+
+    def _on_keyframe_index_ready(self, video: str, index: fvs.KeyframeIndex) -> None:
+        if video != self.video_edit.text().strip():
+            return  # 影片已變更，忽略過期結果
+        self.range_table.set_keyframe_index(index)
+
+    def _load_proxy(self) -> None:
+        """勾選「預覽代理檔」時背景建立目前影片的代理檔（有快取時立即完成）；影片變更或取消勾選時停止舊的"""
+        video = self.video_edit.text().strip()
+        if self.proxy_worker and self.proxy_worker.isRunning():
+            if self.proxy_cb.isChecked() and str(self.proxy_worker.video) == video:
+                return
+            # 舊的轉檔在下一次進度回報時結束，結果不再處理
+            self.proxy_worker.cancel()
+            self.proxy_worker.progress.disconnect()
+            self.proxy_worker.finished_ok.disconnect()
+            self.proxy_worker.finished_error.disconnect()
+            self.proxy_worker = None
+        self.proxy_cb.setText("預覽代理檔")
+        if not self.proxy_cb.isChecked() or not video or not Path(video).is_file():
+            return
+        self.proxy_worker = ProxyWorker(Path(video), self.proxy_cache_spin.value() * preview_cache.MB, parent=self)
+        self.proxy_worker.progress.connect(self._on_proxy_progress)
+        self.proxy_worker.finished_ok.connect(self._on_proxy_ready)
+        self.proxy_worker.finished_error.connect(
+            lambda _path, msg: self._on_log(f"[WARN] 預覽代理檔建立失敗：{msg}")
+        )
+        self.proxy_worker.finished.connect(lambda w=self.proxy_worker: self._release_worker("proxy_worker", w))
+        self.proxy_worker.start()
+
+    def _evict_proxies(self) -> None:
+        """依「代理檔上限」淘汰最久未用的代理檔（保留目前影片的）"""
+        video = self.video_edit.text().strip()
+        try:
+            keep = fvs.load_proxy(Path(video), build=False) if video and Path(video).is_file() else None
+            fvs.evict_proxies(self.proxy_cache_spin.value() * preview_cache.MB, keep)
+        except OSError:
+            pass  # 清理失敗不影響使用
+
+    def _on_proxy_progress(self, video: str, fraction: float) -> None:
+        if video == self.video_edit.text().strip():
+            self.proxy_cb.setText(f"預覽代理檔（{fraction:.0%}）")
+
+    def _on_proxy_ready(self, video: str, proxy: str) -> None:
+        if video != self.video_edit.text().strip():
+            return
+        self.proxy_cb.setText("預覽代理檔（就緒）")
+        self._on_log(f"預覽代理檔就緒：{proxy}")
+
     def _browse_subs(self) -> None:
         start_dir = self.subs_edit.text() or self.video_edit.text() or str(Path.home())
         path, _ = QFileDialog.getOpenFileName(
@@ -270,6 +396,7 @@ class MainWindow(QMainWindow):
             initial_subs_text=self.subs_overrides.get(row),
             initial_precise=rng.get("precise", False),
             use_hwaccel_default=self.hwaccel_cb.isChecked(),
+            use_proxy=self.proxy_cb.isChecked(),
             parent=self,
         )
         dialog.range_applied.connect(
@@ -326,6 +453,7 @@ class MainWindow(QMainWindow):
 
         precise_flags = [r.get("precise", False) for r in ranges]
         adjusted_flags = [r.get("adjusted", False) for r in ranges]
+        smart_flags = [r.get("smart", False) for r in ranges]
 
         # 啟動工作執行緒
         self.worker = SliceWorker(
@@ -340,8 +468,12 @@ class MainWindow(QMainWindow):
             precise_flags=precise_flags,
             use_hwaccel=self.hwaccel_cb.isChecked(),
             adjusted_flags=adjusted_flags,
+            jobs=self.jobs_spin.value(),
+            batch_copy=self.batch_copy_cb.isChecked(),
+            smart_flags=smart_flags,
+            report_path=Path(outdir) / REPORT_FILE if self.report_cb.isChecked() else None,
         )
-        self.worker.progress.connect(self._on_progress)
+        self.worker.progress_detail.connect(self._on_progress_detail)
         self.worker.log.connect(self._on_log)
         self.worker.finished_ok.connect(self._on_finished_ok)
         self.worker.finished_error.connect(self._on_finished_error)
@@ -353,9 +485,9 @@ class MainWindow(QMainWindow):
         self.subs_browse_btn.setEnabled(not running)
         self.outdir_browse_btn.setEnabled(not running)
 
-    def _on_progress(self, current: int, total: int, message: str) -> None:
-        percent = int(current / total * 100) if total > 0 else 0
-        self.progress_bar.setValue(percent)
+    def _on_progress_detail(self, fraction: float, message: str) -> None:
+        # 進度依區間長度加權；失敗重跑等情況下只前進不後退
+        self.progress_bar.setValue(max(self.progress_bar.value(), int(fraction * 1000)))
         self.progress_label.setText(message)
 
     def _on_log(self, message: str) -> None:
@@ -363,7 +495,7 @@ class MainWindow(QMainWindow):
 
     def _on_finished_ok(self, output_files: list) -> None:
         self._set_running(False)
-        self.progress_bar.setValue(100)
+        self.progress_bar.setValue(self.progress_bar.maximum())
         self.progress_label.setText("完成！")
 
         QMessageBox.information(
@@ -421,7 +553,11 @@ class MainWindow(QMainWindow):
         precise_item = QTableWidgetItem("精準輸出")
         precise_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
         precise_item.setCheckState(Qt.Checked if precise else Qt.Unchecked)
-        table.setItem(row, 5, precise_item)
+        table.setItem(row, COL_PRECISE, precise_item)
+        smart_item = table.item(row, COL_SMART)
+        if precise and smart_item and smart_item.checkState() == Qt.Checked:
+            # 精準與智慧互斥，預覽套用精準時取消智慧勾選
+            smart_item.setCheckState(Qt.Unchecked)
         # 已調整狀態：若原本已有勾選，或此次有變更，設為 ✓
         prev_adjusted = self.adjusted_flags.get(row, False)
         adjusted = True or prev_adjusted
@@ -435,6 +571,7 @@ class MainWindow(QMainWindow):
         table.blockSignals(False)
         self.subs_overrides[row] = subs_text
         self.adjusted_flags[row] = adjusted
+        self.range_table.refresh_drift([row])
         self.range_table.ranges_changed.emit()
 
     def _prune_sub_overrides(self) -> None:
@@ -456,7 +593,17 @@ class MainWindow(QMainWindow):
         self.verbose_cb.setChecked(self.settings.verbose)
         self.append_time_cb.setChecked(self.settings.append_time_to_filename)
         self.hwaccel_cb.setChecked(self.settings.precise_use_hwaccel)
+        self.jobs_spin.setValue(self.settings.jobs)
+        self.batch_copy_cb.setChecked(self.settings.batch_copy)
+        self.report_cb.setChecked(self.settings.write_report)
+        self.preview_cache_spin.setValue(self.settings.preview_cache_mb)
+        preview_cache.configure(self.settings.preview_cache_mb)
+        self.proxy_cb.setChecked(self.settings.preview_proxy)
+        self.proxy_cache_spin.setValue(self.settings.proxy_cache_mb)
+        self._evict_proxies()
         self.range_table.set_ranges(self.settings.last_ranges)
+        self._load_keyframe_index()
+        self._load_proxy()
 
         # 視窗位置
         geom = self.settings.window_geometry
@@ -473,6 +620,12 @@ class MainWindow(QMainWindow):
         self.settings.verbose = self.verbose_cb.isChecked()
         self.settings.append_time_to_filename = self.append_time_cb.isChecked()
         self.settings.precise_use_hwaccel = self.hwaccel_cb.isChecked()
+        self.settings.jobs = self.jobs_spin.value()
+        self.settings.batch_copy = self.batch_copy_cb.isChecked()
+        self.settings.write_report = self.report_cb.isChecked()
+        self.settings.preview_cache_mb = self.preview_cache_spin.value()
+        self.settings.preview_proxy = self.proxy_cb.isChecked()
+        self.settings.proxy_cache_mb = self.proxy_cache_spin.value()
         self.settings.last_ranges = self.range_table.get_ranges()
         self.settings.window_geometry = {
             "x": self.x(),
@@ -497,15 +650,23 @@ class MainWindow(QMainWindow):
                 return
             self.worker.cancel()
             self.worker.wait()
+        for index_worker in self.findChildren(KeyframeIndexWorker):
+            # 結束 ffprobe 掃描再等待（包含被新影片取代、已斷開信號的舊掃描），關閉不必等長片掃完
+            index_worker.cancel()
+            index_worker.wait()
+        for proxy_worker in self.findChildren(ProxyWorker):
+            # 未完成的代理檔只寫在暫存檔，結束 ffmpeg 即可（包含已取消但尚未結束的舊轉檔）
+            proxy_worker.cancel()
+            proxy_worker.wait()
         event.accept()
 
 
 def run_app() -> int:
     """啟動應用程式"""
-    import tempfile
-
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
+    # FVS_TRACE=out.json 時記錄各階段耗時，關閉程式時寫出
+    fvs.start_tracing_from_env()
 
     # 強制使用淺色系調色盤，避免系統深色主題影響
     palette = QPalette()
@@ -520,12 +681,9 @@ def run_app() -> int:
     palette.setColor(QPalette.HighlightedText, QColor("#FFFFFF"))
     app.setPalette(palette)
 
-    # 啟動時清理殘留的預覽暫存
+    # 啟動時清理當掉/中斷留下的預覽暫存與舊版預覽檔，並依容量上限淘汰
     try:
-        temp_dir = Path(tempfile.gettempdir()) / "fastvideoslice_preview"
-        if temp_dir.exists():
-            for p in temp_dir.glob("*.mp4"):
-                p.unlink()
+        preview_cache.default_cache().sweep()
     except Exception:
         pass  # 清理失敗不影響啟動
 
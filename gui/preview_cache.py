@@ -0,0 +1,198 @@
+"""
+預覽快取
+
+預覽檔以「來源檔識別 + 預覽 ffmpeg 參數（區間、seek、模式、編碼設定）」命名，
+同一段預覽再次開啟或切回原本模式時直接播放，不重跑 ffmpeg；
+總大小超過上限時依最近使用時間（LRU）刪除，開啟中的預覽不會被刪。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+import fast_video_slice as fvs
+
+from .constants import PREVIEW_CACHE_MB_DEFAULT, PREVIEW_DIR_ENV, PREVIEW_DIR_NAME
+
+MB = 1024 * 1024
+PARTIAL_SUFFIX = ".part.mp4"
+# 超過此時間未寫入的暫存檔視為當掉或被中斷的程序留下的（執行中的 ffmpeg 會持續寫入）
+ORPHAN_AGE = 600.0
+# 舊版以 uuid 命名、不會重用的預覽檔
+LEGACY_PATTERN = "preview_*.mp4"
+
+
+def preview_root() -> Path:
+    """
+    預覽資料夾：FVS_PREVIEW_DIR，否則系統 temp 下的 fastvideoslice_preview。
+    快取會跨次保留，預設放在磁碟；要放記憶體檔案系統（例如 /dev/shm）需自行以 FVS_PREVIEW_DIR 指定。
+    都無法建立時仍回傳最後一個候選，由 PreviewCache.ensure_root 在產生預覽前回報。
+    """
+    candidates = []
+    env_path = os.environ.get(PREVIEW_DIR_ENV)
+    if env_path:
+        candidates.append(Path(env_path))
+    candidates.append(Path(tempfile.gettempdir()) / PREVIEW_DIR_NAME)
+    for path in candidates:
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            return path
+        except OSError:
+            continue
+    return candidates[-1]
+
+
+class PreviewCache:
+    """以內容為鍵、有容量上限的預覽檔快取（多個預覽視窗共用，執行緒安全）"""
+
+    def __init__(self, root: Path | None = None, max_bytes: int = PREVIEW_CACHE_MB_DEFAULT * MB) -> None:
+        self.max_bytes = max_bytes
+        self.root = root if root is not None else preview_root()
+        self.ensure_root()
+        self._lock = threading.Lock()
+        self._pinned: Dict[Path, int] = {}
+
+    def ensure_root(self) -> bool:
+        """
+        確認預覽資料夾可寫入（必要時建立）。無法使用時只是無法產生預覽，
+        由呼叫端提示，不影響開啟預覽視窗或其他功能。
+        """
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return False
+        return os.access(self.root, os.W_OK)
+
+    def key(self, video_path: Path, cmd: List[str], output_path: Path, *extra_paths: Path) -> str:
+        """
+        預覽命令中的來源/輸出路徑換成佔位字後，與來源檔識別（路徑/大小/修改時間）一起雜湊；
+        區間、seek 點、精準與否、編碼器與縮放參數都在命令裡，任何一項不同就是不同的預覽。
+        extra_paths 是命令另外寫出的暫存檔（例如邊轉邊播的串流檔）；tee 參數內的路徑經過跳脫，
+        跳脫後的寫法也一併換掉。
+        """
+        replaced = [(str(video_path), "{input}")]
+        for i, path in enumerate((output_path, *extra_paths)):
+            placeholder = "{output}" if i == 0 else f"{{output{i}}}"
+            replaced += [(fvs.tee_escape(path), placeholder), (str(path), placeholder)]
+        payload = [fvs.file_identity(video_path)]
+        for arg in cmd:
+            for old, new in replaced:
+                arg = arg.replace(old, new)
+            payload.append(arg)
+        return hashlib.sha1(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()[:24]
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}.mp4"
+
+    def lookup(self, key: str) -> Path | None:
+        """命中時更新使用時間（LRU 依據）並回傳檔案路徑"""
+        path = self.path_for(key)
+        try:
+            if path.stat().st_size <= 0:
+                return None
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def new_partial(self) -> Path:
+        """ffmpeg 寫入中的暫存輸出；完成後以 commit 改名，失敗/取消以 discard 刪除"""
+        return self.root / f"{uuid.uuid4().hex}{PARTIAL_SUFFIX}"
+
+    def commit(self, key: str, partial: Path) -> Path:
+        """暫存輸出改名為快取檔；呼叫端 pin 住之後再 evict，剛產生的預覽才不會被淘汰"""
+        path = self.path_for(key)
+        os.replace(partial, path)
+        return path
+
+    def discard(self, partial: Path | None) -> None:
+        if partial is None:
+            return
+        try:
+            partial.unlink()
+        except OSError:
+            pass
+
+    def pin(self, path: Path) -> None:
+        """播放中的預覽不會被淘汰（可重複 pin，unpin 相同次數後解除）"""
+        with self._lock:
+            self._pinned[path] = self._pinned.get(path, 0) + 1
+
+    def unpin(self, path: Path | None) -> None:
+        if path is None:
+            return
+        with self._lock:
+            count = self._pinned.get(path, 0) - 1
+            if count > 0:
+                self._pinned[path] = count
+            else:
+                self._pinned.pop(path, None)
+
+    def _entries(self) -> List[tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*.mp4"):
+            if path.name.endswith(PARTIAL_SUFFIX):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def usage(self) -> int:
+        """目前快取總大小（位元組，不含寫入中的暫存檔）"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """依最近使用時間由舊到新刪除，直到總大小不超過上限；回傳釋放的位元組"""
+        with self._lock:
+            return fvs.evict_lru((path for _, _, path in self._entries()), self.max_bytes, self._pinned)
+
+    def sweep(self) -> int:
+        """
+        啟動時清理：當掉/中斷留下的暫存輸出、舊版不會重用的 preview_*.mp4
+        （包含舊位置的系統 temp 資料夾），最後依上限淘汰；回傳刪除的檔案數。
+        """
+        removed = 0
+        now = time.time()
+        dirs = {self.root, Path(tempfile.gettempdir()) / PREVIEW_DIR_NAME}
+        for folder in dirs:
+            if not folder.is_dir():
+                continue
+            for path in [*folder.glob(f"*{PARTIAL_SUFFIX}"), *folder.glob(LEGACY_PATTERN)]:
+                try:
+                    if path.name.endswith(PARTIAL_SUFFIX) and now - path.stat().st_mtime < ORPHAN_AGE:
+                        continue
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+        before = len(self._entries())
+        self.evict()
+        return removed + before - len(self._entries())
+
+
+_default_cache: PreviewCache | None = None
+
+
+def default_cache() -> PreviewCache:
+    """程式共用的預覽快取（第一次使用時決定資料夾）"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PreviewCache()
+    return _default_cache
+
+
+def configure(max_mb: int) -> PreviewCache:
+    """調整共用快取的容量上限（MB，0 表示只保留開啟中的預覽），並立即依新上限淘汰"""
+    cache = default_cache()
+    cache.max_bytes = max(0, max_mb) * MB
+    cache.evict()
+    return cache
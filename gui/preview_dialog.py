@@ -1,15 +1,16 @@
 """
 預覽與微調對話框
 
-使用 ffmpeg 先產生暫存預覽檔，再用 QMediaPlayer 播放，
+使用 ffmpeg 先產生預覽檔（存入預覽快取，相同內容再次預覽時直接播放；精準預覽在有代理檔時
+直接從代理檔 copy 切出；重編碼預覽可邊轉邊播；只改一側時間時只產生該邊界附近；精準預覽可先播 copy 版再於背景換成精準版），再用 QMediaPlayer 播放，
 同時顯示該區間的字幕片段，允許使用者用毫秒精度微調時間。
 """
 
-import tempfile
-import uuid
+import time
+from dataclasses import asdict
 from pathlib import Path
 
-from PyQt5.QtCore import Qt, QUrl, pyqtSignal, QProcess
+from PyQt5.QtCore import Qt, QUrl, pyqtSignal, QProcess, QTimer
 from PyQt5.QtWidgets import (
     QDialog,
     QVBoxLayout,
@@ -27,6 +28,14 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer  # type: ignore
 from PyQt5.QtMultimediaWidgets import QVideoWidget  # type: ignore
 
+from . import preview_cache
+from .constants import (
+    PREVIEW_BOUNDARY_SEC,
+    PREVIEW_DIR_ENV,
+    PREVIEW_STREAM_RELOAD_MS,
+    PREVIEW_STREAM_START_SEC,
+)
+from .worker import PreviewSourceWorker
 import fast_video_slice as fvs
 
 
@@ -45,6 +54,8 @@ class PreviewDialog(QDialog):
         initial_subs_text: str | None = None,
         initial_precise: bool = False,
         use_hwaccel_default: bool = True,
+        cache: preview_cache.PreviewCache | None = None,
+        use_proxy: bool = False,
         parent=None,
     ) -> None:
         super().__init__(parent)
@@ -59,14 +70,42 @@ class PreviewDialog(QDialog):
         self._subs_dirty = False
         self._busy = False
         self._proc: QProcess | None = None
+        self._proc_started = 0.0
+        # 預覽 ffmpeg 由 QProcess 回收，無法取得 rusage；執行中定期從 /proc 取樣（僅 Linux）
+        self._proc_usage: fvs.ProcessUsage | None = None
+        self._usage_timer = QTimer(self)
+        self._usage_timer.setInterval(250)
+        self._usage_timer.timeout.connect(self._sample_proc_usage)
         self._hwaccel_config: fvs.HWAccelConfig | None = None
-        self._sliced_cues: list[fvs.SRTCue] = []
+        self._keyframe_index: fvs.KeyframeIndex | None = None
+        self._use_proxy = use_proxy
+        self._proxy_path: Path | None = None
+        self._media_info: fvs.MediaInfo | None = None
+        # 來源資訊在背景讀取：媒體資訊每個對話框只探測一次，索引與代理檔在尚未取得時每次預覽前再查
+        self._ffprobe_cmd: str | None = None
+        self._media_probed = False
+        self._sources_fresh = False
+        self._source_worker: PreviewSourceWorker | None = None
+        self._sliced_cues: fvs.CueStore = fvs.CueStore()
+        self._live_index = fvs.CueIndex(self._sliced_cues)
         self._suppress_errors = False
-        self._sliced_cues = []
 
-        self.temp_dir = Path(tempfile.gettempdir()) / "fastvideoslice_preview"
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
-        self.preview_path = self.temp_dir / f"preview_{uuid.uuid4().hex}.mp4"
+        self._cache = cache if cache is not None else preview_cache.default_cache()
+        self.preview_path: Path | None = None  # 目前播放中的快取檔（pin 住不被淘汰）
+        self._pending: tuple[str, Path] | None = None  # 產生中的 (快取鍵, 暫存輸出)
+        # 邊轉邊播：ffmpeg 另寫的片段式 MP4、是否已開始播放、進度輸出緩衝、載入後要跳到的位置
+        self._stream_path: Path | None = None
+        self._streaming = False
+        self._progress_buf = ""
+        self._resume_ms = 0
+        # 邊界預覽：已預覽過的區間與預覽設定（其餘部分可沿用）、本次只播放的邊界片段與其位置（開頭/結尾）
+        self._reviewed: tuple[float, float, tuple] | None = None
+        self._window: fvs.TimeRange | None = None
+        self._window_edge = ""
+        # 漸進預覽：copy 版播放後才執行的精準版 (命令, 快取鍵, 暫存輸出)、目前的 ffmpeg 是先行的 copy 版或背景精準版
+        self._upgrade: tuple[list[str], str, Path] | None = None
+        self._copy_first = False
+        self._upgrading = False
 
         self._build_ui(start, end, initial_precise, use_hwaccel_default)
         if initial_subs_text:
@@ -103,6 +142,7 @@ class PreviewDialog(QDialog):
         self._duration_ms = 0
         self.player.durationChanged.connect(self._on_duration_changed)
         self.player.positionChanged.connect(self._on_position_changed)
+        self.player.mediaStatusChanged.connect(self._on_media_status)
 
         playback_controls = QHBoxLayout()
         self.play_btn = QPushButton("播放")
@@ -145,6 +185,9 @@ class PreviewDialog(QDialog):
         self.end_edit = QLineEdit(end)
         self.end_edit.setPlaceholderText("HH:MM:SS.ff（ff 為影格，預設 30fps）")
         controls.addWidget(self.end_edit)
+        # 背景精準版對應修改前的時間，修改後即過期
+        self.start_edit.textEdited.connect(self._cancel_upgrade)
+        self.end_edit.textEdited.connect(self._cancel_upgrade)
 
         self.refresh_btn = QPushButton("重新產生預覽")
         self.refresh_btn.clicked.connect(self._generate_preview)
@@ -177,6 +220,34 @@ class PreviewDialog(QDialog):
         self.hwaccel_cb.setChecked(use_hwaccel_default)
         precise_layout.addWidget(self.hwaccel_cb)
 
+        # 兩者是精準預覽等待重編碼的兩種做法，只能擇一：勾選其中一個就取消另一個
+        self.stream_cb = QCheckBox("邊轉邊播")
+        self.stream_cb.setChecked(False)
+        self.stream_cb.setToolTip(
+            "精準預覽重編碼時，寫出前幾秒就開始播放，不必等整段轉完；與「先播 copy 預覽」擇一"
+        )
+        precise_layout.addWidget(self.stream_cb)
+
+        self.progressive_cb = QCheckBox("先播 copy 預覽")
+        self.progressive_cb.setChecked(True)
+        self.progressive_cb.setToolTip(
+            "精準預覽需要重編碼時，先以 copy 產生（幾乎立即）並播放，精準版在背景產生後於同一位置換上；"
+            "期間修改時間或精準/硬體設定會取消背景精準版。與「邊轉邊播」擇一"
+        )
+        self.precise_cb.clicked.connect(self._cancel_upgrade)
+        self.hwaccel_cb.toggled.connect(self._cancel_upgrade)
+        self.stream_cb.toggled.connect(lambda on: on and self.progressive_cb.setChecked(False))
+        self.progressive_cb.toggled.connect(lambda on: on and self.stream_cb.setChecked(False))
+        precise_layout.addWidget(self.progressive_cb)
+
+        self.boundary_cb = QCheckBox("只預覽變動的邊界")
+        self.boundary_cb.setChecked(True)
+        self.boundary_cb.setToolTip(
+            f"只改開頭或結尾時，只產生並播放該邊界內側 {PREVIEW_BOUNDARY_SEC:g} 秒，其餘沿用已預覽的內容；"
+            "兩側都改或切換精準/硬體加速時產生完整預覽。套用到列表仍是完整區間"
+        )
+        precise_layout.addWidget(self.boundary_cb)
+
         precise_layout.addStretch()
         layout.addLayout(precise_layout)
 
@@ -199,9 +270,11 @@ class PreviewDialog(QDialog):
         self.subs_preview.textChanged.connect(self._on_subs_changed)
         layout.addWidget(self.subs_preview, 1)
 
+    @fvs.traced("PreviewDialog._generate_preview")
     def _generate_preview(self) -> None:
         if self._busy:
             return
+        self._cancel_upgrade()
         self._set_busy(True, "產生預覽中...")
         start_text = self.start_edit.text().strip()
         end_text = self.end_edit.text().strip()
@@ -217,10 +290,16 @@ class PreviewDialog(QDialog):
 
         try:
             if self._ffmpeg_cmd is None:
-                ffmpeg_cmd, _ = fvs.ensure_ffmpeg_exists()
-                self._ffmpeg_cmd = ffmpeg_cmd
+                self._ffmpeg_cmd, self._ffprobe_cmd = fvs.ensure_ffmpeg_exists()
+            if not self._sources_fresh and self._sources_missing():
+                # 讀完來源資訊（_on_sources_loaded）再重新產生，UI 執行緒不等 ffprobe
+                self._load_sources()
+                return
+            self._sources_fresh = False
+            if self._media_info and end_sec > self._media_info.duration:
+                raise fvs.UserError(f"區間超出影片長度（影片約 {self._media_info.duration:.2f} 秒）")
             if self._cues is None:
-                self._cues = fvs.read_srt(self.subs_path)
+                self._cues = fvs.CueIndex(fvs.load_cues(self.subs_path))
             if self._hwaccel_config is None and self.hwaccel_cb.isChecked():
                 self._hwaccel_config = fvs.detect_hwaccel(self._ffmpeg_cmd)
 
@@ -232,10 +311,48 @@ class PreviewDialog(QDialog):
                 safe_title=fvs.sanitize_title(self.title) if self.title else None,
             )
 
-            if self.preview_path.exists():
-                self.preview_path.unlink()
-
-            cmd = self._build_ffmpeg_cmd(rng)
+            self._window = self._boundary_window(rng)
+            if not self._cache.ensure_root():
+                raise fvs.UserError(
+                    f"預覽資料夾無法寫入：{self._cache.root}\n可設定環境變數 {PREVIEW_DIR_ENV} 指定其他資料夾"
+                )
+            partial = self._cache.new_partial()
+            cmd = self._build_ffmpeg_cmd(self._window or rng, partial)
+            stream = None
+            if self._streams():
+                # 串流版多了關鍵影格與 -map 參數，編碼結果不同，快取鍵要取自實際執行的命令
+                stream = self._cache.new_partial()
+                cmd = fvs.build_streaming_cmd(cmd, stream)
+            key = self._cache.key(self.video_path, cmd, partial, *([stream] if stream else []))
+            cached = self._cache.lookup(key)
+            if cached is not None:
+                fvs.trace_record("preview.cache_hit", time.perf_counter(), range=rng.label)
+                self._show_preview(cached, rng)
+                self._mark_reviewed(rng)
+                self.status_label.setText(self._done_text("快取"))
+                self.status_label.setToolTip(f"預覽快取：{cached}")
+                self._set_busy(False)
+                return
+            if stream is None and self.precise_cb.isChecked() and not self._from_proxy() and self.progressive_cb.isChecked():
+                # 先產生/播放 copy 版，精準版排在其後於背景產生
+                self._upgrade = (cmd, key, partial)
+                copy_partial = self._cache.new_partial()
+                copy_cmd = self._build_copy_cmd(self._window or rng, copy_partial)
+                copy_key = self._cache.key(self.video_path, copy_cmd, copy_partial)
+                copy_cached = self._cache.lookup(copy_key)
+                if copy_cached is not None:
+                    self._show_preview(copy_cached, rng)
+                    self._set_busy(False)
+                    self._start_upgrade(rng)
+                    return
+                self._pending = (copy_key, copy_partial)
+                self._copy_first = True
+                self._start_process(copy_cmd, rng)
+                return
+            self._pending = (key, partial)
+            if stream is not None:
+                self._stream_path = stream
+                cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
             self._start_process(cmd, rng)
         except fvs.UserError as exc:
             QMessageBox.warning(self, "預覽失敗", str(exc))
@@ -244,6 +361,47 @@ class PreviewDialog(QDialog):
             QMessageBox.critical(self, "預覽失敗", f"非預期錯誤：{exc}")
             self._set_busy(False)
 
+    def _preview_settings(self) -> tuple:
+        """影響預覽畫面的設定；與已預覽時不同就需要完整重新產生"""
+        return (self.precise_cb.isChecked(), self.hwaccel_cb.isChecked(), self._proxy_path)
+
+    def _boundary_window(self, rng: fvs.TimeRange) -> fvs.TimeRange | None:
+        """
+        只改了開頭或結尾其中一側時，回傳該邊界內側 PREVIEW_BOUNDARY_SEC 秒的片段；
+        第一次預覽、兩側都改、設定改變或區間本身很短時回傳 None（產生完整預覽）。
+        """
+        self._window_edge = ""
+        if not self.boundary_cb.isChecked() or self._reviewed is None:
+            return None
+        start, end, settings = self._reviewed
+        if settings != self._preview_settings() or rng.end - rng.start <= PREVIEW_BOUNDARY_SEC:
+            return None
+        start_same = abs(rng.start - start) < 1e-6
+        end_same = abs(rng.end - end) < 1e-6
+        if start_same == end_same:
+            return None
+        if start_same:
+            self._window_edge = "結尾"
+            window_start, window_end = rng.end - PREVIEW_BOUNDARY_SEC, rng.end
+        else:
+            self._window_edge = "開頭"
+            window_start, window_end = rng.start, rng.start + PREVIEW_BOUNDARY_SEC
+        return fvs.TimeRange(
+            start=window_start,
+            end=window_end,
+            label=f"{fvs.format_ffmpeg_time(window_start)} -> {fvs.format_ffmpeg_time(window_end)}",
+        )
+
+    def _mark_reviewed(self, rng: fvs.TimeRange) -> None:
+        """預覽成功：邊界預覽時未變的部分沿用先前的預覽，整段都視為已預覽"""
+        self._reviewed = (rng.start, rng.end, self._preview_settings())
+
+    def _done_text(self, source: str = "") -> str:
+        notes = [source] if source else []
+        if self._window is not None:
+            notes.append(f"只產生{self._window_edge} {PREVIEW_BOUNDARY_SEC:g} 秒")
+        return f"預覽已更新（{'，'.join(notes)}）" if notes else "預覽已更新"
+
     def _apply_range(self) -> None:
         start_text = self.start_edit.text().strip()
         end_text = self.end_edit.text().strip()
@@ -301,54 +459,116 @@ class PreviewDialog(QDialog):
     def _toggle_precise_label(self) -> None:
         self.precise_cb.setText("精準輸出：開" if self.precise_cb.isChecked() else "精準輸出：關")
 
-    def _build_ffmpeg_cmd(self, rng: fvs.TimeRange) -> list[str]:
-        if self.precise_cb.isChecked():
+    def _build_ffmpeg_cmd(self, rng: fvs.TimeRange, output_path: Path) -> list[str]:
+        if self._from_proxy():
+            # 代理檔每格都是關鍵影格：copy 切出即精準到影格，與重編碼預覽同為 360p
+            cmd = fvs.build_proxy_preview_cmd(self._proxy_path, rng, output_path, self._ffmpeg_cmd)
+        elif self.precise_cb.isChecked():
             cfg = self._hwaccel_config if self.hwaccel_cb.isChecked() else None
-            vcodec = cfg.vcodec if cfg else ("h264_videotoolbox" if self.hwaccel_cb.isChecked() else "libx264")
-            vopts = cfg.vopts if cfg else (["-b:v", "8M", "-pix_fmt", "yuv420p"] if self.hwaccel_cb.isChecked() else ["-preset", "ultrafast", "-crf", "20"])
-            cmd = [self._ffmpeg_cmd, "-y"]
-            if cfg and cfg.hwaccel_args:
-                cmd += cfg.hwaccel_args
-            elif self.hwaccel_cb.isChecked():
-                cmd += ["-hwaccel", "videotoolbox"]
-            cmd += [
-                "-i",
-                str(self.video_path),
-                "-ss",
-                fvs.format_ffmpeg_time(rng.start),
-                "-t",
-                fvs.format_ffmpeg_time(rng.end - rng.start),
-                "-c:v",
-                vcodec,
-                *vopts,
-                "-vf",
-                "scale=-2:360",
-                "-c:a",
-                "aac",
-                "-ac",
-                "2",
-                "-b:a",
-                "96k",
-                "-movflags",
-                "+faststart",
-                str(self.preview_path),
-            ]
-        else:
-            cmd = [
+            # 兩段式 seek：輸入端跳到前一個關鍵影格（有索引快取時），輸出端再精準裁切
+            cmd = fvs.build_precise_cmd(
+                self.video_path,
+                rng,
+                output_path,
                 self._ffmpeg_cmd,
-                "-y",
-                "-ss",
-                fvs.format_ffmpeg_time(rng.start),
-                "-to",
-                fvs.format_ffmpeg_time(rng.end),
-                "-i",
-                str(self.video_path),
-                "-c",
-                "copy",
-                str(self.preview_path),
-            ]
+                hwaccel_config=cfg,
+                preview_fast=True,
+                keyframe_index=self._keyframe_index,
+            )
+        else:
+            cmd = self._build_copy_cmd(rng, output_path)
         return cmd
 
+    def _build_copy_cmd(self, rng: fvs.TimeRange, output_path: Path) -> list[str]:
+        return [
+            self._ffmpeg_cmd,
+            "-y",
+            "-ss",
+            fvs.format_ffmpeg_time(rng.start),
+            "-to",
+            fvs.format_ffmpeg_time(rng.end),
+            "-i",
+            str(self.video_path),
+            "-c",
+            "copy",
+            str(output_path),
+        ]
+
+    def _start_upgrade(self, rng: fvs.TimeRange) -> None:
+        """copy 版已在播放：背景產生精準版，期間時間等欄位仍可操作"""
+        cmd, key, partial = self._upgrade
+        self._upgrade = None
+        self._pending = (key, partial)
+        self._upgrading = True
+        self._start_process(cmd, rng)
+        self.cancel_btn.setEnabled(True)
+        self.progress.setVisible(True)
+        self.status_label.setText("copy 預覽播放中，背景產生精準版...")
+
+    def _cancel_upgrade(self) -> None:
+        """背景精準版已過期（時間或設定已修改）或被取消：結束 ffmpeg 並刪除暫存輸出"""
+        self._upgrade = None
+        if not self._upgrading:
+            return
+        self._upgrading = False
+        if self._proc:
+            # 不經過 _on_proc_finished，避免跳出失敗訊息或換上過期的預覽
+            self._proc.finished.disconnect()
+            self._proc.errorOccurred.disconnect()
+            self._proc.kill()
+            self._proc.waitForFinished(2000)
+        self._discard_pending()
+        self._cleanup_proc()
+        self.cancel_btn.setEnabled(False)
+        self.progress.setVisible(False)
+        self.status_label.setText("已取消背景精準預覽（目前為 copy 預覽）")
+
+    def _sources_missing(self) -> bool:
+        # 代理檔由主視窗在背景建立，尚未完成時本次照常重編碼，下次預覽再檢查
+        return (
+            not self._media_probed
+            or self._keyframe_index is None
+            or (self._use_proxy and self._proxy_path is None)
+        )
+
+    def _load_sources(self) -> None:
+        if self._source_worker is not None:
+            return
+        self.status_label.setText("讀取影片資訊...")
+        worker = PreviewSourceWorker(
+            self.video_path, self._ffprobe_cmd, not self._media_probed, self._use_proxy, parent=self
+        )
+        worker.finished_ok.connect(self._on_sources_loaded)
+        worker.finished.connect(worker.deleteLater)
+        self._source_worker = worker
+        worker.start()
+
+    def _on_sources_loaded(self, media_info, index, proxy) -> None:
+        self._source_worker = None
+        if not self._media_probed:
+            self._media_probed = True
+            self._media_info = media_info
+        if index is not None:
+            self._keyframe_index = index
+        if proxy is not None:
+            self._proxy_path = proxy
+        if not self.isVisible():
+            return  # 讀取期間對話框已關閉
+        self._set_busy(False)
+        self._sources_fresh = True
+        self._generate_preview()
+
+    def _from_proxy(self) -> bool:
+        return self.precise_cb.isChecked() and self._proxy_path is not None
+
+    def _streams(self) -> bool:
+        return (
+            self.precise_cb.isChecked()
+            and not self._from_proxy()
+            and self.stream_cb.isChecked()
+            and not self.progressive_cb.isChecked()
+        )
+
     def _start_process(self, cmd: list[str], rng: fvs.TimeRange) -> None:
         if self._proc:
             self._proc.kill()
@@ -362,67 +582,190 @@ class PreviewDialog(QDialog):
         self._proc.setProcessEnvironment(env)
         self._proc.finished.connect(lambda *_: self._on_proc_finished(rng))
         self._proc.errorOccurred.connect(self._on_proc_error)
+        if self._stream_path is not None:
+            self._progress_buf = ""
+            self._proc.readyReadStandardOutput.connect(lambda: self._on_proc_output(rng))
+        self._proc_started = time.perf_counter()
+        self._proc_usage = None
         self._proc.start(cmd[0], cmd[1:])
+        self._usage_timer.start()
+
+    def _sample_proc_usage(self) -> None:
+        if self._proc and self._proc.processId():
+            usage = fvs.sample_process_usage(self._proc.processId())
+            if usage is not None:
+                self._proc_usage = usage
+
+    def _on_proc_output(self, rng: fvs.TimeRange) -> None:
+        """讀 ffmpeg 進度；已輸出 PREVIEW_STREAM_START_SEC 秒（或整段）後開始播放片段式輸出"""
+        if not self._proc:
+            return
+        self._progress_buf += bytes(self._proc.readAllStandardOutput()).decode("utf-8", "replace")
+        # 只解析到最後一個完整的進度區塊（以 progress= 結尾），其餘留待下次
+        cut = self._progress_buf.rfind("progress=")
+        cut = self._progress_buf.find("\n", cut) if cut >= 0 else -1
+        if cut < 0:
+            return
+        lines, self._progress_buf = self._progress_buf[:cut].splitlines(), self._progress_buf[cut + 1:]
+        if self._streaming or self._stream_path is None:
+            return
+        for event in fvs.iter_ffmpeg_progress(lines):
+            play_rng = self._window or rng
+            if event.out_time >= min(PREVIEW_STREAM_START_SEC, play_rng.end - play_rng.start) and not event.done:
+                self._streaming = True
+                self._show_preview(self._stream_path, rng)
+                # 產生中仍可播放/暫停；時間與精準設定等完成後才可修改
+                for widget in (self.play_btn, self.pause_btn, self.stop_btn):
+                    widget.setEnabled(True)
+                self.status_label.setText("邊轉邊播：已可播放，仍在產生...")
+                fvs.trace_record("preview.stream_start", self._proc_started, range=rng.label)
+                break
+
+    def _on_media_status(self, status) -> None:
+        if status in (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia) and self._resume_ms:
+            self.player.setPosition(self._resume_ms)
+            self._resume_ms = 0
+        elif status == QMediaPlayer.EndOfMedia and self._streaming:
+            # 播到已寫出的結尾：稍後重新載入成長中的檔案，從目前位置繼續
+            position = self.player.position()
+            QTimer.singleShot(PREVIEW_STREAM_RELOAD_MS, lambda: self._reload_stream(position))
+
+    def _reload_stream(self, position: int) -> None:
+        if not self._streaming or self._stream_path is None:
+            return
+        self._resume_ms = position
+        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(str(self._stream_path))))
+        self.player.play()
 
     def _on_proc_finished(self, rng: fvs.TimeRange) -> None:
         if not self._proc:
             return
-        if self._proc.exitStatus() == QProcess.NormalExit and self._proc.exitCode() == 0:
+        ok = self._proc.exitStatus() == QProcess.NormalExit and self._proc.exitCode() == 0
+        self._usage_timer.stop()
+        usage = self._proc_usage or fvs.ProcessUsage()
+        fvs.trace_record(
+            "preview.ffmpeg", self._proc_started, ok=ok, range=rng.label, upgrade=self._upgrading, **asdict(usage)
+        )
+        self.status_label.setToolTip(
+            f"預覽 ffmpeg：{time.perf_counter() - self._proc_started:.2f}s，{usage.describe()}"
+        )
+        key, partial = self._pending or (None, None)
+        self._pending = None
+        upgrading, self._upgrading = self._upgrading, False
+        copy_first, self._copy_first = self._copy_first, False
+        # 邊轉邊播中途、或精準版取代 copy 版時，從目前播放位置接續
+        position = self.player.position() if self._streaming or upgrading else 0
+        if ok and key is not None:
             try:
-                sliced_cues = fvs.slice_cues(self._cues, rng)
-                self._sliced_cues = sliced_cues
-                if not self._subs_dirty:
-                    self._set_subs_text(fvs.format_srt(sliced_cues), mark_dirty=False)
-                # 初始字幕顯示
-                self._update_live_sub(0)
-
-                media = QMediaContent(QUrl.fromLocalFile(str(self.preview_path)))
-                self.player.setMedia(media)
-                self.player.play()
-
-                self.status_label.setText("預覽已更新")
+                self._show_preview(self._cache.commit(key, partial), rng, position)
+                if copy_first and self._upgrade is None:
+                    # copy 版產生期間精準版已取消（例如切換硬體加速），畫面不是精準版，不記為已預覽
+                    self.status_label.setText("已取消背景精準預覽（目前為 copy 預覽）")
+                elif not copy_first:
+                    self._mark_reviewed(rng)
+                    self.status_label.setText(
+                        self._done_text("代理檔" if self._from_proxy() else "精準版" if upgrading else "")
+                    )
             except Exception as exc:  # pragma: no cover
+                self._cache.discard(partial)
+                self._upgrade = None
                 if not self._suppress_errors:
                     QMessageBox.warning(self, "預覽失敗", f"處理結果時發生錯誤: {exc}")
         else:
+            self._cache.discard(partial)
+            self._upgrade = None
             if not self._suppress_errors:
                 QMessageBox.warning(self, "預覽取消/失敗", "預覽已中斷或失敗")
+        self._discard_stream()
         self._set_busy(False)
         self._cleanup_proc()
+        if self._upgrade is not None:
+            # copy 版已上場，接著在背景產生精準版
+            self._start_upgrade(rng)
+
+    def _show_preview(self, path: Path, rng: fvs.TimeRange, position: int = 0) -> None:
+        """
+        切出區間字幕並播放預覽檔（載入後跳到 position 毫秒）；改 pin 新檔、釋放上一個。
+        邊界預覽時字幕編輯區仍是完整區間，即時字幕對齊播放中的邊界片段。
+        """
+        sliced_cues = fvs.slice_cues(self._cues, rng)
+        self._sliced_cues = sliced_cues
+        live_cues = sliced_cues if self._window is None else fvs.slice_cues(self._cues, self._window)
+        self._live_index = fvs.CueIndex(live_cues)
+        if not self._subs_dirty:
+            self._set_subs_text(fvs.format_srt(sliced_cues), mark_dirty=False)
+        # 初始字幕顯示
+        self._update_live_sub(position)
+
+        self._cache.pin(path)
+        self._resume_ms = position
+        media = QMediaContent(QUrl.fromLocalFile(str(path)))
+        self.player.setMedia(media)
+        self.player.play()
+        self._cache.unpin(self.preview_path)
+        self.preview_path = path
+        self._cache.evict()
 
     def _on_proc_error(self, error) -> None:
+        # 先行 copy 版或背景精準版失敗時同樣結束漸進預覽，下次預覽不沿用過期的狀態
+        self._upgrade = None
+        self._upgrading = self._copy_first = False
+        self._discard_pending()
         if not self._suppress_errors:
             QMessageBox.warning(self, "預覽失敗", f"ffmpeg 執行失敗: {error}")
         self._set_busy(False)
         self._cleanup_proc()
 
     def _cancel_preview(self) -> None:
+        if self._upgrading:
+            self._cancel_upgrade()
+            return
+        self._upgrade = None
+        self._copy_first = False
         if self._proc:
             self._proc.kill()
             self._proc.waitForFinished(2000)
+        self._discard_pending()
         self._set_busy(False, "已取消產生")
         self._cleanup_proc()
 
+    def _discard_pending(self) -> None:
+        """刪除未完成的暫存輸出（取消、錯誤、關閉視窗時）"""
+        if self._pending is not None:
+            self._cache.discard(self._pending[1])
+            self._pending = None
+        self._discard_stream()
+
+    def _discard_stream(self) -> None:
+        """結束邊轉邊播並刪除片段式輸出；未完成就中斷時播放器一併停止"""
+        if self._stream_path is None:
+            return
+        if self.preview_path == self._stream_path:
+            self.player.stop()
+            self.player.setMedia(QMediaContent())
+            self._cache.unpin(self.preview_path)
+            self.preview_path = None
+        self._cache.discard(self._stream_path)
+        self._stream_path = None
+        self._streaming = False
+
     def _cleanup_proc(self) -> None:
+        self._usage_timer.stop()
         if self._proc:
             self._proc.deleteLater()
             self._proc = None
-        # 保留 _sliced_cues，供即時字幕使用
+        # 保留 _sliced_cues 與 _live_index，供即時字幕使用
 
     def _update_live_sub(self, pos_ms: int) -> None:
         """根據播放時間更新下方字幕顯示"""
-        if not self._sliced_cues:
-            self.live_sub_label.setText("")
-            return
-        pos_s = pos_ms / 1000.0
-        text = ""
-        for cue in self._sliced_cues:
-            if cue.start <= pos_s <= cue.end:
-                text = "\n".join(cue.lines)
-                break
-        self.live_sub_label.setText(text)
+        cue = self._live_index.at(pos_ms / 1000.0)
+        self.live_sub_label.setText("\n".join(cue.lines) if cue else "")
 
     def closeEvent(self, event) -> None:
+        if self._source_worker is not None:
+            self._source_worker.finished_ok.disconnect()
+            self._source_worker.wait()
+            self._source_worker = None
         if self._proc:
             self._suppress_errors = True
             proc = self._proc
@@ -430,12 +773,13 @@ class PreviewDialog(QDialog):
             proc.kill()
             proc.waitForFinished(2000)
             proc.deleteLater()
+        self._upgrade = None
+        self._upgrading = self._copy_first = False
+        self._discard_pending()
         self.player.stop()
-        try:
-            if self.preview_path.exists():
-                self.preview_path.unlink()
-        except OSError:
-            pass
+        # 預覽檔留在快取供下次使用，只解除保護
+        self._cache.unpin(self.preview_path)
+        self.preview_path = None
         super().closeEvent(event)
 
     def _set_busy(self, busy: bool, message: str | None = None) -> None:
@@ -29,6 +29,14 @@ from .constants import TIME_PATTERN, COLORS
 import fast_video_slice as fvs
 
 
+# 表格的邏輯欄位序（智慧欄在畫面上移到精準欄旁）
+COL_PRECISE = 5
+COL_DRIFT = 7
+COL_SMART = 8
+# 互斥的勾選欄：勾選其中一欄時取消另一欄
+_EXCLUSIVE_COLUMNS = {COL_PRECISE: COL_SMART, COL_SMART: COL_PRECISE}
+
+
 def _to_seconds(text: str) -> float:
     """將 HH:MM:SS(.ff) 轉為秒數（ff 依 30fps 解讀為影格）"""
     return fvs.parse_hms(text)
@@ -109,6 +117,7 @@ class RangeTableWidget(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._keyframe_index: fvs.KeyframeIndex | None = None
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -117,23 +126,29 @@ class RangeTableWidget(QWidget):
 
         # 表格
         self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(["#", "標題", "開始時間", "結束時間", "備註", "精準", "已調整"])
+        self.table.setColumnCount(9)
+        self.table.setHorizontalHeaderLabels(["#", "標題", "開始時間", "結束時間", "備註", "精準", "已調整", "copy 偏移", "智慧"])
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Fixed)
         header.setSectionResizeMode(1, QHeaderView.Interactive)
         header.setSectionResizeMode(2, QHeaderView.Interactive)
         header.setSectionResizeMode(3, QHeaderView.Interactive)
         header.setSectionResizeMode(4, QHeaderView.Interactive)
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(COL_PRECISE, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(COL_DRIFT, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(COL_SMART, QHeaderView.ResizeToContents)
+        # 智慧輸出欄顯示在精準欄旁（邏輯欄位序不變，舊設定相容）
+        header.moveSection(COL_SMART, COL_PRECISE + 1)
         self.table.setColumnWidth(0, 50)
         self.table.setColumnWidth(1, 200)
         self.table.setColumnWidth(2, 130)
         self.table.setColumnWidth(3, 130)
         self.table.setColumnWidth(4, 200)
-        self.table.setColumnWidth(5, 80)
+        self.table.setColumnWidth(COL_PRECISE, 80)
         self.table.setColumnWidth(6, 80)
+        self.table.setColumnWidth(COL_DRIFT, 90)
+        self.table.setColumnWidth(COL_SMART, 80)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
         self.table.setAlternatingRowColors(True)
@@ -223,7 +238,7 @@ class RangeTableWidget(QWidget):
             self._add_row(title, start, end, note)
             self.ranges_changed.emit()
 
-    def _add_row(self, title: str = "", start: str = "", end: str = "", note: str = "", precise: bool = False, adjusted: bool = False) -> None:
+    def _add_row(self, title: str = "", start: str = "", end: str = "", note: str = "", precise: bool = False, adjusted: bool = False, smart: bool = False) -> None:
         row = self.table.rowCount()
         self.table.blockSignals(True)
         self.table.insertRow(row)
@@ -247,7 +262,7 @@ class RangeTableWidget(QWidget):
         precise_item = QTableWidgetItem("精準輸出")
         precise_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
         precise_item.setCheckState(Qt.Checked if precise else Qt.Unchecked)
-        self.table.setItem(row, 5, precise_item)
+        self.table.setItem(row, COL_PRECISE, precise_item)
 
         # 已調整標記（程式決定，非使用者勾選）
         adjusted_item = QTableWidgetItem("✓" if adjusted else "")
@@ -255,7 +270,18 @@ class RangeTableWidget(QWidget):
         adjusted_item.setTextAlignment(Qt.AlignCenter)
         self.table.setItem(row, 6, adjusted_item)
 
+        # 智慧輸出勾選（與精準互斥）
+        self.table.setItem(row, COL_SMART, self._make_smart_item(smart and not precise))
+
         self.table.blockSignals(False)
+        self._update_drift_cell(row)
+
+    def _make_smart_item(self, checked: bool) -> QTableWidgetItem:
+        smart_item = QTableWidgetItem("智慧輸出")
+        smart_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        smart_item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
+        smart_item.setToolTip("只重編碼起點到下一個關鍵影格，其餘 copy；起點精準且速度接近快速裁切")
+        return smart_item
 
     def _on_delete(self) -> None:
         row = self.table.currentRow()
@@ -271,9 +297,10 @@ class RangeTableWidget(QWidget):
             start = self.table.item(row, 2).text() if self.table.item(row, 2) else ""
             end = self.table.item(row, 3).text() if self.table.item(row, 3) else ""
             note = self.table.item(row, 4).text() if self.table.item(row, 4) else ""
-            precise = self.table.item(row, 5).checkState() == Qt.Checked if self.table.item(row, 5) else False
+            precise = self.table.item(row, COL_PRECISE).checkState() == Qt.Checked if self.table.item(row, COL_PRECISE) else False
             adjusted = self.table.item(row, 6).checkState() == Qt.Checked if self.table.item(row, 6) else False
-            self._add_row(title, start, end, note, precise, adjusted)
+            smart = self.table.item(row, COL_SMART).checkState() == Qt.Checked if self.table.item(row, COL_SMART) else False
+            self._add_row(title, start, end, note, precise, adjusted, smart)
             self.ranges_changed.emit()
 
     def _on_edit_clicked(self) -> None:
@@ -286,8 +313,9 @@ class RangeTableWidget(QWidget):
         start = self.table.item(row, 2).text() if self.table.item(row, 2) else ""
         end = self.table.item(row, 3).text() if self.table.item(row, 3) else ""
         note = self.table.item(row, 4).text() if self.table.item(row, 4) else ""
-        precise = self.table.item(row, 5).checkState() == Qt.Checked if self.table.item(row, 5) else False
+        precise = self.table.item(row, COL_PRECISE).checkState() == Qt.Checked if self.table.item(row, COL_PRECISE) else False
         adjusted = self.table.item(row, 6).checkState() == Qt.Checked if self.table.item(row, 6) else False
+        smart = self.table.item(row, COL_SMART).checkState() == Qt.Checked if self.table.item(row, COL_SMART) else False
 
         dialog = TimeRangeDialog(self, title=title, start=start, end=end, note=note)
         if dialog.exec_() == QDialog.Accepted:
@@ -308,9 +336,11 @@ class RangeTableWidget(QWidget):
             precise_item = QTableWidgetItem("精準輸出")
             precise_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
             precise_item.setCheckState(Qt.Checked if precise else Qt.Unchecked)
-            self.table.setItem(row, 5, precise_item)
+            self.table.setItem(row, COL_PRECISE, precise_item)
+            self.table.setItem(row, COL_SMART, self._make_smart_item(smart))
             self._set_adjusted(row, adjusted)
             self.table.blockSignals(False)
+            self._update_drift_cell(row)
             self.ranges_changed.emit()
 
     def _on_move_up(self) -> None:
@@ -329,7 +359,7 @@ class RangeTableWidget(QWidget):
 
     def _swap_rows(self, row1: int, row2: int) -> None:
         self.table.blockSignals(True)
-        for col in range(1, 7):  # 跳過序號欄
+        for col in range(1, self.table.columnCount()):  # 跳過序號欄
             item1 = self.table.takeItem(row1, col)
             item2 = self.table.takeItem(row2, col)
             self.table.setItem(row1, col, item2)
@@ -347,7 +377,14 @@ class RangeTableWidget(QWidget):
                     item.setBackground(Qt.white)
                 # 任何時間變更都標記為已調整
                 self._mark_adjusted(row)
-        elif col == 5:  # 精準勾選變更
+                self._update_drift_cell(row)
+        elif col in _EXCLUSIVE_COLUMNS:  # 精準/智慧勾選變更（兩者互斥）
+            item = self.table.item(row, col)
+            other = self.table.item(row, _EXCLUSIVE_COLUMNS[col])
+            if item and other and item.checkState() == Qt.Checked and other.checkState() == Qt.Checked:
+                self.table.blockSignals(True)
+                other.setCheckState(Qt.Unchecked)
+                self.table.blockSignals(False)
             self._mark_adjusted(row)
         self.ranges_changed.emit()
 
@@ -374,6 +411,46 @@ class RangeTableWidget(QWidget):
         self.table.setItem(row, 6, adjusted_item)
         self.table.blockSignals(False)
 
+    def set_keyframe_index(self, index: "fvs.KeyframeIndex | None") -> None:
+        """設定來源影片的關鍵影格索引，並更新每列的 copy 偏移"""
+        self._keyframe_index = index
+        self.refresh_drift()
+
+    def refresh_drift(self, rows: Optional[List[int]] = None) -> None:
+        """重新計算 copy 偏移欄（未指定 rows 時更新全部）"""
+        for row in rows if rows is not None else range(self.table.rowCount()):
+            self._update_drift_cell(row)
+
+    def _update_drift_cell(self, row: int) -> None:
+        """依關鍵影格索引顯示 copy 模式實際起點與偏移（無索引或時間無效時留空）"""
+        if row < 0 or row >= self.table.rowCount():
+            return
+        text, tooltip = "", ""
+        start_item = self.table.item(row, 2)
+        end_item = self.table.item(row, 3)
+        if self._keyframe_index is not None and start_item and end_item:
+            try:
+                start = _to_seconds(start_item.text())
+                end = _to_seconds(end_item.text())
+            except fvs.UserError:
+                start = end = None
+            if start is not None and start < end:
+                rng = fvs.TimeRange(start=start, end=end, label="")
+                copy_start, copy_end = self._keyframe_index.copy_window(rng)
+                drift = start - copy_start
+                text = f"-{drift:.3f}s" if drift > 0.0005 else "0"
+                tooltip = (
+                    f"copy 實際輸出：{fvs.format_ffmpeg_time(copy_start)} -> {fvs.format_ffmpeg_time(copy_end)}"
+                    f"\n起點吸附到前一個關鍵影格，提前 {drift:.3f} 秒"
+                )
+        item = QTableWidgetItem(text)
+        item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        item.setTextAlignment(Qt.AlignCenter)
+        item.setToolTip(tooltip)
+        self.table.blockSignals(True)
+        self.table.setItem(row, COL_DRIFT, item)
+        self.table.blockSignals(False)
+
     def _on_import(self) -> None:
         """從文字匯入區間（容錯：以核心 parse_hms 驗證）"""
         from PyQt5.QtWidgets import QInputDialog
@@ -385,6 +462,16 @@ class RangeTableWidget(QWidget):
         if not (ok and text.strip()):
             return
 
+        invalid_lines = self.import_text(text)
+        if invalid_lines:
+            QMessageBox.warning(
+                self,
+                "部分匯入失敗",
+                f"{len(invalid_lines)} 行格式無效或 start>=end，已略過。\n\n無效行：\n" + "\n".join(invalid_lines[:5]),
+            )
+
+    def import_text(self, text: str) -> List[str]:
+        """逐行加入區間（不開對話框），回傳格式無效或 start>=end 而略過的原始行"""
         lines = text.strip().split("\n")
         invalid_lines = []
         added = 0
@@ -421,13 +508,7 @@ class RangeTableWidget(QWidget):
 
         self._update_row_numbers()
         self.ranges_changed.emit()
-
-        if invalid_lines:
-            QMessageBox.warning(
-                self,
-                "部分匯入失敗",
-                f"{len(invalid_lines)} 行格式無效或 start>=end，已略過。\n\n無效行：\n" + "\n".join(invalid_lines[:5]),
-            )
+        return invalid_lines
 
     def _on_export(self) -> None:
         """匯出區間為文字"""
@@ -477,8 +558,9 @@ class RangeTableWidget(QWidget):
             start_item = self.table.item(row, 2)
             end_item = self.table.item(row, 3)
             note_item = self.table.item(row, 4)
-            precise_item = self.table.item(row, 5)
+            precise_item = self.table.item(row, COL_PRECISE)
             adjusted_item = self.table.item(row, 6)
+            smart_item = self.table.item(row, COL_SMART)
             if start_item and end_item:
                 title = title_item.text().strip() if title_item else ""
                 start = start_item.text().strip()
@@ -486,6 +568,7 @@ class RangeTableWidget(QWidget):
                 note = note_item.text().strip() if note_item else ""
                 precise = precise_item.checkState() == Qt.Checked if precise_item else False
                 adjusted = bool(adjusted_item.text().strip()) if adjusted_item else False
+                smart = smart_item.checkState() == Qt.Checked if smart_item else False
                 if start and end:
                     ranges.append(
                         {
@@ -495,6 +578,7 @@ class RangeTableWidget(QWidget):
                             "note": note,
                             "precise": precise,
                             "adjusted": adjusted,
+                            "smart": smart,
                         }
                     )
         return ranges
@@ -507,8 +591,9 @@ class RangeTableWidget(QWidget):
         start_item = self.table.item(row, 2)
         end_item = self.table.item(row, 3)
         note_item = self.table.item(row, 4)
-        precise_item = self.table.item(row, 5)
+        precise_item = self.table.item(row, COL_PRECISE)
         adjusted_item = self.table.item(row, 6)
+        smart_item = self.table.item(row, COL_SMART)
         if not start_item or not end_item:
             return None
         title = title_item.text().strip() if title_item else ""
@@ -517,9 +602,18 @@ class RangeTableWidget(QWidget):
         note = note_item.text().strip() if note_item else ""
         precise = precise_item.checkState() == Qt.Checked if precise_item else False
         adjusted = bool(adjusted_item.text().strip()) if adjusted_item else False
+        smart = smart_item.checkState() == Qt.Checked if smart_item else False
         if not start or not end:
             return None
-        return {"title": title, "start": start, "end": end, "note": note, "precise": precise, "adjusted": adjusted}
+        return {
+            "title": title,
+            "start": start,
+            "end": end,
+            "note": note,
+            "precise": precise,
+            "adjusted": adjusted,
+            "smart": smart,
+        }
 
     def set_ranges(self, ranges: List[dict]) -> None:
         """設定區間資料（用於載入設定）"""
@@ -532,6 +626,7 @@ class RangeTableWidget(QWidget):
                 r.get("note", ""),
                 r.get("precise", False),
                 r.get("adjusted", False),
+                r.get("smart", False),
             )
 
     def clear(self) -> None:
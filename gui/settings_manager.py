@@ -8,7 +8,7 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from .constants import SETTINGS_FILE
+from .constants import PREVIEW_CACHE_MB_DEFAULT, PROXY_CACHE_MB_DEFAULT, SETTINGS_FILE
 
 
 class SettingsManager:
@@ -106,6 +106,54 @@ class SettingsManager:
     def precise_use_hwaccel(self, value: bool) -> None:
         self.set("precise_use_hwaccel", value)
 
+    @property
+    def jobs(self) -> int:
+        return self.get("jobs", 1)
+
+    @jobs.setter
+    def jobs(self, value: int) -> None:
+        self.set("jobs", value)
+
+    @property
+    def batch_copy(self) -> bool:
+        return self.get("batch_copy", False)
+
+    @batch_copy.setter
+    def batch_copy(self, value: bool) -> None:
+        self.set("batch_copy", value)
+
+    @property
+    def write_report(self) -> bool:
+        return self.get("write_report", False)
+
+    @write_report.setter
+    def write_report(self, value: bool) -> None:
+        self.set("write_report", value)
+
+    @property
+    def preview_cache_mb(self) -> int:
+        return self.get("preview_cache_mb", PREVIEW_CACHE_MB_DEFAULT)
+
+    @preview_cache_mb.setter
+    def preview_cache_mb(self, value: int) -> None:
+        self.set("preview_cache_mb", value)
+
+    @property
+    def preview_proxy(self) -> bool:
+        return self.get("preview_proxy", False)
+
+    @preview_proxy.setter
+    def preview_proxy(self, value: bool) -> None:
+        self.set("preview_proxy", value)
+
+    @property
+    def proxy_cache_mb(self) -> int:
+        return self.get("proxy_cache_mb", PROXY_CACHE_MB_DEFAULT)
+
+    @proxy_cache_mb.setter
+    def proxy_cache_mb(self, value: int) -> None:
+        self.set("proxy_cache_mb", value)
+
     @property
     def last_ranges(self) -> List[Dict[str, str]]:
         """取得上次的時間區間列表"""
@@ -8,6 +8,9 @@ from pathlib import Path
 from typing import List, Optional
 import sys
 import os
+import subprocess
+import threading
+import time
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
@@ -21,6 +24,7 @@ class SliceWorker(QThread):
 
     # 信號定義
     progress = pyqtSignal(int, int, str)  # current, total, message
+    progress_detail = pyqtSignal(float, str)  # 整體完成比例（0~1，依區間長度加權）, message（含預估剩餘時間）
     log = pyqtSignal(str)  # log message
     finished_ok = pyqtSignal(list)  # output files list
     finished_error = pyqtSignal(str)  # error message
@@ -38,6 +42,10 @@ class SliceWorker(QThread):
         precise_flags: List[bool] | None = None,
         use_hwaccel: bool = True,
         adjusted_flags: List[bool] | None = None,
+        jobs: int = fvs.DEFAULT_JOBS,
+        batch_copy: bool = False,
+        smart_flags: List[bool] | None = None,
+        report_path: Path | None = None,
         parent=None,
     ) -> None:
         super().__init__(parent)
@@ -53,12 +61,25 @@ class SliceWorker(QThread):
         self.use_hwaccel = use_hwaccel
         self._hwaccel_config: fvs.HWAccelConfig | None = None
         self.adjusted_flags = adjusted_flags or []
+        self.jobs = max(1, jobs)
+        self.batch_copy = batch_copy
+        self.smart_flags = smart_flags or []
+        self.report_path = report_path
+        self._report: fvs.RunReport | None = None
+        self._encoders: dict[str, str] = {}
+        self._keyframe_index: fvs.KeyframeIndex | None = None
         self._cancelled = False
+        # 即時進度：各區間長度與已輸出秒數（並行時由多個執行緒更新）
+        self._progress_lock = threading.Lock()
+        self._clip_durations: dict[int, float] = {}
+        self._clip_done: dict[int, float] = {}
+        self._started_at = 0.0
 
     def cancel(self) -> None:
         """取消任務"""
         self._cancelled = True
 
+    @fvs.traced("SliceWorker.run")
     def run(self) -> None:
         output_files = []
         try:
@@ -86,7 +107,8 @@ class SliceWorker(QThread):
             ffmpeg_cmd, ffprobe_cmd = fvs.ensure_ffmpeg_exists()
             self.log.emit(f"使用 ffmpeg: {ffmpeg_cmd}")
             self.log.emit(f"使用 ffprobe: {ffprobe_cmd}")
-            if self.use_hwaccel:
+            modes = {self._clip_mode(idx) for idx in range(1, len(self.ranges) + 1)}
+            if self.use_hwaccel and modes != {fvs.MODE_COPY}:
                 self._hwaccel_config = fvs.detect_hwaccel(ffmpeg_cmd)
                 if self._hwaccel_config:
                     self.log.emit(f"硬體編碼: {self._hwaccel_config.name}")
@@ -95,15 +117,27 @@ class SliceWorker(QThread):
 
             # 讀取字幕
             self.log.emit("讀取字幕檔...")
-            cues = fvs.read_srt(self.subs)
+            # verbose/報告時量測字幕讀取與切片的 Python 峰值記憶體
+            measure_heap = self.verbose or self.report_path is not None
+            srt_heap = fvs.HeapUsage()
+            with fvs.track_peak_heap(srt_heap, enabled=measure_heap):
+                cues = fvs.load_cues(self.subs)
             self.log.emit(f"共讀取 {len(cues)} 條字幕")
 
+            # 智慧輸出需要關鍵影格位置（有快取時直接讀取）；精準輸出有快取就用來定位 seek 點
+            if fvs.MODE_SMART in modes:
+                self.log.emit("讀取關鍵影格索引...")
+                self._keyframe_index = fvs.load_keyframe_index(self.video, ffprobe_cmd)
+            elif fvs.MODE_PRECISE in modes:
+                self._keyframe_index = fvs.load_keyframe_index(self.video, build=False)
+
             # 檢查影片長度
             video_duration: Optional[float] = None
             if self.check_duration:
                 self.log.emit("檢查影片長度...")
-                video_duration = fvs.probe_duration(self.video, ffprobe_cmd)
-                self.log.emit(f"影片長度: {video_duration:.2f} 秒")
+                media_info = fvs.load_media_info(self.video, ffprobe_cmd)
+                video_duration = media_info.duration
+                self.log.emit(f"影片資訊: {media_info.summary()}")
 
                 for rng in parsed_ranges:
                     if rng.end > video_duration:
@@ -119,13 +153,10 @@ class SliceWorker(QThread):
                         raise fvs.UserError(f"標題重複：{rng.title}")
                     seen_titles.add(rng.safe_title)
 
-            # 處理每個區間
+            # 處理每個區間（檔名先依序決定，並行時輸出命名不受完成順序影響）
             total = len(parsed_ranges)
+            tasks = []
             for idx, rng in enumerate(parsed_ranges, start=1):
-                if self._cancelled:
-                    self.log.emit("已取消")
-                    return
-
                 # 構建檔名：優先使用標題，否則用序號
                 if rng.safe_title:
                     base = rng.safe_title
@@ -137,54 +168,83 @@ class SliceWorker(QThread):
                     base = f"clip_{idx:03d}__{start_str}__{end_str}"
                 else:
                     base = f"clip_{idx:03d}"
+                tasks.append((idx, rng, self.outdir / f"{base}.mp4", self.outdir / f"{base}.srt"))
 
-                video_out = self.outdir / f"{base}.mp4"
-                subs_out = self.outdir / f"{base}.srt"
+            self._clip_durations = {idx: rng.end - rng.start for idx, rng, _, _ in tasks}
+            self._clip_done = {}
+            self._started_at = time.monotonic()
 
-                self.progress.emit(idx, total, f"處理區間 {idx}/{total}: {rng.label}")
-                self.log.emit(f"[{idx}/{total}] {rng.label} -> {video_out.name}")
+            # 所有區間的字幕一次切好，各段只負責寫檔
+            with fvs.track_peak_heap(srt_heap, enabled=measure_heap):
+                sliced_subs = fvs.slice_cues_batch(cues, parsed_ranges)
+            if self.verbose:
+                self.log.emit(f"字幕讀取/切片 Python 峰值記憶體 {srt_heap.peak_bytes / 1_048_576:.2f} MB")
 
-                # 若輸出檔已存在，先刪除
-                if video_out.exists():
-                    video_out.unlink()
+            if self.jobs > 1:
+                self.log.emit(f"並行處理：最多 {self.jobs} 個 ffmpeg 同時執行")
 
-                # 裁切影片
-                use_precise = (
-                    self.precise_flags[idx - 1]
-                    if idx - 1 < len(self.precise_flags)
-                    else self.ranges[idx - 1].get("precise", False)
+            # 批次 copy：連續的 copy 區間合併由單一 ffmpeg 輸出，精準/智慧區間仍逐段處理
+            batch_copy = self.batch_copy
+            if batch_copy and not fvs.copy_batch_supported(self.video, ffprobe_cmd):
+                self.log.emit("批次 copy：來源有多軌影像/音訊或字幕軌（或無法讀取媒體資訊），改為逐段輸出")
+                batch_copy = False
+            batch_size = fvs.auto_batch_size(total, self.jobs) if batch_copy else 1
+            batches = fvs.plan_batches(tasks, batch_size, lambda t: self._clip_mode(t[0]) == fvs.MODE_COPY)
+
+            if self.report_path is not None:
+                video_stream = fvs.load_media_info(self.video, ffprobe_cmd).video if fvs.MODE_SMART in modes else None
+                hwaccel = self._hwaccel_config if self.use_hwaccel else None
+                self._encoders = {
+                    mode: fvs.describe_encoder(mode, hwaccel, video_stream.codec_name if video_stream else None)
+                    for mode in fvs.OUTPUT_MODES
+                }
+                self._report = fvs.RunReport(
+                    self.report_path,
+                    ffprobe_cmd,
+                    source="gui",
+                    video=str(self.video),
+                    jobs=self.jobs,
+                    batch_copy=batch_copy,
+                    srt_peak_heap=srt_heap.peak_bytes,
                 )
-                if use_precise and self.verbose:
-                    mode = f"硬體加速({self._hwaccel_config.name})" if (self.use_hwaccel and self._hwaccel_config) else "CPU"
-                    self.log.emit(f"  使用精準輸出（重編碼，{mode}）")
-                if use_precise:
-                    fvs.run_ffmpeg_precise(
-                        self.video,
-                        rng,
-                        video_out,
-                        self.verbose,
-                        ffmpeg_cmd,
-                        hwaccel_config=self._hwaccel_config if self.use_hwaccel else None,
-                    )
-                else:
-                    fvs.run_ffmpeg(self.video, rng, video_out, self.verbose, ffmpeg_cmd)
 
-                # 裁切字幕
-                override_text = self.subs_overrides[idx - 1] if idx - 1 < len(self.subs_overrides) else None
-                if override_text:
-                    subs_out.write_text(override_text.strip() + "\n", encoding="utf-8")
+            errors: List[str] = []
+            for batch, batch_exc in fvs.iter_parallel(
+                lambda b: self._process_batch(b, sliced_subs, ffmpeg_cmd, ffprobe_cmd, total), batches, self.jobs
+            ):
+                if self._cancelled:
+                    self.log.emit("已取消")
+                    return
+                if batch_exc is None:
+                    results = [(task, None) for task in batch]
+                elif len(batch) == 1:
+                    results = [(batch[0], batch_exc)]
                 else:
-                    sliced_cues = fvs.slice_cues(cues, rng)
-                    fvs.write_srt(subs_out, sliced_cues)
-
-                # 標記已調整（僅用於 log/後續擴充）
-                adjusted = self.adjusted_flags[idx - 1] if idx - 1 < len(self.adjusted_flags) else False
-
-                output_files.append(str(video_out))
-                output_files.append(str(subs_out))
+                    # 批次失敗時逐段重跑，以便指出是哪一段出錯
+                    self.log.emit(f"  批次輸出失敗，改為逐段處理：{batch_exc}")
+                    results = list(
+                        fvs.iter_parallel(
+                            lambda t: self._process_clip(t, sliced_subs, ffmpeg_cmd, ffprobe_cmd, total), batch, 1
+                        )
+                    )
+                for (idx, rng, video_out, subs_out), exc in results:
+                    if exc is not None:
+                        msg = str(exc) if isinstance(exc, fvs.UserError) else f"非預期錯誤: {exc}"
+                        errors.append(f"{video_out.name}: {msg}")
+                        self.log.emit(f"  ✗ [{idx}/{total}] {video_out.name} 失敗：{msg}")
+                    else:
+                        output_files.append(str(video_out))
+                        output_files.append(str(subs_out))
+                    self.progress.emit(idx, total, f"完成區間 {idx}/{total}: {rng.label}")
+                    with self._progress_lock:
+                        self._clip_done[idx] = self._clip_durations[idx]
+                        fraction, eta = self._overall_progress()
+                    self.progress_detail.emit(fraction, f"完成區間 {idx}/{total}{_eta_text(eta)}")
 
-                suffix = "（已調整）" if adjusted or override_text else ""
-                self.log.emit(f"  ✓ 已產生 {video_out.name}, {subs_out.name} {suffix}")
+            if errors:
+                raise fvs.UserError(
+                    f"{len(errors)}/{total} 個區間處理失敗：\n" + "\n".join(errors)
+                )
 
             self.log.emit(f"\n完成！共處理 {total} 個區間")
             self.finished_ok.emit(output_files)
@@ -195,3 +255,277 @@ class SliceWorker(QThread):
         except Exception as exc:
             self.log.emit(f"[ERR] 非預期錯誤: {exc}")
             self.finished_error.emit(f"非預期錯誤: {exc}")
+        finally:
+            if self._report is not None:
+                summary = self._report.close()
+                self._report = None
+                self.log.emit(
+                    f"執行報告: {self.report_path}（{summary['ok']}/{summary['clips']} 段，即時倍率 {summary['realtime_factor']}）"
+                )
+
+    def _overall_progress(self) -> tuple[float, float | None]:
+        """回傳 (整體完成比例, 預估剩餘秒數)；需持有 _progress_lock"""
+        total_sec = sum(self._clip_durations.values())
+        if total_sec <= 0:
+            return 0.0, None
+        fraction = min(1.0, sum(self._clip_done.values()) / total_sec)
+        if fraction < 0.01:
+            return fraction, None
+        elapsed = time.monotonic() - self._started_at
+        return fraction, elapsed * (1 - fraction) / fraction
+
+    def _progress_callback(self, indices: List[int], label: str, total: int) -> fvs.ProgressCallback:
+        """ffmpeg 進度回呼：更新這些區間的已輸出秒數並回報整體進度；取消時丟出例外以結束 ffmpeg"""
+
+        def report(event: fvs.FFmpegProgress) -> None:
+            if self._cancelled:
+                raise fvs.UserError("已取消")
+            with self._progress_lock:
+                for idx in indices:
+                    self._clip_done[idx] = event.fraction(self._clip_durations[idx]) * self._clip_durations[idx]
+                fraction, eta = self._overall_progress()
+            speed = f" · {event.speed:.2f}x" if event.speed else ""
+            self.progress_detail.emit(
+                fraction,
+                f"[{label}/{total}] {event.fraction(self._clip_durations[indices[0]]) * 100:.0f}%{speed}{_eta_text(eta)}",
+            )
+
+        return report
+
+    def _clip_mode(self, idx: int) -> str:
+        """依勾選決定輸出模式（精準優先於智慧）"""
+        precise = (
+            self.precise_flags[idx - 1]
+            if idx - 1 < len(self.precise_flags)
+            else self.ranges[idx - 1].get("precise", False)
+        )
+        smart = (
+            self.smart_flags[idx - 1]
+            if idx - 1 < len(self.smart_flags)
+            else self.ranges[idx - 1].get("smart", False)
+        )
+        if precise:
+            return fvs.MODE_PRECISE
+        if smart:
+            return fvs.MODE_SMART
+        return fvs.MODE_COPY
+
+    def _process_batch(
+        self,
+        batch: List[tuple[int, fvs.TimeRange, Path, Path]],
+        sliced_subs: List[fvs.CueStore],
+        ffmpeg_cmd: str,
+        ffprobe_cmd: str,
+        total: int,
+    ) -> None:
+        """以單一 ffmpeg 處理一組 copy 區間；只有一段時等同 _process_clip"""
+        if len(batch) == 1:
+            self._process_clip(batch[0], sliced_subs, ffmpeg_cmd, ffprobe_cmd, total)
+            return
+        if self._cancelled:
+            return
+        first, last = batch[0][0], batch[-1][0]
+        self.log.emit(f"[{first}-{last}/{total}] 批次輸出 {len(batch)} 個區間")
+        for _, _, video_out, _ in batch:
+            if video_out.exists():
+                video_out.unlink()
+        # 批次失敗會逐段重跑並各自留下紀錄，這裡只記錄成功的批次
+        clips = [(idx, rng, video_out) for idx, rng, video_out, _ in batch]
+        with fvs.collect_ffmpeg_runs() as runs, fvs.report_clips(
+            self._report, clips, fvs.MODE_COPY, "copy", record_failure=False
+        ):
+            fvs.run_ffmpeg_copy_batch(
+                self.video,
+                [(rng, video_out) for _, rng, video_out, _ in batch],
+                self.verbose,
+                ffmpeg_cmd,
+                self._progress_callback([task[0] for task in batch], f"{first}-{last}", total),
+            )
+            if self.verbose:
+                self._log_usage(runs)
+            for task in batch:
+                self._write_clip_subs(task, sliced_subs)
+
+    def _process_clip(
+        self,
+        task: tuple[int, fvs.TimeRange, Path, Path],
+        sliced_subs: List[fvs.CueStore],
+        ffmpeg_cmd: str,
+        ffprobe_cmd: str,
+        total: int,
+    ) -> None:
+        """處理單一區間（可能在執行緒池中執行）"""
+        idx, rng, video_out, subs_out = task
+        if self._cancelled:
+            return
+        self.log.emit(f"[{idx}/{total}] {rng.label} -> {video_out.name}")
+
+        # 若輸出檔已存在，先刪除
+        if video_out.exists():
+            video_out.unlink()
+
+        # 裁切影片
+        mode = self._clip_mode(idx)
+        if mode != fvs.MODE_COPY and self.verbose:
+            encoder = f"硬體加速({self._hwaccel_config.name})" if (self.use_hwaccel and self._hwaccel_config) else "CPU"
+            if mode == fvs.MODE_SMART:
+                self.log.emit(f"  使用智慧輸出（起點到下一個關鍵影格重編碼，其餘 copy，{encoder}）")
+            else:
+                self.log.emit(f"  使用精準輸出（重編碼，{encoder}）")
+        with fvs.collect_ffmpeg_runs() as runs, fvs.report_clips(
+            self._report, [(idx, rng, video_out)], mode, self._encoders.get(mode, mode)
+        ):
+            fvs.extract_clip(
+                self.video,
+                rng,
+                video_out,
+                mode,
+                self.verbose,
+                ffmpeg_cmd,
+                ffprobe_cmd,
+                hwaccel_config=self._hwaccel_config if self.use_hwaccel else None,
+                keyframe_index=self._keyframe_index,
+                on_progress=self._progress_callback([idx], str(idx), total),
+            )
+            if self.verbose:
+                self._log_usage(runs)
+
+            self._write_clip_subs(task, sliced_subs)
+
+    def _log_usage(self, runs: List[fvs.FFmpegRun]) -> None:
+        """verbose 時列出每個 ffmpeg 的耗時與資源用量"""
+        for run in runs:
+            self.log.emit(f"  [{run.tag}] {run.wall_time:.2f}s，{run.usage.describe()}")
+
+    def _write_clip_subs(
+        self, task: tuple[int, fvs.TimeRange, Path, Path], sliced_subs: List[fvs.CueStore]
+    ) -> None:
+        """輸出單段字幕（優先使用預覽中編輯過的覆寫文字）"""
+        idx, rng, video_out, subs_out = task
+        override_text = self.subs_overrides[idx - 1] if idx - 1 < len(self.subs_overrides) else None
+        if override_text:
+            subs_out.write_text(override_text.strip() + "\n", encoding="utf-8")
+        else:
+            fvs.write_srt(subs_out, sliced_subs[idx - 1])
+
+        # 標記已調整（僅用於 log/後續擴充）
+        adjusted = self.adjusted_flags[idx - 1] if idx - 1 < len(self.adjusted_flags) else False
+
+        suffix = "（已調整）" if adjusted or override_text else ""
+        self.log.emit(f"  ✓ 已產生 {video_out.name}, {subs_out.name} {suffix}")
+
+
+def _eta_text(eta: float | None) -> str:
+    if eta is None:
+        return ""
+    minutes, seconds = divmod(int(eta + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f" · 剩餘約 {hours}:{minutes:02d}:{seconds:02d}" if hours else f" · 剩餘約 {minutes:02d}:{seconds:02d}"
+
+
+class KeyframeIndexWorker(QThread):
+    """背景建立（或讀取快取）來源影片的關鍵影格索引，可取消（結束 ffprobe 掃描）"""
+
+    finished_ok = pyqtSignal(str, object)  # video path, KeyframeIndex
+    finished_error = pyqtSignal(str, str)  # video path, error message
+
+    def __init__(self, video: Path, parent=None) -> None:
+        super().__init__(parent)
+        self.video = video
+        self._proc: subprocess.Popen | None = None
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
+
+    def _on_process(self, proc: subprocess.Popen) -> None:
+        # 先記下程序再檢查旗標：cancel 不論早於或晚於此處都能結束掃描
+        self._proc = proc
+        if self._cancelled:
+            proc.terminate()
+
+    def run(self) -> None:
+        try:
+            _, ffprobe_cmd = fvs.ensure_ffmpeg_exists()
+            index = fvs.load_keyframe_index(self.video, ffprobe_cmd, on_process=self._on_process)
+            self.finished_ok.emit(str(self.video), index)
+        except fvs.UserError as exc:
+            if not self._cancelled:
+                self.finished_error.emit(str(self.video), str(exc))
+        except Exception as exc:
+            self.finished_error.emit(str(self.video), f"非預期錯誤: {exc}")
+
+
+class ProxyWorker(QThread):
+    """背景把整支來源轉成預覽代理檔（已有快取時立即完成），可取消"""
+
+    progress = pyqtSignal(str, float)  # video path, 完成比例（0~1）
+    finished_ok = pyqtSignal(str, str)  # video path, proxy path
+    finished_error = pyqtSignal(str, str)  # video path, error message
+
+    def __init__(self, video: Path, max_bytes: int | None = None, parent=None) -> None:
+        super().__init__(parent)
+        self.video = video
+        self.max_bytes = max_bytes  # 代理檔總大小上限，轉檔完成後依此淘汰其他影片的代理檔
+        self._duration = 0.0
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def _on_progress(self, event: fvs.FFmpegProgress) -> None:
+        if self._cancelled:
+            raise fvs.UserError("已取消")  # 由 _run_ffmpeg_cmd 結束 ffmpeg
+        self.progress.emit(str(self.video), event.fraction(self._duration))
+
+    def run(self) -> None:
+        try:
+            ffmpeg_cmd, ffprobe_cmd = fvs.ensure_ffmpeg_exists()
+            self._duration = fvs.load_media_info(self.video, ffprobe_cmd).duration
+            proxy = fvs.load_proxy(
+                self.video, ffmpeg_cmd, on_progress=self._on_progress, max_bytes=self.max_bytes
+            )
+            self.finished_ok.emit(str(self.video), str(proxy))
+        except fvs.UserError as exc:
+            if not self._cancelled:
+                self.finished_error.emit(str(self.video), str(exc))
+        except Exception as exc:
+            self.finished_error.emit(str(self.video), f"非預期錯誤: {exc}")
+
+
+class PreviewSourceWorker(QThread):
+    """
+    背景讀取預覽用的來源資訊：媒體資訊（需要時以 ffprobe 探測）、關鍵影格索引與代理檔快取。
+    索引與代理檔只讀快取不建立；探測失敗視為沒有媒體資訊，不影響預覽。
+    """
+
+    finished_ok = pyqtSignal(object, object, object)  # MediaInfo | None, KeyframeIndex | None, proxy Path | None
+
+    def __init__(self, video: Path, ffprobe_cmd: str | None, probe: bool, use_proxy: bool, parent=None) -> None:
+        super().__init__(parent)
+        self.video = video
+        self.ffprobe_cmd = ffprobe_cmd
+        self.probe = probe
+        self.use_proxy = use_proxy
+
+    def run(self) -> None:
+        media_info = None
+        if self.probe:
+            try:
+                media_info = fvs.load_media_info(self.video, self.ffprobe_cmd)
+            except (fvs.UserError, OSError, ValueError):
+                media_info = None
+        try:
+            index = fvs.load_keyframe_index(self.video, build=False)
+        except (fvs.UserError, OSError):
+            index = None
+        proxy = None
+        if self.use_proxy:
+            try:
+                proxy = fvs.load_proxy(self.video, build=False)
+            except (fvs.UserError, OSError):
+                proxy = None
+        self.finished_ok.emit(media_info, index, proxy)